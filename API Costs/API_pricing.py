@@ -0,0 +1,75 @@
+"""
+OpenAI price table and per-call cost estimate.
+
+Kept apart from API_usage.py so other code (e.g. the extractor's usage summary)
+can import it without side effects: no dotenv, matplotlib or network.
+"""
+
+# ------------------0) PRICING (USD per 1M tokens) ------------------#
+# Source: OpenAI pricing table (Standard tier). Update if you change models/tier.
+# Missing models will be warned + skipped in the estimate. :contentReference[oaicite:3]{index=3}
+PRICES_PER_1M = {
+    # GPT-5 family
+    "gpt-5.2": {"input": 1.75, "cached_input": 0.175, "output": 14.00},
+    "gpt-5.1": {"input": 1.25, "cached_input": 0.125, "output": 10.00},
+    "gpt-5": {"input": 1.25, "cached_input": 0.125, "output": 10.00},
+    "gpt-5-mini": {"input": 0.25, "cached_input": 0.025, "output": 2.00},
+    "gpt-5-nano": {"input": 0.05, "cached_input": 0.005, "output": 0.40},
+
+    # Common others (examples from pricing page; extend as needed)
+    "gpt-4.1": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+    "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+    "gpt-4.1-nano": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+}
+
+def _resolve_price_key(model_name: str) -> str | None:
+    """
+    Try to map a concrete model name (e.g., gpt-4o-mini-2024-07-18)
+    to a base pricing key (e.g., gpt-4o-mini).
+    """
+    if not model_name:
+        return None
+    if model_name in PRICES_PER_1M:
+        return model_name
+
+    # Common versioned model names
+    for k in PRICES_PER_1M.keys():
+        if model_name == k or model_name.startswith(k + "-"):
+            return k
+
+    # chat-latest / codex aliases sometimes appear
+    # e.g. gpt-5.1-chat-latest -> gpt-5.1
+    for prefix in ["-chat-latest", "-codex", "-codex-mini", "-codex-max", "-search-api"]:
+        if model_name.endswith(prefix):
+            base = model_name[: -len(prefix)]
+            if base in PRICES_PER_1M:
+                return base
+
+    return None
+
+
+def estimate_cost_usd(input_tokens: int, input_cached_tokens: int, output_tokens: int, model_name: str) -> float | None:
+    """
+    Estimate USD cost for a single model given token usage.
+    Uses: (non_cached_input * input_price + cached_input * cached_price + output * output_price) / 1e6
+    """
+    key = _resolve_price_key(model_name)
+    if not key:
+        return None
+
+    p = PRICES_PER_1M[key]
+    in_total = int(input_tokens or 0)
+    in_cached = int(input_cached_tokens or 0)
+    out_total = int(output_tokens or 0)
+
+    in_non_cached = max(in_total - in_cached, 0)
+
+    usd = (
+        (in_non_cached * p["input"])
+        + (in_cached * p["cached_input"])
+        + (out_total * p["output"])
+    ) / 1_000_000.0
+
+    return float(usd)
@@ -1,29 +1,59 @@
 from __future__ import annotations
 
 import os
+import sys
 import json
+import hashlib
+import time
+import argparse
 import threading
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import pandas as pd
-from openai import OpenAI
 from dotenv import load_dotenv
 from tqdm import tqdm
 
-from helper_scripts.webscraper import extract_article_text
+# webscraper (trafilatura/newspaper/lxml), extraction_pipeline and openai are
+# imported where they are used, so importing this module stays fast and offline
+from helper_scripts.llm_cache import LLMCache, cache_key
+from helper_scripts.text_budget import count_tokens, trim_to_budget
+from helper_scripts.batch_api import (
+    ENDPOINT_CHAT,
+    POLL_INTERVAL_S,
+    build_request,
+    chat_output_text,
+    job_name_for,
+    make_batch_client,
+    run_batch_job,
+)
 
 
 # ------------------ ENV + OPENAI CLIENT SETUP ------------------ #
 
 load_dotenv()
 
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("OPENAI_API_KEY not found in environment or .env file.")
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """OpenAI client, built on first use (not at import)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    raise RuntimeError("OPENAI_API_KEY not found in environment or .env file.")
+
+                from openai import OpenAI
+
+                _client = OpenAI(api_key=api_key)
+    return _client
 
-client = OpenAI(api_key=api_key)
 
 # Single-pass model for structured extraction
 DEFAULT_MODEL = "gpt-5-mini"
@@ -31,6 +61,13 @@ DEFAULT_MODEL = "gpt-5-mini"
 # Concurrency
 MAX_WORKERS = 20  # up to 20 workers
 
+# Article text is trimmed to this many tokens (lead + disruption-keyword sentences)
+TEXT_TOKEN_BUDGET = 3000
+
+# Response cache shared across runs (and with the labeller)
+EXTRACTOR_RESPONSE_FORMAT = {"type": "json_object"}
+llm_cache = LLMCache()
+
 
 # ------------------ DATA MODEL ------------------ #
 
@@ -49,6 +86,13 @@ class ExtractRecord:
     duration_hours: Optional[float]
     extras: Dict[str, Any]
     confidence: float
+    text_tokens: Optional[int] = None       # article text before trimming
+    text_tokens_sent: Optional[int] = None  # article text actually in the prompt
+    prompt_tokens: Optional[int] = None     # provider usage for this call (0 on a cache hit)
+    cached_tokens: Optional[int] = None     # prompt tokens served from the provider's prefix cache
+    completion_tokens: Optional[int] = None
+    latency_s: Optional[float] = None       # wall time of the API call (None for batch jobs)
+    llm_cache_hit: Optional[bool] = None    # answered from the local response cache
 
 
 # ------------------ DATE NORMALISATION ------------------ #
@@ -76,48 +120,45 @@ def _normalise_date(value: Any, *, date_only: bool) -> Optional[str]:
 
 # ------------------ LLM EXTRACTION HELPER ------------------ #
 
-def _call_chatgpt_extractor(
-    url: str,
-    title: str,
-    text: str,
-    model: str = DEFAULT_MODEL,
-    timeout: int = 60,
-) -> Dict[str, Any]:
+# Static instructions: identical for every article, so they form a fixed prompt
+# prefix (system message) that the provider's automatic prompt caching can reuse.
+# Only the article-specific part goes in the user message. Provider caching only
+# applies to prefixes of at least PROMPT_CACHE_MIN_TOKENS; the usage summary
+# notes when this prefix is shorter (the instructions are kept as they are).
+PROMPT_CACHE_MIN_TOKENS = 1024
 
-    system_prompt = """\
+EXTRACTOR_SYSTEM_PROMPT = """\
 You are an information extraction engine for supply chain disruptions.
 
 Your job is to read a news article and extract a REAL physical or policy disruption event.
 
 You MUST output a single JSON object and NOTHING else.
-"""
 
-    user_prompt = f"""\
 Extract information about a single main supply chain disruption event from the article.
 
 If there is no qualifying disruption, return:
-{{
+{
   "disruption_type": "unknown",
   "event_date": null,
   "location_name": "",
   "duration_hours": null,
-  "extras": {{}},
+  "extras": {},
   "confidence": 0.0
-}}
+}
 
 Allowed disruption_type:
 flood, drought, cyclone_hurricane, extreme_heat, landslide, earthquake,
 mine_collapse, mine_accident, labour_strike, trade_embargo, tariffs, unknown
 
 Schema:
-{{
+{
   "disruption_type": "...",
   "event_date": "YYYY-MM-DD" or null,
   "location_name": "...",
   "duration_hours": number or null,
-  "extras": {{ indicator_name: value }},
+  "extras": { indicator_name: value },
   "confidence": 0.0
-}}
+}
 
 IMPORTANT:
 - Our threshold for classing a disruption is a confidence of 0.6
@@ -126,7 +167,7 @@ IMPORTANT:
 - Only include indicators if explicitly mentioned in the article.
 - Do not infer, estimate, or fabricate indicator values.
 - Do not include indicators not listed below.
-- If no indicators are mentioned, extras must be {{}}.
+- If no indicators are mentioned, extras must be {}.
 
 Indicators by disruption type:
 
@@ -196,7 +237,12 @@ Rules:
 - Stay faithful to the text.
 - If unsure, leave fields null/empty and lower confidence.
 - Output JSON only.
+"""
+
 
+def _build_extractor_messages(url: str, title: str, text: str) -> List[Dict[str, str]]:
+
+    user_prompt = f"""\
 Now process this article:
 
 URL:
@@ -209,27 +255,25 @@ TEXT:
 {text}
 """
 
-    completion = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        response_format={"type": "json_object"},
-        timeout=timeout,
-    )
+    return [
+        {"role": "system", "content": EXTRACTOR_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
 
-    raw = completion.choices[0].message.content or ""
 
+def _parse_extractor_output(raw: str) -> Dict[str, Any]:
+    """Parse a reply into the extraction dict; ValueError if it holds no JSON object."""
     try:
         data = json.loads(raw)
     except json.JSONDecodeError:
         start = raw.find("{")
         end = raw.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            data = json.loads(raw[start:end + 1])
-        else:
-            data = {}
+        if start == -1 or end <= start:
+            raise ValueError(f"extractor reply is not JSON: {raw[:80]!r}")
+        data = json.loads(raw[start:end + 1])
+
+    if not isinstance(data, dict):
+        raise ValueError(f"extractor reply is not a JSON object: {type(data).__name__}")
 
     data.setdefault("disruption_type", "unknown")
     data.setdefault("event_date", None)
@@ -241,18 +285,90 @@ TEXT:
     return data
 
 
+def _cached_extraction(key: str) -> Optional[Dict[str, Any]]:
+    """Parsed extraction from the response cache, or None on a miss / unparseable entry."""
+    raw = llm_cache.get(key)
+    if raw is None:
+        return None
+    try:
+        return _parse_extractor_output(raw)
+    except ValueError:
+        return None
+
+
+def _call_chatgpt_extractor(
+    url: str,
+    title: str,
+    text: str,
+    model: str = DEFAULT_MODEL,
+    timeout: int = 60,
+) -> Dict[str, Any]:
+
+    text, n_full, n_sent = trim_to_budget(text, budget=TEXT_TOKEN_BUDGET, model=model)
+    messages = _build_extractor_messages(url, title, text)
+    key = _extractor_cache_key(model, messages)
+
+    data = _cached_extraction(key)
+    if data is None:
+        t0 = time.perf_counter()
+        completion = get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format=EXTRACTOR_RESPONSE_FORMAT,
+            timeout=timeout,
+        )
+        latency = time.perf_counter() - t0
+        raw = completion.choices[0].message.content or ""
+        # Parse before caching: an empty / truncated reply raises and is never stored
+        data = _parse_extractor_output(raw)
+        llm_cache.put(key, raw, model=model)
+        usage = {**_usage_fields(completion.usage), "latency_s": round(latency, 3), "llm_cache_hit": False}
+    else:
+        usage = {**_usage_fields(None), "latency_s": 0.0, "llm_cache_hit": True}
+
+    data["_meta"] = {"text_tokens": n_full, "text_tokens_sent": n_sent, **usage}
+    return data
+
+
+def _usage_fields(usage: Any) -> Dict[str, int]:
+    """prompt/cached/completion tokens from an SDK usage object or a raw response-body dict."""
+    def _get(obj, name):
+        if obj is None:
+            return None
+        return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+    details = _get(usage, "prompt_tokens_details")
+    return {
+        "prompt_tokens": int(_get(usage, "prompt_tokens") or 0),
+        "cached_tokens": int(_get(details, "cached_tokens") or 0),
+        "completion_tokens": int(_get(usage, "completion_tokens") or 0),
+    }
+
+
+def _extractor_cache_key(model: str, messages: List[Dict[str, str]]) -> str:
+    return cache_key(model, messages[0]["content"], messages[1]["content"], EXTRACTOR_RESPONSE_FORMAT)
+
+
 # ------------------ SINGLE-URL ORCHESTRATOR ------------------ #
 
 def extract_from_url_llm_single_pass(url: str, model: str = DEFAULT_MODEL) -> ExtractRecord:
+    from helper_scripts.webscraper import extract_article_text
+
     art = extract_article_text(url)
     title = art.get("title", "") or ""
     body = art.get("text", "") or ""
-    publish_date = art.get("publish_date")
 
     llm_out = _call_chatgpt_extractor(url, title, body, model=model)
+    return _build_record(url, art, llm_out)
+
+
+def _build_record(url: str, art: Dict[str, Any], llm_out: Dict[str, Any]) -> ExtractRecord:
+    title = art.get("title", "") or ""
+    publish_date = art.get("publish_date")
 
     publish_date_norm = _normalise_date(publish_date, date_only=False)
     event_date_norm = _normalise_date(llm_out.get("event_date"), date_only=True)
+    meta = llm_out.get("_meta") or {}
 
     return ExtractRecord(
         url=url,
@@ -264,15 +380,342 @@ def extract_from_url_llm_single_pass(url: str, model: str = DEFAULT_MODEL) -> Ex
         duration_hours=llm_out.get("duration_hours"),
         extras=llm_out.get("extras") or {},
         confidence=round(float(llm_out.get("confidence") or 0.0), 3),
+        text_tokens=meta.get("text_tokens"),
+        text_tokens_sent=meta.get("text_tokens_sent"),
+        prompt_tokens=meta.get("prompt_tokens"),
+        cached_tokens=meta.get("cached_tokens"),
+        completion_tokens=meta.get("completion_tokens"),
+        latency_s=meta.get("latency_s"),
+        llm_cache_hit=meta.get("llm_cache_hit"),
     )
 
 
+# ------------------ PROVIDER BATCH-API MODE ------------------ #
+
+def extract_via_batch_api(
+    urls: List[str],
+    model: str = DEFAULT_MODEL,
+    max_workers: int = MAX_WORKERS,
+    work_dir: Optional[str] = None,
+    poll_interval: float = POLL_INTERVAL_S,
+) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Scrape articles concurrently, then send every extraction prompt as one
+    provider batch job and join the replies back by custom_id.
+
+    Returns [(url, record_dict | None, error | None)] in input order.
+    """
+    from helper_scripts.webscraper import extract_article_text
+
+    work_path = Path(work_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "batch_jobs"))
+
+    arts: Dict[str, Dict[str, Any]] = {}
+    scrape_errors: Dict[str, str] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_url = {executor.submit(extract_article_text, u): u for u in urls}
+        for fut in tqdm(as_completed(future_to_url), total=len(urls), desc="Scraping"):
+            u = future_to_url[fut]
+            try:
+                art = fut.result()
+            except Exception as e:
+                scrape_errors[u] = str(e)
+                continue
+            # Failed fetches come back as an empty article; do not send them to the LLM
+            if not (art.get("text") or "").strip():
+                scrape_errors[u] = "fetch_failed"
+                continue
+            arts[u] = art
+
+    # Cached prompts are answered locally; only misses go into the batch job
+    cached: Dict[str, Dict[str, Any]] = {}
+    custom_ids: Dict[str, str] = {}
+    keys: Dict[str, str] = {}
+    requests = []
+    token_meta: Dict[str, Dict[str, int]] = {}
+    for u in urls:
+        if u not in arts:
+            continue
+        text, n_full, n_sent = trim_to_budget(arts[u].get("text", "") or "", budget=TEXT_TOKEN_BUDGET, model=model)
+        token_meta[u] = {"text_tokens": n_full, "text_tokens_sent": n_sent}
+        messages = _build_extractor_messages(u, arts[u].get("title", "") or "", text)
+        key = _extractor_cache_key(model, messages)
+        hit = _cached_extraction(key)
+        if hit is not None:
+            cached[u] = hit
+            continue
+        # custom_id from the URL (not its position) so the job name is stable across re-runs
+        cid = "u" + hashlib.sha1(u.encode("utf-8")).hexdigest()[:24]
+        if cid in custom_ids:
+            continue
+        custom_ids[cid] = u
+        keys[cid] = key
+        requests.append(build_request(
+            cid,
+            ENDPOINT_CHAT,
+            {"model": model, "messages": messages, "response_format": EXTRACTOR_RESPONSE_FORMAT},
+        ))
+
+    replies: Dict[str, Dict[str, Any]] = {}
+    if requests:
+        job_name = job_name_for("extract", requests)
+        replies = run_batch_job(make_batch_client(), requests, ENDPOINT_CHAT, work_path, job_name, poll_interval=poll_interval)
+
+    url_to_cid = {u: cid for cid, u in custom_ids.items()}
+    out: List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]] = []
+    for u in urls:
+        if u in scrape_errors:
+            out.append((u, None, scrape_errors[u]))
+            continue
+        if u in cached:
+            llm_out = cached[u]
+            usage = {**_usage_fields(None), "latency_s": None, "llm_cache_hit": True}
+        else:
+            cid = url_to_cid.get(u, "")
+            reply = replies.get(cid)
+            if not reply or reply["body"] is None:
+                out.append((u, None, f"batch_error: {reply['error'] if reply else 'missing'}"))
+                continue
+            raw = chat_output_text(reply["body"])
+            # Only replies that parse are cached, so a bad one is retried on the next run
+            try:
+                llm_out = _parse_extractor_output(raw)
+            except ValueError as e:
+                out.append((u, None, f"parse_error: {e}"))
+                continue
+            llm_cache.put(keys[cid], raw, model=model)
+            usage = {**_usage_fields(reply["body"].get("usage")), "latency_s": None, "llm_cache_hit": False}
+        llm_out["_meta"] = {**token_meta.get(u, {}), **usage}
+        out.append((u, _build_record(u, arts[u], llm_out).__dict__, None))
+
+    return out
+
+
+# ------------------ RESUMABLE RUN STATE ------------------ #
+#
+# The JSONL is the checkpoint: one line per finished URL, appended as results
+# arrive. The errors CSV is appended the same way. A re-run skips URLs found in
+# either file (errored ones only come back with retry_errors=True), and the
+# output CSV is rebuilt from the full JSONL at the end.
+
+def load_done_urls(out_jsonl: str) -> set:
+    done = set()
+    if not os.path.exists(out_jsonl):
+        return done
+    with open(out_jsonl, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                done.add(json.loads(line)["url"])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue  # torn last line after a crash
+    return done
+
+
+def load_error_urls(out_errors: str) -> set:
+    if not os.path.exists(out_errors):
+        return set()
+    try:
+        return set(pd.read_csv(out_errors, usecols=["url"])["url"].dropna().astype(str))
+    except (pd.errors.EmptyDataError, ValueError):
+        return set()
+
+
+def append_error(out_errors: str, url: str, error: str) -> None:
+    new_file = not os.path.exists(out_errors) or os.path.getsize(out_errors) == 0
+    pd.DataFrame([{"url": url, "error": error}]).to_csv(
+        out_errors, mode="a", header=new_file, index=False, encoding="utf-8"
+    )
+
+
+def drop_errors(out_errors: str, urls: set) -> None:
+    """Remove URLs about to be retried so the file only lists current failures."""
+    if not urls or not os.path.exists(out_errors):
+        return
+    err = pd.read_csv(out_errors)
+    err[~err["url"].astype(str).isin(urls)].to_csv(out_errors, index=False, encoding="utf-8")
+
+
+def pending_urls(urls: List[str], out_jsonl: str, out_errors: str, retry_errors: bool = False) -> List[str]:
+    done = load_done_urls(out_jsonl)
+    failed = load_error_urls(out_errors) - done
+
+    if retry_errors:
+        drop_errors(out_errors, failed)
+        skip = done
+    else:
+        skip = done | failed
+
+    todo = [u for u in urls if u not in skip]
+    print(
+        f"Resume: {len(done & set(urls))} done | {len(failed & set(urls))} previously failed"
+        f"{' (retrying)' if retry_errors else ' (skipped)'} | {len(todo)} to process"
+    )
+    return todo
+
+
+def write_csv_from_jsonl(out_jsonl: str, out_csv: str) -> int:
+    if not os.path.exists(out_jsonl):
+        return 0
+    rows = []
+    with open(out_jsonl, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    if not rows:
+        return 0
+    df = pd.DataFrame(rows).drop_duplicates("url", keep="last")
+    df.to_csv(out_csv, index=False, encoding="utf-8")
+    return len(df)
+
+
+# ------------------ RUN USAGE / COST SUMMARY ------------------ #
+
+USAGE_FIELDS = [
+    "text_tokens", "text_tokens_sent", "prompt_tokens", "cached_tokens",
+    "completion_tokens", "latency_s", "llm_cache_hit",
+]
+BATCH_API_DISCOUNT = 0.5
+
+
+def _estimate_cost_usd(prompt_tokens: int, cached_tokens: int, completion_tokens: int, model: str) -> Optional[float]:
+    """Price table lives in API Costs/API_pricing.py (no import side effects)."""
+    api_costs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "API Costs")
+    if api_costs_dir not in sys.path:
+        sys.path.insert(0, api_costs_dir)
+    try:
+        from API_pricing import estimate_cost_usd
+    except ImportError:
+        return None
+    return estimate_cost_usd(prompt_tokens, cached_tokens, completion_tokens, model)
+
+
+def print_usage_summary(usage_rows: List[Dict[str, Any]], model: str, batch_api: bool = False) -> None:
+    if not usage_rows:
+        return
+    u = pd.DataFrame(usage_rows)
+    n = len(u)
+    tot = {c: int(pd.to_numeric(u[c], errors="coerce").fillna(0).sum()) for c in USAGE_FIELDS[:5]}
+
+    if tot["text_tokens"]:
+        print(
+            f"Article text tokens: {tot['text_tokens']:,} -> {tot['text_tokens_sent']:,} sent "
+            f"({1 - tot['text_tokens_sent'] / tot['text_tokens']:.1%} trimmed, budget {TEXT_TOKEN_BUDGET}/article)"
+        )
+
+    cached_share = tot["cached_tokens"] / tot["prompt_tokens"] if tot["prompt_tokens"] else 0.0
+    n_hits = int(u["llm_cache_hit"].fillna(False).astype(bool).sum())
+    print(
+        f"Usage: {tot['prompt_tokens']:,} prompt ({cached_share:.1%} prefix-cached) | "
+        f"{tot['completion_tokens']:,} completion | {n_hits}/{n} answered from local cache"
+    )
+
+    lat = pd.to_numeric(u.loc[~u["llm_cache_hit"].fillna(False).astype(bool), "latency_s"], errors="coerce").dropna()
+    if len(lat):
+        print(f"Latency per call: mean {lat.mean():.2f}s | p50 {lat.median():.2f}s | p95 {lat.quantile(0.95):.2f}s")
+
+    prefix_tokens = count_tokens(EXTRACTOR_SYSTEM_PROMPT, model)
+    if prefix_tokens < PROMPT_CACHE_MIN_TOKENS:
+        print(f"Note: static prompt prefix is {prefix_tokens} tokens, below the {PROMPT_CACHE_MIN_TOKENS}-token caching minimum")
+
+    cost = _estimate_cost_usd(tot["prompt_tokens"], tot["cached_tokens"], tot["completion_tokens"], model)
+    if cost is not None:
+        if batch_api:
+            cost *= BATCH_API_DISCOUNT
+        print(f"Estimated cost: ${cost:.4f} total | ${cost / n * 1000:.3f} per 1k articles")
+
+
 # ------------------ BATCH RUNNER (CONCURRENT) ------------------ #
 
+def extract_urls_resumable(
+    urls: List[str],
+    out_jsonl: str,
+    out_csv: str,
+    out_errors: str,
+    model: str = DEFAULT_MODEL,
+    max_workers: int = MAX_WORKERS,
+    use_batch_api: bool = False,
+    retry_errors: bool = False,
+) -> None:
+    todo = pending_urls(urls, out_jsonl, out_errors, retry_errors=retry_errors)
+    n_ok = 0
+    n_err = 0
+
+    write_lock = threading.Lock()
+    usage_rows: List[Dict[str, Any]] = []
+
+    def _write_result(data: Dict[str, Any]) -> None:
+        with write_lock:
+            with open(out_jsonl, "a", encoding="utf-8") as f:
+                f.write(json.dumps(data, ensure_ascii=False) + "\n")
+            usage_rows.append({k: data.get(k) for k in USAGE_FIELDS})
+
+    def _write_error(url: str, err: str) -> None:
+        with write_lock:
+            append_error(out_errors, url, err)
+
+    def _llm_step(u: str, art: Dict[str, Any]) -> Dict[str, Any]:
+        llm_out = _call_chatgpt_extractor(u, art.get("title", "") or "", art.get("text", "") or "", model=model)
+        return _build_record(u, art, llm_out).__dict__
+
+    if todo and use_batch_api:
+        print(f"Processing {len(todo)} URLs with model={model} via the provider batch API...\n")
+        for url, data, err in extract_via_batch_api(todo, model=model, max_workers=max_workers):
+            if err is not None:
+                _write_error(url, err)
+                n_err += 1
+                continue
+            _write_result(data)
+            n_ok += 1
+    elif todo:
+        from helper_scripts.extraction_pipeline import run_extraction_pipeline
+
+        get_client()  # fail fast on a missing key instead of erroring every URL
+        print(f"Processing {len(todo)} URLs with model={model} (fetch -> parse -> LLM pipeline, {max_workers} LLM threads)...\n")
+
+        counts_lock = threading.Lock()
+        pbar = tqdm(total=len(todo), desc="Extracting")
+
+        def _on_result(url: str, data: Optional[Dict[str, Any]], err: Optional[str]) -> None:
+            nonlocal n_ok, n_err
+            if err is not None:
+                _write_error(url, err)
+            else:
+                _write_result(data)
+            with counts_lock:
+                if err is not None:
+                    n_err += 1
+                else:
+                    n_ok += 1
+                pbar.update(1)
+
+        run_extraction_pipeline(todo, _llm_step, _on_result, n_llm=max_workers)
+        pbar.close()
+
+    print(llm_cache.summary())
+    print(f"This run: {n_ok} extracted | {n_err} failed")
+    print_usage_summary(usage_rows, model, batch_api=use_batch_api)
+
+    n_rows = write_csv_from_jsonl(out_jsonl, out_csv)
+    if n_rows:
+        print(f"\nSaved outputs to:\n  {out_jsonl}\n  {out_csv} ({n_rows} rows)")
+
+    if load_error_urls(out_errors) - load_done_urls(out_jsonl):
+        print(f"Some URLs failed — see:\n  {out_errors}\n(re-run with --retry-errors to try them again)")
+    else:
+        print("No errors recorded.")
+
+
 def run_batch(
     input_csv: str = "test_urls.csv",
     model: str = DEFAULT_MODEL,
     max_workers: int = MAX_WORKERS,
+    use_batch_api: bool = False,
+    retry_errors: bool = False,
 ):
     base_dir = os.path.dirname(os.path.abspath(__file__))
     results_dir = os.path.join(base_dir, "results")
@@ -292,48 +735,19 @@ def run_batch(
         raise ValueError("CSV must have a header named 'url'")
 
     urls = [u.strip() for u in df["url"].dropna().astype(str).tolist() if u.strip()]
-    total = len(urls)
-
-    if os.path.exists(out_jsonl):
-        os.remove(out_jsonl)
-
-    results: List[Dict[str, Any]] = []
-    errors: List[Dict[str, Any]] = []
-
-    write_lock = threading.Lock()
 
-    def _worker(u: str) -> Dict[str, Any]:
-        rec = extract_from_url_llm_single_pass(u, model=model)
-        return rec.__dict__
-
-    print(f"Processing {total} URLs with model={model} using up to {max_workers} workers...\n")
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_url = {executor.submit(_worker, u): u for u in urls}
-
-        for fut in tqdm(as_completed(future_to_url), total=total, desc="Extracting"):
-            url = future_to_url[fut]
-            try:
-                data = fut.result()
-                results.append(data)
-
-                with write_lock:
-                    with open(out_jsonl, "a", encoding="utf-8") as f:
-                        f.write(json.dumps(data, ensure_ascii=False) + "\n")
-
-            except Exception as e:
-                errors.append({"url": url, "error": str(e)})
-
-    if results:
-        pd.DataFrame(results).to_csv(out_csv, index=False, encoding="utf-8")
-        print(f"\nSaved outputs to:\n  {out_jsonl}\n  {out_csv}")
-
-    if errors:
-        pd.DataFrame(errors).to_csv(out_errors, index=False, encoding="utf-8")
-        print(f"Some URLs failed — see:\n  {out_errors}")
-    else:
-        print("No errors recorded.")
+    extract_urls_resumable(
+        urls, out_jsonl, out_csv, out_errors,
+        model=model, max_workers=max_workers,
+        use_batch_api=use_batch_api, retry_errors=retry_errors,
+    )
 
 
 if __name__ == "__main__":
-    run_batch()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="LLM disruption extraction over a URL list")
+    parser.add_argument("--input", default="test_urls.csv")
+    parser.add_argument("--batch-api", action="store_true", help="submit prompts as a provider batch job")
+    parser.add_argument("--retry-errors", action="store_true", help="re-run URLs listed in the errors file")
+    args = parser.parse_args()
+
+    run_batch(input_csv=args.input, use_batch_api=args.batch_api, retry_errors=args.retry_errors)
@@ -0,0 +1,162 @@
+'''
+Microbenchmark: per-article CPU cost of HTML parsing in the webscraper.
+
+Compares the old multi-parse path (BeautifulSoup html.parser for dates,
+trafilatura.extract + trafilatura.bare_extraction on the raw string, and
+newspaper3k always) against helper_scripts.webscraper.parse_article_html
+(one lxml tree, one trafilatura call, newspaper only when fields are missing).
+
+Runs offline over saved HTML fixtures. To save fixtures from past extractions:
+    python debugging/benchmark_html_parse.py --save 50
+Then:
+    python debugging/benchmark_html_parse.py
+'''
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import pandas as pd
+import trafilatura
+from bs4 import BeautifulSoup
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR.parent))
+
+from helper_scripts.webscraper import (  # noqa: E402
+    META_DATE_TAGS,
+    _HAS_NEWSPAPER,
+    _parse_date,
+    fetch_html,
+    parse_article_html,
+)
+
+if _HAS_NEWSPAPER:
+    from newspaper import Article as _NPArticle
+
+
+# ------------------ CONFIG ------------------ #
+
+FIXTURE_DIR = BASE_DIR / "html_fixtures"
+URL_SOURCE = BASE_DIR.parent / "results" / "extractions.csv"
+REPEATS = 3
+
+
+# ------------------ OLD PATH (for comparison) ------------------ #
+
+def legacy_parse(html: str, url: str) -> dict:
+    title, text, publish_date = "", "", None
+    soup = BeautifulSoup(html, "html.parser")
+
+    for attr, key in META_DATE_TAGS:
+        tag = soup.find("meta", attrs={attr: key})
+        if tag and tag.get("content"):
+            publish_date = _parse_date(tag["content"])
+            if publish_date:
+                break
+
+    if publish_date is None:
+        time_tag = soup.find("time", datetime=True)
+        if time_tag:
+            publish_date = _parse_date(time_tag["datetime"])
+
+    if publish_date is None:
+        for script in soup.find_all("script", type="application/ld+json"):
+            try:
+                data = json.loads(script.string)
+                if isinstance(data, dict) and data.get("datePublished"):
+                    publish_date = _parse_date(data["datePublished"])
+                    break
+            except Exception:
+                pass
+
+    text = trafilatura.extract(html, include_comments=False, include_tables=False) or ""
+    trafilatura.bare_extraction(html)
+
+    if _HAS_NEWSPAPER:
+        try:
+            art = _NPArticle(url)
+            art.download(input_html=html)
+            art.parse()
+            title = title or art.title or ""
+            text = text or art.text or ""
+        except Exception:
+            pass
+
+    return {"title": title, "text": text, "publish_date": publish_date}
+
+
+# ------------------ FIXTURES ------------------ #
+
+def save_fixtures(n: int) -> None:
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    urls = pd.read_csv(URL_SOURCE)["url"].dropna().astype(str).unique().tolist()
+
+    saved = 0
+    for i, url in enumerate(urls):
+        if saved >= n:
+            break
+        html = fetch_html(url)
+        if not html:
+            continue
+        (FIXTURE_DIR / f"{i:04d}.html").write_text(html, encoding="utf-8")
+        (FIXTURE_DIR / f"{i:04d}.url").write_text(url, encoding="utf-8")
+        saved += 1
+    print(f"Saved {saved} fixtures to {FIXTURE_DIR}")
+
+
+def load_fixtures() -> list:
+    out = []
+    for p in sorted(FIXTURE_DIR.glob("*.html")):
+        url_file = p.with_suffix(".url")
+        url = url_file.read_text(encoding="utf-8").strip() if url_file.exists() else ""
+        out.append((url, p.read_text(encoding="utf-8", errors="replace")))
+    return out
+
+
+# ------------------ BENCHMARK ------------------ #
+
+def bench(fn, fixtures, repeats: int = REPEATS) -> float:
+    """Best-of-N CPU seconds for one pass over all fixtures."""
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.process_time()
+        for url, html in fixtures:
+            fn(html, url)
+        best = min(best, time.process_time() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark webscraper HTML parsing")
+    parser.add_argument("--save", type=int, default=0, help="fetch N fixture pages first")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixtures(args.save)
+
+    fixtures = load_fixtures()
+    if not fixtures:
+        raise FileNotFoundError(f"No fixtures in {FIXTURE_DIR} (run with --save N)")
+
+    old = bench(legacy_parse, fixtures, args.repeats)
+    new = bench(parse_article_html, fixtures, args.repeats)
+    n = len(fixtures)
+
+    # Same fields recovered?
+    same_text = sum(
+        legacy_parse(h, u)["text"].split() == parse_article_html(h, u)["text"].split() for u, h in fixtures
+    )
+
+    print(f"Fixtures: {n} | newspaper3k: {'yes' if _HAS_NEWSPAPER else 'no'}")
+    print(f"Old multi-parse : {old / n * 1000:8.1f} ms CPU / article")
+    print(f"Single lxml tree: {new / n * 1000:8.1f} ms CPU / article")
+    print(f"Speed-up        : {old / new:8.2f}x")
+    print(f"Identical text  : {same_text}/{n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+'''
+Startup benchmark: import time and import graph of the Database Builder entry modules.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+without OPENAI_API_KEY and with network-free settings, so this also checks that
+importing works offline. Reports:
+  - wall time of the import (best of N fresh processes)
+  - the slowest top-level packages by cumulative import time
+  - which heavy optional packages were pulled in at import
+
+    python debugging/benchmark_startup.py
+    python debugging/benchmark_startup.py --modules DisruptionExtractor --top 20
+'''
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = BASE_DIR.parent
+
+
+# ------------------ CONFIG ------------------ #
+
+DEFAULT_MODULES = [
+    "DisruptionExtractor",
+    "oneWeekTest",
+    "helper_scripts.consolidateExtractions",
+    "helper_scripts.event_db",
+]
+HEAVY_PACKAGES = ["openai", "trafilatura", "newspaper", "lxml", "bs4", "tiktoken", "matplotlib", "pandas"]
+REPEATS = 3
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def import_wall_time(module: str) -> float:
+    code = (
+        "import time; t0 = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t0)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_DIR, env=_env(),
+        capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def import_graph(module: str) -> tuple:
+    """([(cumulative_us, package)] per top-level package, set of heavy packages loaded)."""
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(p for p in {HEAVY_PACKAGES!r} if p in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_DIR, env=_env(),
+        capture_output=True, text=True, check=True,
+    )
+
+    # A package's first import line carries the cumulative time of everything it pulled in
+    skip = {module.split(".")[0], "site", "encodings"}
+    per_package = {}
+    for line in out.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if not m:
+            continue
+        root = m.group(4).split(".")[0]
+        if root in skip:
+            continue
+        per_package[root] = max(per_package.get(root, 0), int(m.group(2)))
+
+    heavy = set(filter(None, out.stdout.strip().splitlines()[-1].split(","))) if out.stdout.strip() else set()
+    return sorted(((us, name) for name, us in per_package.items()), reverse=True), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for entry modules")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            wall = min(import_wall_time(module) for _ in range(args.repeats))
+            graph, heavy = import_graph(module)
+        except subprocess.CalledProcessError as e:
+            print(f"\n{module}: import FAILED\n{e.stderr.strip().splitlines()[-1] if e.stderr else ''}")
+            continue
+
+        print(f"\n=== {module} ===")
+        print(f"Import wall time : {wall * 1000:8.1f} ms (best of {args.repeats})")
+        print(f"Heavy packages   : {', '.join(sorted(heavy)) or '-'}")
+        print("Slowest packages (cumulative import time):")
+        for us, name in graph[: args.top]:
+            print(f"  {name:<32} {us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
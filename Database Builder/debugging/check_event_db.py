@@ -0,0 +1,84 @@
+'''
+Duplicate-URL check for the event DB (helper_scripts/event_db.py).
+
+An extractions file can list the same URL more than once (re-scraped or
+re-extracted articles), and consolidation can then produce two events with
+the same URL set. Loading such a file must not crash on the event_id primary
+key, must give every event its own id, and must attach each extraction row
+to one event only. Re-loading the same file must keep the ids.
+
+Both load paths are checked, on a throwaway database:
+  load_consolidated()         events from dedupe_events(), as pipelineRunner does
+  rebuild_from_extractions()  the DB clusters the file itself
+
+    python debugging/check_event_db.py
+'''
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR.parent))
+
+from helper_scripts.consolidateExtractions import dedupe_events  # noqa: E402
+from helper_scripts.event_db import EventDB  # noqa: E402
+
+
+# ------------------ CONFIG ------------------ #
+
+SOURCE = "duplicate_urls.jsonl"
+DUP_URL = "https://example.com/port-strike"
+
+
+def duplicate_url_frame() -> pd.DataFrame:
+    """Same URL extracted twice with different types (so it lands in two events), plus a normal event."""
+    rows = [
+        {"url": DUP_URL, "disruption_type": "labour_strike", "location_name": "Santos, Brazil",
+         "event_date": "2026-01-05", "confidence": 0.9},
+        {"url": DUP_URL, "disruption_type": "flood", "location_name": "Santos, Brazil",
+         "event_date": "2026-01-05", "confidence": 0.7},
+        {"url": "https://example.com/quake", "disruption_type": "earthquake", "location_name": "Chile",
+         "event_date": "2026-01-06", "confidence": 0.8},
+    ]
+    df = pd.DataFrame(rows)
+    df["source_title"] = ""
+    df["extras"] = [{} for _ in rows]
+    df["duration_hours"] = None
+    df["publish_date"] = pd.NaT
+    df["event_date"] = pd.to_datetime(df["event_date"])
+    return df
+
+
+def check(db: EventDB, load, label: str) -> None:
+    n = load()
+    events = db.query(include_urls=True)
+    ids = events["event_id"].tolist()
+    assert n == len(events) == 3, f"{label}: expected 3 events, got {n} loaded / {len(events)} stored"
+    assert len(set(ids)) == len(ids), f"{label}: duplicate event ids {ids}"
+    assert sum(DUP_URL in u for u in events["urls"]) == 2, f"{label}: both events should list {DUP_URL}"
+
+    owners = [eid for eid in ids if DUP_URL in set(db.extractions_for(eid)["url"])]
+    assert len(owners) == 1, f"{label}: {DUP_URL} extraction attached to {len(owners)} events"
+
+    load()
+    assert sorted(db.query(include_urls=False)["event_id"]) == sorted(ids), f"{label}: ids changed on reload"
+    print(f"{label:<26}: OK ({len(ids)} events, unique ids, stable on reload)")
+
+
+def main():
+    df_before = duplicate_url_frame()
+    df_after = dedupe_events(df_before)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = EventDB(Path(tmp) / "events.sqlite")
+        check(db, lambda: db.load_consolidated(df_after, df_before, source=SOURCE), "load_consolidated")
+        db.clear()
+        check(db, lambda: db.rebuild_from_extractions(df_before=df_before, source=SOURCE), "rebuild_from_extractions")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
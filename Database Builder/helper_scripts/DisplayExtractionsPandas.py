@@ -108,7 +108,16 @@ def run_display_extractions(
     before vs after consolidation.
     """
 
+    # Keep typed dates aside: fillna("") would turn datetime columns into object
+    dates = {
+        k: pd.to_datetime(df_after.get(k), errors="coerce", utc=True).dt.tz_convert(None)
+        if not pd.api.types.is_datetime64_dtype(df_after.get(k)) else df_after[k]
+        for k in ("event_date", "publish_date")
+    }
+
     df_after = df_after.copy().fillna("")
+    df_after["event_date"] = dates["event_date"]
+    df_after["publish_date"] = dates["publish_date"]
 
     print(
         "\nDate notation used below:\n"
@@ -125,8 +134,7 @@ def run_display_extractions(
     after_counts = df_after["disruption_type"].value_counts().sort_index()
 
     if df_before is not None:
-        df_before = df_before.copy().fillna("")
-        before_counts = df_before["disruption_type"].value_counts().sort_index()
+        before_counts = df_before["disruption_type"].fillna("").value_counts().sort_index()
 
         all_types = sorted(set(before_counts.index).union(set(after_counts.index)))
 
@@ -143,24 +151,12 @@ def run_display_extractions(
     else:
         print(after_counts.to_frame(name="after").to_string())
 
-    # ---- Date parsing for display ----
-    df_after["event_date"] = (
-        pd.to_datetime(df_after.get("event_date"), errors="coerce", utc=True)
-        .dt.tz_convert(None)
-    )
-    df_after["publish_date"] = (
-        pd.to_datetime(df_after.get("publish_date"), errors="coerce", utc=True)
-        .dt.tz_convert(None)
-    )
-
-    def display_date(row) -> str:
-        if pd.notna(row["event_date"]):
-            return row["event_date"].strftime("%Y-%m-%d")
-        if pd.notna(row["publish_date"]):
-            return row["publish_date"].strftime("%Y/%m/%d")
-        return ""
-
-    df_after["display_date"] = df_after.apply(display_date, axis=1)
+    # ---- Display date: event date, else publish date (vectorised) ----
+    event_str = df_after["event_date"].dt.strftime("%Y-%m-%d")
+    publish_str = df_after["publish_date"].dt.strftime("%Y/%m/%d")
+    df_after["display_date"] = event_str.where(
+        df_after["event_date"].notna(), publish_str
+    ).fillna("")
 
     df_after["title_short"] = df_after["source_title"].apply(lambda s: _truncate(s, title_max_chars))
     df_after["location_short"] = df_after["location_name"].apply(lambda s: _truncate(s, location_max_chars))
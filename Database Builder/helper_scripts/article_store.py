@@ -0,0 +1,276 @@
+"""
+On-disk article store (SQLite): raw HTML + parsed fields, keyed by normalised URL.
+
+  - HTML is stored compressed (zstd if `zstandard` is installed, else zlib)
+  - parsed title/text/publish_date are stored next to it with the parser
+    version that produced them, so a parser change re-parses from cached HTML
+    instead of re-downloading
+  - entries older than the TTL are treated as misses, but are still
+    returned with allow_stale=True (pages that vanished or went behind a paywall)
+  - total compressed size is bounded; least-recently-used rows are evicted
+
+Used by helper_scripts/webscraper.py and Relevant News Retrieval/enrich.py.
+
+Default location: <repo>/data/cache/articles.sqlite
+Override with ARTICLE_STORE_PATH; disable with ARTICLE_STORE_DISABLE=1.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+# Optional zstandard
+try:
+    import zstandard as _zstd
+    _HAS_ZSTD = True
+except Exception:
+    _HAS_ZSTD = False
+
+
+# ------------------ CONFIG ------------------ #
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_STORE_PATH = os.path.join(_REPO_ROOT, "data", "cache", "articles.sqlite")
+
+DEFAULT_TTL_S = 30 * 24 * 3600          # 30 days
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3       # 2 GB of compressed HTML
+EVICT_TO_FRACTION = 0.9                 # evict down to 90% of the bound
+ZSTD_LEVEL = 6
+
+TRACKING_PARAMS = {"gclid", "fbclid", "mc_cid", "mc_eid", "igshid", "spm", "ref", "ref_src"}
+
+
+# ------------------ URL KEY ------------------ #
+
+def normalize_url(url: str) -> str:
+    """Same rules as enrich.normalize_url: drop tracking params + fragment, lowercase host."""
+    url = (url or "").strip()
+    if not url:
+        return url
+    try:
+        p = urlparse(url)
+        q = [
+            (k, v) for k, v in parse_qsl(p.query, keep_blank_values=True)
+            if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+        ]
+        return urlunparse((p.scheme or "http", p.netloc.lower(), p.path, p.params, urlencode(q, doseq=True), ""))
+    except Exception:
+        return url
+
+
+# ------------------ COMPRESSION ------------------ #
+
+def _compress(html: str) -> tuple:
+    raw = html.encode("utf-8")
+    if _HAS_ZSTD:
+        return _zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), "zstd"
+    return zlib.compress(raw, 6), "zlib"
+
+
+def _decompress(blob: bytes, codec: str) -> str:
+    if codec == "zstd":
+        if not _HAS_ZSTD:
+            raise RuntimeError("Entry is zstd-compressed but zstandard is not installed")
+        return _zstd.ZstdDecompressor().decompress(blob).decode("utf-8")
+    return zlib.decompress(blob).decode("utf-8")
+
+
+# ------------------ STORE ------------------ #
+
+class ArticleStore:
+    """
+    Thread-safe SQLite store. One connection guarded by a lock; opened lazily
+    so importing modules does not touch the disk.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool = True,
+    ):
+        self.path = path or os.getenv("ARTICLE_STORE_PATH") or DEFAULT_STORE_PATH
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.enabled = enabled and os.getenv("ARTICLE_STORE_DISABLE", "") not in ("1", "true", "yes")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " key TEXT PRIMARY KEY,"
+                " url TEXT,"
+                " html BLOB,"
+                " codec TEXT,"
+                " size INTEGER NOT NULL DEFAULT 0,"
+                " http_status INTEGER,"
+                " title TEXT,"
+                " text TEXT,"
+                " publish_date TEXT,"
+                " parser_version TEXT,"
+                " fetched_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_accessed ON articles(accessed_at)")
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    # ---- read ----
+
+    def get(self, url: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        {"url", "html", "http_status", "title", "text", "publish_date",
+         "parser_version", "fetched_at", "stale"} or None.
+        """
+        if not self.enabled:
+            return None
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT url, html, codec, http_status, title, text, publish_date, parser_version, fetched_at"
+                " FROM articles WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            stale = (now - row[8]) > self.ttl_s
+            if stale and not allow_stale:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE articles SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+
+        return {
+            "url": row[0],
+            "html": _decompress(row[1], row[2]) if row[1] is not None else None,
+            "http_status": row[3],
+            "title": row[4],
+            "text": row[5],
+            "publish_date": row[6],
+            "parser_version": row[7],
+            "fetched_at": row[8],
+            "stale": stale,
+        }
+
+    # ---- write ----
+
+    def put(
+        self,
+        url: str,
+        html: Optional[str],
+        parsed: Optional[Dict[str, Any]] = None,
+        parser_version: Optional[str] = None,
+        http_status: Optional[int] = 200,
+    ) -> None:
+        if not self.enabled:
+            return
+        key = normalize_url(url)
+        blob, codec = _compress(html) if html else (None, None)
+        size = len(blob) if blob is not None else 0
+        parsed = parsed or {}
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT size FROM articles WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO articles"
+                " (key, url, html, codec, size, http_status, title, text, publish_date, parser_version, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, url, blob, codec, size, http_status,
+                    parsed.get("title"), parsed.get("text"), parsed.get("publish_date"),
+                    parser_version if parsed else None, now, now,
+                ),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked(conn)
+            conn.commit()
+
+    def update_parsed(self, url: str, parsed: Dict[str, Any], parser_version: str) -> None:
+        """Re-parse result for cached HTML; keeps fetched_at (the TTL is about the HTML)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE articles SET title = ?, text = ?, publish_date = ?, parser_version = ? WHERE key = ?",
+                (parsed.get("title"), parsed.get("text"), parsed.get("publish_date"), parser_version, normalize_url(url)),
+            )
+            conn.commit()
+
+    # ---- maintenance ----
+
+    def _evict_locked(self, conn: sqlite3.Connection) -> int:
+        target = int(self.max_bytes * EVICT_TO_FRACTION)
+        evicted = 0
+        while self._total_bytes > target:
+            rows = conn.execute("SELECT key, size FROM articles ORDER BY accessed_at ASC LIMIT 500").fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            conn.executemany("DELETE FROM articles WHERE key = ?", [(k,) for k, _ in rows])
+            self._total_bytes -= sum(s for _, s in rows)
+            evicted += len(rows)
+        return evicted
+
+    def purge_expired(self) -> int:
+        """Delete entries older than the TTL (stale entries are otherwise kept for offline re-runs)."""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            cutoff = time.time() - self.ttl_s
+            n = conn.execute("DELETE FROM articles WHERE fetched_at < ?", (cutoff,)).rowcount
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+            conn.commit()
+            return n
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self._connect().execute("SELECT COUNT(*) FROM articles").fetchone()[0] if self.enabled else 0
+        total = self.hits + self.misses
+        return {
+            "entries": n,
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (
+            f"Article store: {s['entries']} entries ({s['bytes'] / 1024 ** 2:.1f} MB) | "
+            f"{s['hits']} hits | {s['misses']} misses | hit rate {s['hit_rate']:.1%}"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
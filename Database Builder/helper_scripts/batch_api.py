@@ -0,0 +1,220 @@
+"""
+Provider batch-job helpers (OpenAI Batch API).
+
+Packs requests into batch-job JSONL files, uploads and submits them, polls
+until the jobs finish and joins the output back to the caller by custom_id.
+
+Used for overnight bulk work (extraction backfills, bulk labelling) where the
+batch discount and separate rate-limit pool matter more than latency.
+
+Job state (input files + batch ids) is written to <work_dir>/<job_name>.state.json
+so an interrupted run resumes polling instead of re-submitting (and re-paying).
+Callers name jobs with job_name_for(), which is derived from the requests
+themselves (custom_ids + model + endpoint), so a re-run over the same work finds
+the state file of the interrupted job.
+
+Testing: point the client at the local mock server
+    python helper_scripts/mock_batch_server.py --port 8765
+    OPENAI_BATCH_BASE_URL=http://127.0.0.1:8765/v1
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# ------------------ CONFIG ------------------ #
+
+ENDPOINT_CHAT = "/v1/chat/completions"
+ENDPOINT_RESPONSES = "/v1/responses"
+
+COMPLETION_WINDOW = "24h"
+MAX_REQUESTS_PER_FILE = 50_000          # provider limit per batch
+POLL_INTERVAL_S = 30
+TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+# ------------------ CLIENT ------------------ #
+
+def make_batch_client(api_key: Optional[str] = None, base_url: Optional[str] = None):
+    """
+    OpenAI client for batch work. OPENAI_BATCH_BASE_URL (or base_url) redirects
+    to a mock server for testing.
+    """
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=api_key or os.getenv("OPENAI_API_KEY") or "mock",
+        base_url=base_url or os.getenv("OPENAI_BATCH_BASE_URL") or None,
+    )
+
+
+# ------------------ REQUEST PACKING ------------------ #
+
+def build_request(custom_id: str, endpoint: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {"custom_id": custom_id, "method": "POST", "url": endpoint, "body": body}
+
+
+def job_name_for(prefix: str, requests: Iterable[Dict[str, Any]]) -> str:
+    """
+    Deterministic job name: sha1 over the sorted custom_ids, model(s) and endpoint(s).
+    The same set of requests always maps to the same <job_name>.state.json.
+    """
+    ids, models, urls = [], set(), set()
+    for req in requests:
+        ids.append(str(req["custom_id"]))
+        models.add(str((req.get("body") or {}).get("model", "")))
+        urls.add(str(req.get("url", "")))
+
+    h = hashlib.sha1()
+    for part in (sorted(models), sorted(urls), sorted(ids)):
+        h.update("\n".join(part).encode("utf-8"))
+        h.update(b"\0")
+    return f"{prefix}_{h.hexdigest()[:16]}"
+
+
+def write_batch_files(
+    requests: Iterable[Dict[str, Any]],
+    work_dir: Path,
+    job_name: str,
+    max_per_file: int = MAX_REQUESTS_PER_FILE,
+) -> List[Path]:
+    work_dir.mkdir(parents=True, exist_ok=True)
+    paths: List[Path] = []
+    f = None
+    n_in_file = 0
+
+    for req in requests:
+        if f is None or n_in_file >= max_per_file:
+            if f is not None:
+                f.close()
+            path = work_dir / f"{job_name}_{len(paths):03d}.jsonl"
+            paths.append(path)
+            f = open(path, "w", encoding="utf-8")
+            n_in_file = 0
+        f.write(json.dumps(req, ensure_ascii=False) + "\n")
+        n_in_file += 1
+
+    if f is not None:
+        f.close()
+    return paths
+
+
+# ------------------ SUBMIT / POLL / COLLECT ------------------ #
+
+def submit_batch(client, path: Path, endpoint: str, metadata: Optional[Dict[str, str]] = None) -> str:
+    with open(path, "rb") as fh:
+        uploaded = client.files.create(file=fh, purpose="batch")
+
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=endpoint,
+        completion_window=COMPLETION_WINDOW,
+        metadata=metadata or {},
+    )
+    return batch.id
+
+
+def wait_for_batches(client, batch_ids: List[str], poll_interval: float = POLL_INTERVAL_S) -> Dict[str, Any]:
+    pending = set(batch_ids)
+    done: Dict[str, Any] = {}
+
+    while pending:
+        for bid in sorted(pending):
+            b = client.batches.retrieve(bid)
+            counts = getattr(b, "request_counts", None)
+            progress = f"{counts.completed}/{counts.total}" if counts is not None else "?"
+            print(f"  batch {bid}: {b.status} ({progress})")
+            if b.status in TERMINAL_STATES:
+                done[bid] = b
+        pending -= set(done)
+        if pending:
+            time.sleep(poll_interval)
+
+    return done
+
+
+def _read_file_lines(client, file_id: Optional[str]) -> List[Dict[str, Any]]:
+    if not file_id:
+        return []
+    text = client.files.content(file_id).text
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def collect_results(client, batches: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    custom_id -> {"body": <response body> | None, "error": <error> | None}
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for b in batches.values():
+        for line in _read_file_lines(client, getattr(b, "output_file_id", None)):
+            resp = line.get("response") or {}
+            ok = resp.get("status_code") == 200
+            out[line["custom_id"]] = {
+                "body": resp.get("body") if ok else None,
+                "error": None if ok else (line.get("error") or resp.get("body")),
+            }
+        for line in _read_file_lines(client, getattr(b, "error_file_id", None)):
+            out.setdefault(line["custom_id"], {"body": None, "error": line.get("error") or line.get("response")})
+    return out
+
+
+def run_batch_job(
+    client,
+    requests: List[Dict[str, Any]],
+    endpoint: str,
+    work_dir: Path,
+    job_name: str,
+    poll_interval: float = POLL_INTERVAL_S,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Pack -> submit -> poll -> join. Resumes from <job_name>.state.json if present.
+    """
+    work_dir.mkdir(parents=True, exist_ok=True)
+    state_path = work_dir / f"{job_name}.state.json"
+
+    if state_path.exists():
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        print(f"Resuming batch job {job_name}: {len(state['batch_ids'])} batch(es)")
+    else:
+        files = write_batch_files(requests, work_dir, job_name)
+        print(f"Submitting {len(requests)} requests in {len(files)} batch file(s) -> {endpoint}")
+        batch_ids = [submit_batch(client, p, endpoint, metadata={"job": job_name}) for p in files]
+        state = {"job": job_name, "endpoint": endpoint, "files": [str(p) for p in files], "batch_ids": batch_ids}
+        state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+
+    batches = wait_for_batches(client, state["batch_ids"], poll_interval=poll_interval)
+    results = collect_results(client, batches)
+
+    n_ok = sum(1 for r in results.values() if r["body"] is not None)
+    print(f"Batch job {job_name}: {n_ok} ok | {len(results) - n_ok} errors | {len(requests) - len(results)} missing")
+
+    # Finished: a re-run should submit a fresh job
+    state_path.rename(state_path.with_suffix(".done.json"))
+    return results
+
+
+# ------------------ RESPONSE BODY HELPERS ------------------ #
+
+def chat_output_text(body: Dict[str, Any]) -> str:
+    try:
+        return body["choices"][0]["message"]["content"] or ""
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+
+def responses_output_text(body: Dict[str, Any]) -> str:
+    """Equivalent of Response.output_text for a raw /v1/responses body."""
+    parts: List[str] = []
+    for item in (body or {}).get("output", []) or []:
+        if item.get("type") != "message":
+            continue
+        for c in item.get("content", []) or []:
+            if c.get("type") == "output_text":
+                parts.append(c.get("text", ""))
+    return "".join(parts)
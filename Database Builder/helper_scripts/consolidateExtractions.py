@@ -10,6 +10,7 @@ import re
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 
@@ -23,15 +24,19 @@ PUBLISH_PUBLISH_TOLERANCE_DAYS = 3
 # ------------------ LOAD ------------------ #
 
 def load_extractions(input_path: Path) -> pd.DataFrame:
+    """
+    Parse an extractions file once into a typed frame: naive datetime64
+    event/publish dates and a normalised lowercase disruption_type. Frames
+    from here can be passed straight to every post-processing stage.
+    """
     if not input_path.exists():
         raise FileNotFoundError(f"{input_path} not found")
 
     if input_path.suffix.lower() == ".jsonl":
-        records = []
+        # json.loads per line is faster than pd.read_json(lines=True) on these
+        # files and keeps full float precision
         with open(input_path, "r", encoding="utf-8") as f:
-            for line in f:
-                records.append(json.loads(line))
-        df = pd.DataFrame(records)
+            df = pd.DataFrame([json.loads(line) for line in f if line.strip()])
 
     elif input_path.suffix.lower() == ".csv":
         df = pd.read_csv(input_path)
@@ -39,13 +44,19 @@ def load_extractions(input_path: Path) -> pd.DataFrame:
     else:
         raise ValueError("Input must be .jsonl or .csv")
 
-    df["event_date"] = pd.to_datetime(
-        df.get("event_date"), errors="coerce", utc=True
-    ).dt.tz_convert(None)
+    return coerce_extractions(df)
 
-    df["publish_date"] = pd.to_datetime(
-        df.get("publish_date"), errors="coerce", utc=True
-    ).dt.tz_convert(None)
+
+def to_naive_datetime(s: Optional[pd.Series]) -> pd.Series:
+    """UTC-normalised, tz-naive datetimes; already-naive datetime columns pass through."""
+    if s is not None and pd.api.types.is_datetime64_dtype(s) and getattr(s.dt, "tz", None) is None:
+        return s
+    return pd.to_datetime(s, errors="coerce", utc=True).dt.tz_convert(None)
+
+
+def coerce_extractions(df: pd.DataFrame) -> pd.DataFrame:
+    df["event_date"] = to_naive_datetime(df.get("event_date"))
+    df["publish_date"] = to_naive_datetime(df.get("publish_date"))
 
     df["disruption_type"] = (
         df.get("disruption_type", "")
@@ -99,6 +110,26 @@ def dates_close_asymmetric(
     return delta_days <= tol
 
 
+def dates_close_symmetric(
+    d1: pd.Timestamp, src1: str,
+    d2: pd.Timestamp, src2: str
+) -> bool:
+    """
+    Symmetric version of dates_close_asymmetric: compares calendar days, so
+    swapping the arguments never changes the answer. abs((d1 - d2).days)
+    floors negative deltas, so there a publish time of 23:00 vs 01:00 can
+    match in one direction and not the other.
+    """
+    if src1 == "event" and src2 == "event":
+        tol = EVENT_EVENT_TOLERANCE_DAYS
+    elif src1 != src2:
+        tol = EVENT_PUBLISH_TOLERANCE_DAYS
+    else:
+        tol = PUBLISH_PUBLISH_TOLERANCE_DAYS
+
+    return abs(d1.toordinal() - d2.toordinal()) <= tol
+
+
 # ------------------ MERGING ------------------ #
 
 def merge_cluster(cluster: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -154,9 +185,24 @@ def merge_cluster(cluster: List[Dict[str, Any]]) -> Dict[str, Any]:
 
 # ------------------ DEDUPLICATION ------------------ #
 
-def dedupe_events(df: pd.DataFrame) -> pd.DataFrame:
-    records = df.to_dict(orient="records")
+# Widest date tolerance between any two records; a rep within it of a record
+# always falls in the record's date bucket or an adjacent one. The +2 covers
+# Timedelta.days flooring on timestamps with a time component.
+MAX_TOLERANCE_DAYS = max(
+    EVENT_EVENT_TOLERANCE_DAYS, EVENT_PUBLISH_TOLERANCE_DAYS, PUBLISH_PUBLISH_TOLERANCE_DAYS
+)
+DATE_BUCKET_DAYS = MAX_TOLERANCE_DAYS + 2
+
+
+def _date_bucket(d: pd.Timestamp) -> int:
+    return d.toordinal() // DATE_BUCKET_DAYS
 
+
+def cluster_records_greedy(records: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Reference implementation: each record is compared with the representative
+    (first record) of every existing cluster, in creation order. O(N * C).
+    """
     clusters: List[List[Dict[str, Any]]] = []
 
     for record in records:
@@ -189,39 +235,402 @@ def dedupe_events(df: pd.DataFrame) -> pd.DataFrame:
         if not matched:
             clusters.append([record])
 
+    return clusters
+
+
+class BlockingIndex:
+    """
+    (disruption_type, date bucket, location token) -> cluster ids, plus each
+    cluster rep's cached features (match date, location tokens).
+
+    A record can only match a rep that shares its type and a location token and
+    has a date within MAX_TOLERANCE_DAYS. So the only candidates are clusters in
+    the record's date bucket or the two adjacent ones. Candidates are checked in
+    id (= creation) order, so find() returns the cluster the greedy scan picks.
+    """
+
+    def __init__(self):
+        self.rep_features: Dict[int, Tuple[Tuple[pd.Timestamp, str], set]] = {}
+        self.index: Dict[Tuple[str, int, str], List[int]] = {}
+
+    def add(self, cid: int, rtype: str, match: Optional[Tuple[pd.Timestamp, str]], tokens: set) -> None:
+        # Reps without a date or location can never be matched; keep them out of the index
+        if match is None or not tokens:
+            return
+        self.rep_features[cid] = (match, tokens)
+        b = _date_bucket(match[0])
+        for tok in tokens:
+            self.index.setdefault((rtype, b, tok), []).append(cid)
+
+    def find(self, rtype: str, match: Optional[Tuple[pd.Timestamp, str]], tokens: set) -> Optional[int]:
+        if match is None or not tokens:
+            return None
+        rec_date, rec_src = match
+        b = _date_bucket(rec_date)
+
+        candidates = set()
+        for tok in tokens:
+            for bb in (b - 1, b, b + 1):
+                candidates.update(self.index.get((rtype, bb, tok), ()))
+
+        for cid in sorted(candidates):
+            (rep_date, rep_src), rep_tokens = self.rep_features[cid]
+            if not dates_close_asymmetric(rec_date, rec_src, rep_date, rep_src):
+                continue
+            if tokens & rep_tokens:
+                return cid
+        return None
+
+
+def record_features(record: Dict[str, Any]) -> Tuple[str, Optional[Tuple[pd.Timestamp, str]], set]:
+    return (
+        record["disruption_type"],
+        choose_match_date(record),
+        location_tokens(record.get("location_name", "")),
+    )
+
+
+def cluster_records_blocked(records: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Same clusters as cluster_records_greedy, using a BlockingIndex so each
+    record is only compared with nearby clusters. Rep features are computed
+    once per cluster.
+    """
+    clusters: List[List[Dict[str, Any]]] = []
+    index = BlockingIndex()
+
+    for record in records:
+        rtype, match, tokens = record_features(record)
+        cid = index.find(rtype, match, tokens)
+
+        if cid is None:
+            cid = len(clusters)
+            clusters.append([record])
+            index.add(cid, rtype, match, tokens)
+        else:
+            clusters[cid].append(record)
+
+    return clusters
+
+
+def cluster_records_union_find(records: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Transitive clustering: any two records that match (same type, dates within
+    tolerance, a shared location token) end up in the same event, so chains of
+    overlapping reports (A~B, B~C) are one event. The date test is
+    dates_close_symmetric, so the relation is symmetric and the clusters (as
+    sets of records) do not depend on input order.
+
+    Candidate pairs come from a record-level blocking index (same keys as
+    BlockingIndex) and are merged with union-find. Cost is linear in the number
+    of candidate pairs, i.e. near-linear while each (type, bucket, token) key
+    holds a bounded number of records. Pairs already in the same set skip the
+    date check.
+
+    Clusters are returned in order of their first record, members in input order.
+    """
+    parent = list(range(len(records)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            # smaller index as root, so a set's root is its first record
+            if rj < ri:
+                ri, rj = rj, ri
+            parent[rj] = ri
+
+    index: Dict[Tuple[str, int, str], List[int]] = {}
+    matches: Dict[int, Tuple[pd.Timestamp, str]] = {}
+
+    for i, record in enumerate(records):
+        rtype, match, tokens = record_features(record)
+        if match is None or not tokens:
+            continue
+        rec_date, rec_src = match
+        b = _date_bucket(rec_date)
+
+        checked = set()
+        for tok in tokens:
+            for bb in (b - 1, b, b + 1):
+                for j in index.get((rtype, bb, tok), ()):
+                    if j in checked:
+                        continue
+                    checked.add(j)
+                    if find(i) == find(j):
+                        continue
+                    rep_date, rep_src = matches[j]
+                    if dates_close_symmetric(rec_date, rec_src, rep_date, rep_src):
+                        union(i, j)
+
+        matches[i] = match
+        for tok in tokens:
+            index.setdefault((rtype, b, tok), []).append(i)
+
+    groups: Dict[int, List[Dict[str, Any]]] = {}
+    for i, record in enumerate(records):
+        groups.setdefault(find(i), []).append(record)
+
+    return [groups[root] for root in sorted(groups)]
+
+
+CLUSTERING_METHODS = {
+    "greedy": cluster_records_greedy,
+    "blocked": cluster_records_blocked,
+    "union_find": cluster_records_union_find,
+}
+
+
+def dedupe_events(df: pd.DataFrame, method: str = "blocked") -> pd.DataFrame:
+    records = df.to_dict(orient="records")
+    clusters = CLUSTERING_METHODS[method](records)
+
     merged_events = [merge_cluster(c) for c in clusters]
     return pd.DataFrame(merged_events)
 
 
+# ------------------ EVENT STORE (incremental) ------------------ #
+
+# One JSON line per consolidated event:
+#   {"event_id", "members": [raw extraction records], "event": merged fields}
+# members[0] is the cluster representative. Dates are ISO strings on disk.
+DEFAULT_EVENT_STORE = Path(__file__).resolve().parent.parent / "results" / "event_store.jsonl"
+
+DATE_FIELDS = ("event_date", "publish_date")
+
+
+def _to_json_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    out = {}
+    for k, v in record.items():
+        if isinstance(v, pd.Timestamp):
+            v = v.isoformat()
+        elif isinstance(v, float) and pd.isna(v):
+            v = None
+        elif v is pd.NaT:
+            v = None
+        out[k] = v
+    return out
+
+
+def _from_json_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(record)
+    for k in DATE_FIELDS:
+        out[k] = pd.Timestamp(out[k]) if out.get(k) else pd.NaT
+    return out
+
+
+def load_event_store(store_path: Path) -> List[Dict[str, Any]]:
+    """Events sorted by event_id, with member/merged dates as Timestamps."""
+    if not store_path.exists():
+        return []
+    events = []
+    with open(store_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            e = json.loads(line)
+            events.append({
+                "event_id": int(e["event_id"]),
+                "members": [_from_json_record(r) for r in e["members"]],
+                "event": _from_json_record(e["event"]),
+            })
+    events.sort(key=lambda e: e["event_id"])
+    return events
+
+
+def save_event_store(events: List[Dict[str, Any]], store_path: Path) -> None:
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = store_path.with_suffix(store_path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for e in events:
+            f.write(json.dumps({
+                "event_id": e["event_id"],
+                "members": [_to_json_record(r) for r in e["members"]],
+                "event": _to_json_record(e["event"]),
+            }, ensure_ascii=False) + "\n")
+    tmp.replace(store_path)
+
+
+def merge_into_event_store(
+    df_new: pd.DataFrame,
+    events: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], set]:
+    """
+    Adds new extraction rows to existing events (in place) or opens new ones.
+    Returns (events, ids of events that were created or changed).
+
+    Only "open" events are loaded into the BlockingIndex: those whose rep date
+    is in or after the bucket before the earliest new record's bucket. Older
+    events cannot match any new record (see BlockingIndex), so the result is
+    the same clustering cluster_records_blocked gives on all records at once,
+    as long as new extractions are appended in order.
+
+    URLs already in the store are skipped, so re-running a day is a no-op.
+    """
+    seen_urls = {r.get("url") for e in events for r in e["members"] if r.get("url")}
+    records = [
+        r for r in df_new.to_dict(orient="records")
+        if not r.get("url") or r.get("url") not in seen_urls
+    ]
+    if not records:
+        return events, set()
+
+    features = [record_features(r) for r in records]
+    new_dates = [m[0] for _, m, _ in features if m is not None]
+    cutoff = _date_bucket(min(new_dates)) - 1 if new_dates else None
+
+    # Slot = position in creation order, as in cluster_records_blocked
+    slots: List[Dict[str, Any]] = []
+    index = BlockingIndex()
+    if cutoff is not None:
+        for e in events:
+            rtype, match, tokens = record_features(e["members"][0])
+            if match is None or _date_bucket(match[0]) < cutoff:
+                continue
+            index.add(len(slots), rtype, match, tokens)
+            slots.append(e)
+
+    next_id = max((e["event_id"] for e in events), default=-1) + 1
+    touched = set()
+
+    for record, (rtype, match, tokens) in zip(records, features):
+        slot = index.find(rtype, match, tokens)
+        if slot is None:
+            event = {"event_id": next_id, "members": [record], "event": {}}
+            next_id += 1
+            events.append(event)
+            index.add(len(slots), rtype, match, tokens)
+            slots.append(event)
+        else:
+            event = slots[slot]
+            event["members"].append(record)
+        touched.add(event["event_id"])
+
+    for e in events:
+        if e["event_id"] in touched:
+            e["event"] = merge_cluster(e["members"])
+
+    return events, touched
+
+
+def events_to_frame(events: List[Dict[str, Any]]) -> pd.DataFrame:
+    return pd.DataFrame([{"event_id": e["event_id"], **e["event"]} for e in events])
+
+
 # ------------------ SAVE ------------------ #
 
-def save_outputs(df: pd.DataFrame, output_csv: Path, output_jsonl: Path):
-    df.to_csv(output_csv, index=False)
+# Columns holding lists/dicts: JSON-encoded in CSV (not Python repr) and Parquet
+JSON_COLUMNS = ("urls", "extras")
+
+
+# One shared encoder: json.dumps(..., ensure_ascii=False) builds a new one per call
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
 
+def _iso_dates(s: pd.Series) -> pd.Series:
+    """Vectorised Timestamp.isoformat() (microseconds only when non-zero); NaT -> None."""
+    vals = pd.to_datetime(s, errors="coerce").to_numpy(dtype="datetime64[us]")
+    iso = np.datetime_as_string(vals, unit="s")
+    frac = ~np.isnat(vals) & (vals.astype("int64") % 1_000_000 != 0)
+    if frac.any():
+        iso = np.where(frac, np.datetime_as_string(vals, unit="us"), iso)
+    return pd.Series(iso, index=s.index, dtype=object).where(~np.isnat(vals), None)
+
+
+def _json_column(s: pd.Series) -> pd.Series:
+    return s.map(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else _encode_json(v))
+
+
+def save_outputs(
+    df: pd.DataFrame,
+    output_csv: Path,
+    output_jsonl: Path,
+    output_parquet: Optional[Path] = None,
+):
+    out = df.copy()
+    for k in DATE_FIELDS:
+        if k in out.columns:
+            out[k] = _iso_dates(out[k])
+
+    # JSONL: one json.dumps per record, one write
     with open(output_jsonl, "w", encoding="utf-8") as f:
-        for _, row in df.iterrows():
-            record = row.to_dict()
-            for k in ("event_date", "publish_date"):
-                if isinstance(record.get(k), pd.Timestamp):
-                    record[k] = record[k].isoformat()
-                elif record.get(k) is None or pd.isna(record.get(k)):
-                    record[k] = None
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.writelines(_encode_json(r) + "\n" for r in out.to_dict(orient="records"))
+
+    encoded = df.copy()
+    for k in JSON_COLUMNS:
+        if k in encoded.columns:
+            encoded[k] = _json_column(encoded[k])
+
+    encoded.to_csv(output_csv, index=False)
+
+    # Parquet keeps urls as list<string> and dates as timestamps; extras is
+    # free-form (mixed value types per key), so it stays a JSON string
+    if output_parquet is not None:
+        pq = df.copy()
+        if "extras" in pq.columns:
+            pq["extras"] = encoded["extras"]
+        pq.to_parquet(output_parquet, index=False)
 
 
 # ------------------ PUBLIC ENTRY POINT ------------------ #
 
-def run_consolidation(input_path: Path) -> pd.DataFrame:
-    df_before = load_extractions(input_path)
+def run_consolidation(input_path: Path, df_before: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Dedupe input_path's extractions and save <input>Consolidated.*.
+    Pass df_before (from load_extractions) to skip re-reading the file.
+    """
+    if df_before is None:
+        df_before = load_extractions(input_path)
     df_after = dedupe_events(df_before)
 
     output_base = input_path.with_name(input_path.stem + "Consolidated")
 
     output_csv = output_base.with_suffix(".csv")
     output_jsonl = output_base.with_suffix(".jsonl")
+    output_parquet = output_base.with_suffix(".parquet")
+
+    save_outputs(df_after, output_csv, output_jsonl, output_parquet)
 
-    save_outputs(df_after, output_csv, output_jsonl)
+    print(f"Saved {output_csv.name}, {output_jsonl.name} and {output_parquet.name}")
 
-    print(f"Saved {output_csv.name} and {output_jsonl.name}")
+    return df_after
+
+def run_incremental_consolidation(
+    input_path: Path,
+    store_path: Path = DEFAULT_EVENT_STORE,
+    df_new: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Append mode: merge a new batch of extractions into the persistent event
+    store instead of re-clustering everything. Writes the updated store and
+    <store>Consolidated.csv/.jsonl/.parquet covering all events.
+    """
+    if df_new is None:
+        df_new = load_extractions(input_path)
+    events = load_event_store(store_path)
+    n_before = len(events)
+
+    events, touched = merge_into_event_store(df_new, events)
+    save_event_store(events, store_path)
+
+    df_after = events_to_frame(events)
+
+    output_base = store_path.with_name(store_path.stem + "Consolidated")
+    output_csv = output_base.with_suffix(".csv")
+    output_jsonl = output_base.with_suffix(".jsonl")
+    output_parquet = output_base.with_suffix(".parquet")
+    save_outputs(df_after, output_csv, output_jsonl, output_parquet)
+
+    n_new = len(events) - n_before
+    print(
+        f"Event store: {len(events)} events | {n_new} new | "
+        f"{len(touched) - n_new} updated | {store_path.name}"
+    )
+    print(f"Saved {output_csv.name}, {output_jsonl.name} and {output_parquet.name}")
 
-    return df_after
\ No newline at end of file
+    return df_after
@@ -115,13 +115,12 @@ def run_debugger_and_metrics(
 
     # ---- 5) Strict publish_date validation ----
     publish_non_null = df_before["publish_date"].dropna()
-    failures = 0
 
-    for v in publish_non_null:
-        try:
-            pd.to_datetime(v, utc=True, errors="raise")
-        except Exception:
-            failures += 1
+    # Typed frames (load_extractions) are already valid datetimes
+    if pd.api.types.is_datetime64_any_dtype(publish_non_null):
+        failures = 0
+    else:
+        failures = int(pd.to_datetime(publish_non_null, utc=True, errors="coerce").isna().sum())
 
     print("\n=== STRICT PUBLISH_DATE VALIDATION ===\n")
     print(f"Non-null publish_date values : {len(publish_non_null)}")
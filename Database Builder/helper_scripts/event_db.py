@@ -0,0 +1,543 @@
+"""
+Local event database (SQLite) for consolidated disruptions.
+
+Tables:
+  events           one row per consolidated event (merged fields, match date, country)
+  extractions      one row per source extraction (ExtractRecord fields) with its event_id
+  event_urls       event_id -> source URL
+  event_locations  event_id -> location token (same tokens consolidation matches on)
+
+Indexed on type + match date, match date, country, confidence, location token
+and URL, so typical filters answer in milliseconds without reading any JSONL:
+
+    db = EventDB()
+    db.query(disruption_type="flood", country="chile", period="2024-Q1", min_confidence=0.6)
+
+match_date is the event date, else the publish date (the date consolidation
+clusters on). country is the last comma-separated part of location_name;
+country filters also match location tokens, so "chile" finds "Valparaíso (Chile)".
+
+Every event row records its source: the extractions file it was consolidated
+from, or "event_store" for the incremental store. Loading a source replaces only
+that source's events, so the database accumulates weekly files instead of
+holding the last one:
+  load_consolidated()         events run_consolidation() already produced (no re-clustering)
+  rebuild_from_extractions()  cluster one extractions file (CLI)
+  sync_from_store()           mirror the incremental event store (its event ids)
+Events loaded from files get ids derived from the source and their URLs, so
+re-loading a file keeps the ids of unchanged events. A file may list the same
+URL more than once; its extraction row is attached to the first event that
+has it, and events with identical URL sets get distinct ids.
+
+Default location: <repo>/data/processed/events.sqlite
+Override with EVENT_DB_PATH.
+
+    python helper_scripts/event_db.py build --store results/event_store.jsonl
+    python helper_scripts/event_db.py build --input results/weekly_extractions_202601.jsonl
+    python helper_scripts/event_db.py query --type flood --country chile --period 2024-Q1 --min-confidence 0.6
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from helper_scripts.consolidateExtractions import (  # noqa: E402
+    CLUSTERING_METHODS,
+    DEFAULT_EVENT_STORE,
+    choose_match_date,
+    load_event_store,
+    load_extractions,
+    location_tokens,
+    merge_cluster,
+)
+
+
+# ------------------ CONFIG ------------------ #
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_DB_PATH = _REPO_ROOT / "data" / "processed" / "events.sqlite"
+
+EXTRACTION_FIELDS = [
+    "url", "source_title", "disruption_type", "event_date", "publish_date",
+    "location_name", "duration_hours", "extras", "confidence",
+    "text_tokens", "text_tokens_sent", "prompt_tokens", "cached_tokens",
+    "completion_tokens", "latency_s", "llm_cache_hit",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_id        INTEGER PRIMARY KEY,
+    disruption_type TEXT NOT NULL,
+    event_date      TEXT,
+    publish_date    TEXT,
+    match_date      TEXT,
+    location_name   TEXT,
+    country         TEXT,
+    num_articles    INTEGER,
+    source_title    TEXT,
+    duration_hours  REAL,
+    extras          TEXT,
+    confidence      REAL,
+    source          TEXT
+);
+CREATE TABLE IF NOT EXISTS extractions (
+    url               TEXT PRIMARY KEY,
+    event_id          INTEGER,
+    source_title      TEXT,
+    disruption_type   TEXT,
+    event_date        TEXT,
+    publish_date      TEXT,
+    location_name     TEXT,
+    duration_hours    REAL,
+    extras            TEXT,
+    confidence        REAL,
+    text_tokens       INTEGER,
+    text_tokens_sent  INTEGER,
+    prompt_tokens     INTEGER,
+    cached_tokens     INTEGER,
+    completion_tokens INTEGER,
+    latency_s         REAL,
+    llm_cache_hit     INTEGER
+);
+CREATE TABLE IF NOT EXISTS event_urls (
+    event_id INTEGER NOT NULL,
+    url      TEXT NOT NULL,
+    PRIMARY KEY (event_id, url)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS event_locations (
+    token    TEXT NOT NULL,
+    event_id INTEGER NOT NULL,
+    PRIMARY KEY (token, event_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_events_type_date ON events(disruption_type, match_date);
+CREATE INDEX IF NOT EXISTS idx_events_date ON events(match_date);
+CREATE INDEX IF NOT EXISTS idx_events_country ON events(country COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_events_confidence ON events(confidence);
+CREATE INDEX IF NOT EXISTS idx_extractions_event ON extractions(event_id);
+CREATE INDEX IF NOT EXISTS idx_event_urls_url ON event_urls(url);
+CREATE INDEX IF NOT EXISTS idx_event_locations_event ON event_locations(event_id);
+"""
+
+# Created after the migration below, so databases from before the source column still open
+SOURCE_INDEX = "CREATE INDEX IF NOT EXISTS idx_events_source ON events(source)"
+
+STORE_SOURCE = "event_store"
+
+EVENT_COLUMNS = [
+    "event_id", "disruption_type", "event_date", "publish_date", "match_date",
+    "location_name", "country", "num_articles", "source_title",
+    "duration_hours", "extras", "confidence", "source",
+]
+
+
+# ------------------ ROW HELPERS ------------------ #
+
+def _iso(v: Any) -> Optional[str]:
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    return str(v)
+
+
+def _num(v: Any) -> Any:
+    if v is None or (isinstance(v, float) and pd.isna(v)):
+        return None
+    return v
+
+
+def country_of(location: str) -> Optional[str]:
+    """Last comma-separated part of a location, without parenthesised notes."""
+    if not location:
+        return None
+    last = re.sub(r"\(.*?\)", "", str(location)).split(",")[-1].strip()
+    return last.lower() or None
+
+
+def stable_event_id(source: str, urls: List[str], n: int = 0) -> int:
+    """
+    Id for an event loaded from a file: hash of source + its sorted URLs (+ n,
+    the collision counter), kept above 2**60 so it never meets store ids.
+    """
+    key = "\n".join([source, *sorted(urls)] + ([f"#{n}"] if n else []))
+    return (1 << 60) | int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:14], 16)
+
+
+def file_events(
+    source: str, events: Iterable[Tuple[List[Dict[str, Any]], Dict[str, Any]]]
+) -> Iterable[Dict[str, Any]]:
+    """
+    (members, merged) pairs from one file -> events with unique stable ids.
+    A repeated id (same URL set) takes the next counter value, and each
+    extraction URL is kept only under the first event that has it.
+    """
+    taken, claimed = set(), set()
+    for members, merged in events:
+        urls = list(merged.get("urls") or [])
+        n, eid = 0, stable_event_id(source, urls)
+        while eid in taken:
+            n += 1
+            eid = stable_event_id(source, urls, n)
+        taken.add(eid)
+        own = [r for r in members if r.get("url") not in claimed]
+        claimed.update(r.get("url") for r in own if r.get("url"))
+        yield {"event_id": eid, "members": own, "event": merged}
+
+
+def _event_row(event_id: int, merged: Dict[str, Any], source: Optional[str] = None) -> Tuple:
+    match = choose_match_date(merged)
+    return (
+        event_id,
+        merged.get("disruption_type") or "unknown",
+        _iso(merged.get("event_date")),
+        _iso(merged.get("publish_date")),
+        match[0].strftime("%Y-%m-%d") if match else None,
+        merged.get("location_name") or "",
+        country_of(merged.get("location_name") or ""),
+        int(merged.get("num_articles") or 0),
+        merged.get("source_title") or "",
+        _num(merged.get("duration_hours")),
+        json.dumps(merged.get("extras") or {}, ensure_ascii=False),
+        _num(merged.get("confidence")),
+        source,
+    )
+
+
+def _extraction_row(event_id: int, r: Dict[str, Any]) -> Tuple:
+    row = {k: r.get(k) for k in EXTRACTION_FIELDS}
+    row["event_date"] = _iso(row["event_date"])
+    row["publish_date"] = _iso(row["publish_date"])
+    row["extras"] = json.dumps(row["extras"] if isinstance(row["extras"], dict) else {}, ensure_ascii=False)
+    hit = _num(row["llm_cache_hit"])
+    row["llm_cache_hit"] = None if hit is None else int(bool(hit))
+    return (row["url"], event_id) + tuple(_num(row[k]) for k in EXTRACTION_FIELDS[1:])
+
+
+def quarter_bounds(period: str) -> Tuple[str, str]:
+    """'2024-Q1' / '2024Q1' -> ('2024-01-01', '2024-03-31'); '2024' -> whole year; '2024-03' -> month."""
+    p = period.strip().upper().replace(" ", "")
+    m = re.fullmatch(r"(\d{4})-?Q([1-4])", p)
+    if m:
+        start = pd.Period(year=int(m.group(1)), quarter=int(m.group(2)), freq="Q")
+    elif re.fullmatch(r"\d{4}", p):
+        start = pd.Period(p, freq="Y")
+    elif re.fullmatch(r"\d{4}-\d{2}", p):
+        start = pd.Period(p, freq="M")
+    else:
+        raise ValueError(f"Unrecognised period {period!r} (use YYYY, YYYY-MM or YYYY-Qn)")
+    return start.start_time.strftime("%Y-%m-%d"), start.end_time.strftime("%Y-%m-%d")
+
+
+# ------------------ DATABASE ------------------ #
+
+class EventDB:
+    """
+    Thread-safe SQLite event database. One connection guarded by a lock;
+    opened lazily so importing modules does not touch the disk.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = str(path or os.getenv("EVENT_DB_PATH") or DEFAULT_DB_PATH)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            if "source" not in {row[1] for row in conn.execute("PRAGMA table_info(events)")}:
+                # Rows from before sources existed have positional ids and would
+                # duplicate the next load; the DB is a derived mirror, so drop them
+                conn.execute("ALTER TABLE events ADD COLUMN source TEXT")
+                for table in ("events", "extractions", "event_urls", "event_locations"):
+                    conn.execute(f"DELETE FROM {table}")
+            conn.execute(SOURCE_INDEX)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # ---- write ----
+
+    def upsert_events(
+        self,
+        events: Iterable[Dict[str, Any]],
+        replace: bool = True,
+        source: Optional[str] = None,
+    ) -> int:
+        """
+        events: {"event_id", "members": [extraction records], "event": merged fields}
+        (the event store format). Replaces any existing rows for those event ids
+        (replace=False skips that step, for loads into an empty database).
+        """
+        rows = self._rows(events, source)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if replace:
+                    for table in ("events", "extractions", "event_urls", "event_locations"):
+                        conn.executemany(f"DELETE FROM {table} WHERE event_id = ?", rows["ids"])
+                self._insert(conn, rows)
+        return len(rows["events"])
+
+    def replace_source(self, events: Iterable[Dict[str, Any]], source: str) -> int:
+        """Replace every event of `source` with `events` in one transaction; other sources are untouched."""
+        rows = self._rows(events, source)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for table in ("extractions", "event_urls", "event_locations"):
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE event_id IN (SELECT event_id FROM events WHERE source = ?)",
+                        (source,),
+                    )
+                conn.execute("DELETE FROM events WHERE source = ?", (source,))
+                self._insert(conn, rows)
+        return len(rows["events"])
+
+    @staticmethod
+    def _rows(events: Iterable[Dict[str, Any]], source: Optional[str]) -> Dict[str, List[Tuple]]:
+        rows: Dict[str, List[Tuple]] = {"ids": [], "events": [], "extractions": [], "urls": [], "locations": []}
+        for e in events:
+            eid = int(e["event_id"])
+            merged = e.get("event") or merge_cluster(e["members"])
+            rows["ids"].append((eid,))
+            rows["events"].append(_event_row(eid, merged, source))
+            for r in e["members"]:
+                if r.get("url"):
+                    rows["extractions"].append(_extraction_row(eid, r))
+            rows["urls"].extend((eid, u) for u in (merged.get("urls") or []))
+            rows["locations"].extend((tok, eid) for tok in location_tokens(merged.get("location_name") or ""))
+        return rows
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, rows: Dict[str, List[Tuple]]) -> None:
+        conn.executemany(f"INSERT INTO events VALUES ({','.join('?' * len(EVENT_COLUMNS))})", rows["events"])
+        conn.executemany(
+            f"INSERT OR REPLACE INTO extractions (url, event_id, {', '.join(EXTRACTION_FIELDS[1:])})"
+            f" VALUES ({','.join('?' * (len(EXTRACTION_FIELDS) + 1))})",
+            rows["extractions"],
+        )
+        conn.executemany("INSERT OR IGNORE INTO event_urls VALUES (?, ?)", rows["urls"])
+        conn.executemany("INSERT OR IGNORE INTO event_locations VALUES (?, ?)", rows["locations"])
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for table in ("events", "extractions", "event_urls", "event_locations"):
+                    conn.execute(f"DELETE FROM {table}")
+
+    def sync_from_store(self, store_path: Path = DEFAULT_EVENT_STORE) -> int:
+        """Mirror the incremental event store (event ids are stable across runs)."""
+        return self.replace_source(load_event_store(Path(store_path)), STORE_SOURCE)
+
+    def load_consolidated(self, df_after: pd.DataFrame, df_before: pd.DataFrame, source: str) -> int:
+        """
+        Load the events a consolidation run already produced (df_after, one row
+        per event with its "urls") without clustering again. Members are the
+        df_before records with those URLs. Replaces only `source`'s events.
+        """
+        by_url: Dict[str, List[Dict[str, Any]]] = {}
+        for r in df_before.to_dict(orient="records"):
+            if r.get("url"):
+                by_url.setdefault(r["url"], []).append(r)
+
+        pairs = (
+            ([r for u in dict.fromkeys(merged.get("urls") or []) for r in by_url.get(u, ())], merged)
+            for merged in df_after.to_dict(orient="records")
+        )
+        return self.replace_source(file_events(source, pairs), source)
+
+    def rebuild_from_extractions(
+        self,
+        input_path: Optional[Path] = None,
+        df_before: Optional[pd.DataFrame] = None,
+        method: str = "blocked",
+        source: Optional[str] = None,
+    ) -> int:
+        """Cluster one extractions file (or loaded frame) and replace that file's events."""
+        if df_before is None:
+            df_before = load_extractions(Path(input_path))
+        source = source or (Path(input_path).name if input_path is not None else "extractions")
+        clusters = CLUSTERING_METHODS[method](df_before.to_dict(orient="records"))
+        return self.replace_source(file_events(source, ((c, merge_cluster(c)) for c in clusters)), source)
+
+    # ---- read ----
+
+    def query(
+        self,
+        disruption_type: Optional[str] = None,
+        country: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        period: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        include_urls: bool = True,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Events matching every given filter, newest first.
+        start/end are inclusive 'YYYY-MM-DD' bounds on match_date; period
+        ('2024-Q1', '2024-03', '2024') sets both.
+
+        Sources are not merged with each other: an event loaded from a weekly
+        file and the same event mirrored from the incremental store ("source"
+        = "event_store") are separate rows, so a database holding both counts
+        it twice. Group on the returned "source" column when counting.
+        """
+        if period:
+            start, end = quarter_bounds(period)
+
+        where, params = [], []
+        if disruption_type:
+            where.append("e.disruption_type = ?")
+            params.append(disruption_type.strip().lower())
+        if country:
+            c = country.strip().lower()
+            where.append(
+                "(e.country = ? COLLATE NOCASE OR e.event_id IN "
+                "(SELECT event_id FROM event_locations WHERE token = ?))"
+            )
+            params.extend([c, c])
+        if start:
+            where.append("e.match_date >= ?")
+            params.append(start)
+        if end:
+            where.append("e.match_date <= ?")
+            params.append(end)
+        if min_confidence is not None:
+            where.append("e.confidence >= ?")
+            params.append(float(min_confidence))
+
+        sql = f"SELECT {', '.join('e.' + c for c in EVENT_COLUMNS)} FROM events e"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.match_date DESC, e.event_id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(sql, params).fetchall()
+            urls: Dict[int, List[str]] = {}
+            if include_urls and rows:
+                ids = [r[0] for r in rows]
+                for i in range(0, len(ids), 900):  # SQLite parameter limit
+                    chunk = ids[i:i + 900]
+                    for eid, url in conn.execute(
+                        f"SELECT event_id, url FROM event_urls WHERE event_id IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ):
+                        urls.setdefault(eid, []).append(url)
+
+        df = pd.DataFrame(rows, columns=EVENT_COLUMNS)
+        df["extras"] = df["extras"].map(lambda s: json.loads(s) if s else {})
+        for k in ("event_date", "publish_date", "match_date"):
+            df[k] = pd.to_datetime(df[k], errors="coerce", utc=True).dt.tz_convert(None)
+        if include_urls:
+            df["urls"] = df["event_id"].map(lambda i: sorted(urls.get(i, [])))
+        return df
+
+    def extractions_for(self, event_id: int) -> pd.DataFrame:
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                f"SELECT url, {', '.join(EXTRACTION_FIELDS[1:])} FROM extractions WHERE event_id = ?",
+                (int(event_id),),
+            ).fetchall()
+        return pd.DataFrame(rows, columns=EXTRACTION_FIELDS)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            conn = self._connect()
+            return {
+                t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                for t in ("events", "extractions", "event_urls", "event_locations")
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (
+            f"Event DB: {s['events']} events | {s['extractions']} extractions | "
+            f"{s['event_urls']} URLs | {self.path}"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ------------------ CLI ------------------ #
+
+def main():
+    parser = argparse.ArgumentParser(description="Local disruption event database")
+    parser.add_argument("--db", default=None, help="SQLite path (default: data/processed/events.sqlite)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="load events into the database")
+    src = b.add_mutually_exclusive_group()
+    src.add_argument("--store", default=None, help="incremental event store JSONL")
+    src.add_argument("--input", default=None, help="extractions JSONL/CSV to cluster")
+    b.add_argument("--method", default="blocked", choices=list(CLUSTERING_METHODS))
+
+    q = sub.add_parser("query", help="filter events")
+    q.add_argument("--type", dest="disruption_type", default=None)
+    q.add_argument("--country", default=None)
+    q.add_argument("--period", default=None, help="YYYY, YYYY-MM or YYYY-Qn")
+    q.add_argument("--start", default=None)
+    q.add_argument("--end", default=None)
+    q.add_argument("--min-confidence", type=float, default=None)
+    q.add_argument("--limit", type=int, default=50)
+
+    args = parser.parse_args()
+    db = EventDB(args.db)
+
+    if args.cmd == "build":
+        t0 = time.perf_counter()
+        if args.input:
+            n = db.rebuild_from_extractions(Path(args.input), method=args.method)
+        else:
+            n = db.sync_from_store(Path(args.store) if args.store else DEFAULT_EVENT_STORE)
+        print(f"Loaded {n} events in {time.perf_counter() - t0:.2f}s")
+        print(db.summary())
+        return
+
+    t0 = time.perf_counter()
+    df = db.query(
+        disruption_type=args.disruption_type,
+        country=args.country,
+        start=args.start,
+        end=args.end,
+        period=args.period,
+        min_confidence=args.min_confidence,
+        limit=args.limit,
+    )
+    ms = (time.perf_counter() - t0) * 1000
+    cols = ["event_id", "disruption_type", "match_date", "location_name", "confidence", "num_articles"]
+    print(df[cols].to_string(index=False) if len(df) else "No matching events.")
+    print(f"\n{len(df)} events in {ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Three-stage extraction pipeline: fetch (threads) -> parse (processes) -> LLM (threads).
+
+Before this, one thread did fetch + parse + LLM call per URL. Parsing
+(lxml/trafilatura/newspaper) holds the GIL, so it stalled the other I/O-bound
+threads. Here each stage has its own workers, joined by bounded queues:
+
+    urls -> [fetch threads] -> parse_q -> [process pool] -> llm_q -> [LLM threads] -> on_result
+
+Bounded queues give backpressure: if the LLM stage is rate limited, parsing
+and fetching pause instead of piling articles up in memory.
+
+Fetching goes through the article store, so cached pages skip the network and,
+if their parsed fields are current, skip the parse stage too.
+
+The LLM step is passed in (llm_fn) so this module does not import
+DisruptionExtractor; on_result is called from LLM threads and must be thread-safe.
+
+No worker lets an exception escape: a failing store write, llm_fn or on_result
+call is reported as that URL's error, and the stage sentinels are sent from
+finally blocks, so one bad item cannot stall the queues and hang the run.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import random
+import threading
+import time
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from helper_scripts.webscraper import (
+    PARSER_VERSION,
+    article_store,
+    fetch_html,
+    parse_article_html,
+)
+
+
+# ------------------ CONFIG ------------------ #
+
+N_FETCH_THREADS = 16
+N_PARSE_PROCS = max(1, (os.cpu_count() or 2) - 1)
+N_LLM_THREADS = 20
+QUEUE_SIZE = 64                       # per inter-stage queue
+PARSE_INFLIGHT_PER_PROC = 2
+FETCH_JITTER_S = (0.15, 0.45)         # same gentle jitter as extract_article_text
+
+_DONE = object()
+
+
+# ------------------ STAGE STATS ------------------ #
+
+@dataclass
+class StageStats:
+    name: str
+    n_ok: int = 0
+    n_err: int = 0
+    n_skipped: int = 0                # fetch: served from the article store
+    busy_s: float = 0.0               # summed worker time
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, busy_s: float, ok: bool = True) -> None:
+        with self._lock:
+            self.busy_s += busy_s
+            if ok:
+                self.n_ok += 1
+            else:
+                self.n_err += 1
+
+    def skip(self) -> None:
+        with self._lock:
+            self.n_skipped += 1
+
+    def summary(self, wall_s: float) -> str:
+        done = self.n_ok + self.n_err
+        per_min = done / wall_s * 60 if wall_s > 0 else 0.0
+        avg = self.busy_s / done if done else 0.0
+        return (
+            f"{self.name:<6}: {self.n_ok} ok | {self.n_err} err | {self.n_skipped} skipped | "
+            f"{per_min:7.1f} items/min | {avg:6.2f}s avg per item"
+        )
+
+
+# ------------------ WORKERS ------------------ #
+
+def _timed_parse(html: str, url: str):
+    """Runs in a worker process."""
+    t0 = time.process_time()
+    parsed = parse_article_html(html, url)
+    return parsed, time.process_time() - t0
+
+
+def _report(on_result: Callable, url: str, data: Optional[Dict[str, Any]], err: Optional[str]) -> None:
+    """Call on_result without letting its exceptions kill the calling worker."""
+    try:
+        on_result(url, data, err)
+        return
+    except Exception as e:
+        failure = f"on_result_error: {e}"
+    if data is not None:
+        # The result could not be recorded; try to record the URL as an error instead
+        try:
+            on_result(url, None, failure)
+            return
+        except Exception:
+            pass
+    print(f"[pipeline] could not report {url}: {failure}")
+
+
+def _fetch_worker(
+    url_q: queue.Queue,
+    parse_q: queue.Queue,
+    llm_q: queue.Queue,
+    on_result: Callable,
+    stats: StageStats,
+    use_store: bool,
+    timeout: int,
+) -> None:
+    while True:
+        url = url_q.get()
+        if url is _DONE:
+            return
+        try:
+            _fetch_one(url, parse_q, llm_q, on_result, stats, use_store, timeout)
+        except Exception as e:
+            stats.record(0.0, ok=False)
+            _report(on_result, url, None, f"fetch_error: {e}")
+
+
+def _fetch_one(url, parse_q, llm_q, on_result, stats, use_store, timeout) -> None:
+    if use_store:
+        cached = article_store.get(url)
+        if cached is not None and cached["html"]:
+            stats.skip()
+            if cached["parser_version"] == PARSER_VERSION:
+                llm_q.put((url, {
+                    "url": url,
+                    "title": cached["title"] or "",
+                    "text": cached["text"] or "",
+                    "publish_date": cached["publish_date"],
+                }))
+            else:
+                parse_q.put((url, cached["html"], False))
+            return
+
+    time.sleep(random.uniform(*FETCH_JITTER_S))
+    t0 = time.time()
+    html = fetch_html(url, timeout=timeout)
+    stats.record(time.time() - t0, ok=bool(html))
+
+    if html:
+        parse_q.put((url, html, True))
+        return
+
+    stale = article_store.get(url, allow_stale=True) if use_store else None
+    if stale is not None and stale["html"]:
+        parse_q.put((url, stale["html"], False))
+    else:
+        _report(on_result, url, None, "fetch_failed")
+
+
+def _parse_dispatcher(
+    parse_q: queue.Queue,
+    llm_q: queue.Queue,
+    on_result: Callable,
+    stats: StageStats,
+    pool: ProcessPoolExecutor,
+    max_inflight: int,
+    use_store: bool,
+    n_llm: int,
+) -> None:
+    inflight: Dict[Any, tuple] = {}
+    item: Any = None
+
+    def _drain(block_until_below: int) -> None:
+        while len(inflight) > block_until_below:
+            done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+            for fut in done:
+                url, html, fresh = inflight.pop(fut)
+                try:
+                    parsed, cpu_s = fut.result()
+                except Exception as e:
+                    stats.record(0.0, ok=False)
+                    _report(on_result, url, None, f"parse_error: {e}")
+                    continue
+                stats.record(cpu_s, ok=True)
+                if use_store:
+                    try:
+                        if fresh:
+                            article_store.put(url, html, parsed, PARSER_VERSION)
+                        else:
+                            article_store.update_parsed(url, parsed, PARSER_VERSION)
+                    except Exception as e:  # e.g. database locked / disk full
+                        _report(on_result, url, None, f"store_error: {e}")
+                        continue
+                llm_q.put((url, parsed))
+
+    try:
+        while True:
+            item = parse_q.get()
+            if item is _DONE:
+                break
+            url, html, fresh = item
+            try:
+                inflight[pool.submit(_timed_parse, html, url)] = (url, html, fresh)
+            except Exception as e:  # e.g. broken pool; keep draining so nothing deadlocks
+                stats.record(0.0, ok=False)
+                _report(on_result, url, None, f"parse_error: {e}")
+                continue
+            _drain(max_inflight - 1)
+
+        _drain(0)
+    except Exception as e:
+        # Unexpected dispatcher failure: fail what is in flight, then keep consuming
+        # parse_q until the fetchers finish so none of them blocks on a full queue
+        for url, _html, _fresh in inflight.values():
+            _report(on_result, url, None, f"parse_error: {e}")
+        inflight.clear()
+        while item is not _DONE:
+            item = parse_q.get()
+            if item is not _DONE:
+                _report(on_result, item[0], None, f"parse_error: {e}")
+    finally:
+        for _ in range(n_llm):
+            llm_q.put(_DONE)
+
+
+def _llm_worker(
+    llm_q: queue.Queue,
+    llm_fn: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+    on_result: Callable,
+    stats: StageStats,
+) -> None:
+    while True:
+        item = llm_q.get()
+        if item is _DONE:
+            return
+        url, art = item
+        t0 = time.time()
+        try:
+            data = llm_fn(url, art)
+        except Exception as e:
+            stats.record(time.time() - t0, ok=False)
+            _report(on_result, url, None, str(e))
+            continue
+        stats.record(time.time() - t0, ok=True)
+        _report(on_result, url, data, None)
+
+
+# ------------------ ENTRY POINT ------------------ #
+
+def run_extraction_pipeline(
+    urls: List[str],
+    llm_fn: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+    on_result: Callable[[str, Optional[Dict[str, Any]], Optional[str]], None],
+    n_fetch: int = N_FETCH_THREADS,
+    n_parse: int = N_PARSE_PROCS,
+    n_llm: int = N_LLM_THREADS,
+    queue_size: int = QUEUE_SIZE,
+    use_store: bool = True,
+    timeout: int = 20,
+) -> Dict[str, StageStats]:
+    """
+    Run every URL through fetch -> parse -> llm_fn. on_result(url, data, error)
+    is called exactly once per URL. Returns per-stage stats.
+    """
+    stats = {name: StageStats(name) for name in ("fetch", "parse", "llm")}
+    if not urls:
+        return stats
+
+    url_q: queue.Queue = queue.Queue()
+    parse_q: queue.Queue = queue.Queue(maxsize=queue_size)
+    llm_q: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    for u in urls:
+        url_q.put(u)
+    for _ in range(n_fetch):
+        url_q.put(_DONE)
+
+    t_start = time.time()
+
+    # spawn: worker processes must not inherit the running fetch/LLM threads
+    with ProcessPoolExecutor(max_workers=n_parse, mp_context=multiprocessing.get_context("spawn")) as pool:
+        fetchers = [
+            threading.Thread(
+                target=_fetch_worker,
+                args=(url_q, parse_q, llm_q, on_result, stats["fetch"], use_store, timeout),
+                daemon=True,
+            )
+            for _ in range(n_fetch)
+        ]
+        dispatcher = threading.Thread(
+            target=_parse_dispatcher,
+            args=(parse_q, llm_q, on_result, stats["parse"], pool, n_parse * PARSE_INFLIGHT_PER_PROC, use_store, n_llm),
+            daemon=True,
+        )
+        llm_workers = [
+            threading.Thread(target=_llm_worker, args=(llm_q, llm_fn, on_result, stats["llm"]), daemon=True)
+            for _ in range(n_llm)
+        ]
+
+        for t in fetchers + [dispatcher] + llm_workers:
+            t.start()
+
+        for t in fetchers:
+            t.join()
+        parse_q.put(_DONE)
+        dispatcher.join()
+        for t in llm_workers:
+            t.join()
+
+    wall = time.time() - t_start
+    print(f"\nPipeline wall time: {wall:.1f}s ({len(urls) / wall * 60:.1f} URLs/min)")
+    for s in stats.values():
+        print("  " + s.summary(wall))
+    return stats
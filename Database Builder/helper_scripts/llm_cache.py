@@ -0,0 +1,113 @@
+"""
+Content-addressed cache for LLM responses (SQLite).
+
+Key = sha256 over (model, system prompt, user prompt, output schema/format), so
+  - re-running a batch re-pays nothing for URLs that were already answered
+  - a prompt tweak only misses for the items whose prompt actually changed
+  - a crash mid-run costs nothing on restart
+
+Only raw response text is stored; callers keep their own parsing/validation.
+Shared by DisruptionExtractor.py (extraction) and
+Relevant News Retrieval/label_disruptions_multiexpert.py (labelling).
+
+Default location: <repo>/data/cache/llm_responses.sqlite
+Override with LLM_CACHE_PATH; disable with LLM_CACHE_DISABLE=1.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+# ------------------ CONFIG ------------------ #
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CACHE_PATH = os.path.join(_REPO_ROOT, "data", "cache", "llm_responses.sqlite")
+
+
+# ------------------ KEY ------------------ #
+
+def cache_key(model: str, system: str, user: str, schema: Any = None) -> str:
+    payload = json.dumps([model, system, user, schema], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ------------------ CACHE ------------------ #
+
+class LLMCache:
+    """
+    Thread-safe SQLite key/value store: key -> (model, response text).
+
+    One connection guarded by a lock; fine for worker threads and for
+    asyncio code (lookups are sub-millisecond next to an API call).
+    """
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = True):
+        self.path = path or os.getenv("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH
+        self.enabled = enabled and os.getenv("LLM_CACHE_DISABLE", "") not in ("1", "true", "yes")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._connect().execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, model: str = "") -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, response, time.time()),
+            )
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return f"LLM cache: {s['hits']} hits | {s['misses']} misses | hit rate {s['hit_rate']:.1%}"
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
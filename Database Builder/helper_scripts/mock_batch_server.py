@@ -0,0 +1,192 @@
+"""
+Local mock of the OpenAI Files + Batches endpoints for testing batch mode.
+
+Supports:
+  POST /v1/files                 (multipart upload, purpose=batch)
+  GET  /v1/files/{id}/content
+  POST /v1/batches
+  GET  /v1/batches/{id}          (in_progress on first poll, then completed)
+
+Replies are schema-driven so callers can parse them:
+  - /v1/responses with a json_schema format -> 0 for every schema property
+  - /v1/chat/completions                   -> an "unknown" extraction record
+
+Usage:
+    python helper_scripts/mock_batch_server.py --port 8765
+    OPENAI_BATCH_BASE_URL=http://127.0.0.1:8765/v1 python DisruptionExtractor.py --batch-api
+"""
+
+from __future__ import annotations
+
+import argparse
+import email
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+
+FILES: Dict[str, Dict[str, Any]] = {}
+BATCHES: Dict[str, Dict[str, Any]] = {}
+_LOCK = threading.Lock()
+
+UNKNOWN_EXTRACTION = {
+    "disruption_type": "unknown",
+    "event_date": None,
+    "location_name": "",
+    "duration_hours": None,
+    "extras": {},
+    "confidence": 0.0,
+}
+
+
+# ------------------ MOCK REPLIES ------------------ #
+
+def _mock_body(endpoint: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+    if endpoint.endswith("/responses"):
+        schema = (((body.get("text") or {}).get("format") or {}).get("schema") or {})
+        payload = {k: 0 for k in (schema.get("properties") or {})}
+        return {
+            "id": f"resp_{uuid.uuid4().hex[:12]}",
+            "object": "response",
+            "status": "completed",
+            "model": body.get("model"),
+            "output": [{
+                "type": "message",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": json.dumps(payload)}],
+            }],
+            "usage": {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0},
+        }
+
+    return {
+        "id": f"chatcmpl_{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "model": body.get("model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": json.dumps(UNKNOWN_EXTRACTION)},
+            "finish_reason": "stop",
+        }],
+        "usage": usage,
+    }
+
+
+def _file_obj(fid: str) -> Dict[str, Any]:
+    f = FILES[fid]
+    return {
+        "id": fid, "object": "file", "bytes": len(f["content"]), "created_at": f["created_at"],
+        "filename": f["filename"], "purpose": f["purpose"], "status": "processed",
+    }
+
+
+def _store_file(content: bytes, filename: str, purpose: str) -> str:
+    fid = f"file-{uuid.uuid4().hex[:16]}"
+    FILES[fid] = {"content": content, "filename": filename, "purpose": purpose, "created_at": int(time.time())}
+    return fid
+
+
+def _run_batch(batch: Dict[str, Any]) -> None:
+    lines = FILES[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+    out = []
+    for line in lines:
+        if not line.strip():
+            continue
+        req = json.loads(line)
+        out.append(json.dumps({
+            "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+            "custom_id": req["custom_id"],
+            "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": _mock_body(req["url"], req["body"])},
+            "error": None,
+        }))
+    batch["output_file_id"] = _store_file(("\n".join(out) + "\n").encode("utf-8"), "output.jsonl", "batch_output")
+    batch["request_counts"] = {"total": len(out), "completed": len(out), "failed": 0}
+    batch["status"] = "completed"
+    batch["completed_at"] = int(time.time())
+
+
+# ------------------ HTTP ------------------ #
+
+class Handler(BaseHTTPRequestHandler):
+    def _send(self, code: int, payload: Any, raw: bool = False) -> None:
+        data = payload if raw else json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/octet-stream" if raw else "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_POST(self):
+        body = self._body()
+        with _LOCK:
+            if self.path.rstrip("/").endswith("/files"):
+                msg = email.message_from_bytes(
+                    b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+                )
+                content, filename, purpose = b"", "input.jsonl", "batch"
+                for part in msg.walk():
+                    name = part.get_param("name", header="content-disposition")
+                    if name == "file":
+                        content = part.get_payload(decode=True) or b""
+                        filename = part.get_filename() or filename
+                    elif name == "purpose":
+                        purpose = (part.get_payload(decode=True) or b"batch").decode()
+                fid = _store_file(content, filename, purpose)
+                return self._send(200, _file_obj(fid))
+
+            if self.path.rstrip("/").endswith("/batches"):
+                req = json.loads(body or b"{}")
+                bid = f"batch_{uuid.uuid4().hex[:16]}"
+                BATCHES[bid] = {
+                    "id": bid, "object": "batch", "endpoint": req.get("endpoint"),
+                    "input_file_id": req.get("input_file_id"), "completion_window": req.get("completion_window", "24h"),
+                    "status": "validating", "created_at": int(time.time()), "output_file_id": None,
+                    "error_file_id": None, "metadata": req.get("metadata") or {},
+                    "request_counts": {"total": 0, "completed": 0, "failed": 0},
+                }
+                return self._send(200, BATCHES[bid])
+
+        return self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    def do_GET(self):
+        with _LOCK:
+            m = re.search(r"/files/([^/]+)/content$", self.path)
+            if m and m.group(1) in FILES:
+                return self._send(200, FILES[m.group(1)]["content"], raw=True)
+
+            m = re.search(r"/batches/([^/?]+)$", self.path)
+            if m and m.group(1) in BATCHES:
+                b = BATCHES[m.group(1)]
+                if b["status"] == "validating":
+                    b["status"] = "in_progress"
+                elif b["status"] == "in_progress":
+                    _run_batch(b)
+                return self._send(200, b)
+
+        return self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI batch server")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"Mock batch server on http://127.0.0.1:{args.port}/v1")
+    ThreadingHTTPServer(("127.0.0.1", args.port), Handler).serve_forever()
@@ -6,15 +6,138 @@ Creates:
 1) Bar chart of disruption type counts (known only)
 2) Confidence score distribution
 
+Plots are drawn from a small aggregation layer (per-type counts, confidence
+histogram, coverage stats) computed from the consolidated table and saved to
+plots/aggregates.json, so plots/reports can be refreshed with
+render_from_cache() without loading the event table.
+
+Figures are drawn headless with the object-oriented Figure API (Agg canvas, no
+pyplot global state).
+
 Saves plots to:
     project_root/plots/
 """
 
 from __future__ import annotations
 
+import json
 from pathlib import Path
-import matplotlib.pyplot as plt
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
+from matplotlib.figure import Figure
+
+
+# ------------------ CONFIG ------------------ #
+
+AGGREGATES_FILENAME = "aggregates.json"
+AGGREGATES_VERSION = 1
+CONFIDENCE_BINS = 20
+
+
+# ------------------ AGGREGATION ------------------ #
+
+def compute_aggregates(df_consolidated: pd.DataFrame) -> Dict[str, Any]:
+    known = df_consolidated[df_consolidated["disruption_type"].fillna("unknown") != "unknown"]
+
+    type_counts = known["disruption_type"].value_counts().sort_values(ascending=False)
+
+    confidence = pd.to_numeric(known["confidence"], errors="coerce").dropna()
+    if len(confidence):
+        counts, edges = np.histogram(confidence.to_numpy(), bins=CONFIDENCE_BINS)
+    else:
+        counts, edges = np.array([], dtype=int), np.array([])
+
+    has_location = known["location_name"].notna() & (known["location_name"].astype(str).str.strip() != "")
+    has_event = known["event_date"].notna()
+    has_publish = known["publish_date"].notna()
+
+    return {
+        "version": AGGREGATES_VERSION,
+        "n_events": int(len(df_consolidated)),
+        "n_known": int(len(known)),
+        "type_counts": {str(k): int(v) for k, v in type_counts.items()},
+        "confidence_hist": {"counts": counts.tolist(), "edges": edges.tolist()},
+        "coverage": {
+            "location": int(has_location.sum()),
+            "event_date": int(has_event.sum()),
+            "publish_date": int(has_publish.sum()),
+            "any_date": int((has_event | has_publish).sum()),
+        },
+    }
+
+
+def load_aggregates(plots_dir: Path) -> Optional[Dict[str, Any]]:
+    path = plots_dir / AGGREGATES_FILENAME
+    if not path.exists():
+        return None
+    try:
+        agg = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return agg if agg.get("version") == AGGREGATES_VERSION else None
+
+
+def save_aggregates(agg: Dict[str, Any], plots_dir: Path) -> Path:
+    path = plots_dir / AGGREGATES_FILENAME
+    path.write_text(json.dumps(agg, indent=2), encoding="utf-8")
+    return path
+
+
+# ------------------ RENDERERS ------------------ #
+
+def _plot_type_counts(agg: Dict[str, Any], path: Path) -> Path:
+    labels = list(agg["type_counts"])
+    values = list(agg["type_counts"].values())
+
+    fig = Figure()
+    ax = fig.subplots()
+    ax.bar(range(len(labels)), values, width=0.5)
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels, rotation=45, ha="right")
+    ax.set_title("Disruption Type Counts (Consolidated, Known Only)")
+    ax.set_xlabel("Disruption Type")
+    ax.set_ylabel("Count")
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+def _plot_confidence(agg: Dict[str, Any], path: Path) -> Path:
+    counts = agg["confidence_hist"]["counts"]
+    edges = agg["confidence_hist"]["edges"]
+
+    fig = Figure()
+    ax = fig.subplots()
+    if counts:
+        ax.hist(edges[:-1], bins=edges, weights=counts)
+    ax.set_title("Confidence Score Distribution (Consolidated, Known Only)")
+    ax.set_xlabel("Confidence Score")
+    ax.set_ylabel("Frequency")
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+PLOTS: List[Tuple[str, Callable[[Dict[str, Any], Path], Path]]] = [
+    ("disruption_type_counts.png", _plot_type_counts),
+    ("confidence_distribution.png", _plot_confidence),
+]
+
+
+def render_plots(agg: Dict[str, Any], plots_dir: Path) -> List[Path]:
+    """Render every plot in PLOTS from the aggregates."""
+    return [fn(agg, plots_dir / name) for name, fn in PLOTS]
+
+
+def render_from_cache(project_root: Path) -> List[Path]:
+    """Refresh plots from plots/aggregates.json without loading the event table."""
+    plots_dir = project_root / "plots"
+    agg = load_aggregates(plots_dir)
+    if agg is None:
+        raise FileNotFoundError(f"No aggregates cache in {plots_dir} (run run_plots first)")
+    return render_plots(agg, plots_dir)
 
 
 # ------------------ PUBLIC ENTRY POINT ------------------ #
@@ -38,54 +161,19 @@ def run_plots(
     plots_dir = project_root / "plots"
     plots_dir.mkdir(exist_ok=True)
 
-    # ---- Filter to known disruptions only ---- #
-    df = df_consolidated.copy()
-    df = df[df["disruption_type"].fillna("unknown") != "unknown"]
+    agg = compute_aggregates(df_consolidated)
+    print(f"Aggregates: {save_aggregates(agg, plots_dir)}")
 
-    if len(df) == 0:
+    if agg["n_known"] == 0:
         print("No known disruptions to plot.")
         return
 
-    # ==============================
-    # 1) BAR CHART – TYPE COUNTS
-    # ==============================
-
-    type_counts = (
-        df["disruption_type"]
-        .value_counts()
-        .sort_values(ascending=False)
-    )
-
-    plt.figure()
-    type_counts.plot(kind="bar")
-    plt.title("Disruption Type Counts (Consolidated, Known Only)")
-    plt.xlabel("Disruption Type")
-    plt.ylabel("Count")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-
-    type_path = plots_dir / "disruption_type_counts.png"
-    plt.savefig(type_path)
-    plt.close()
-
-    print(f"Saved: {type_path}")
-
-
-    # ======================================
-    # 2) CONFIDENCE SCORE DISTRIBUTION
-    # ======================================
-
-    df["confidence"] = pd.to_numeric(df["confidence"], errors="coerce")
+    for path in render_plots(agg, plots_dir):
+        print(f"Saved: {path}")
 
-    plt.figure()
-    plt.hist(df["confidence"].dropna(), bins=20)
-    plt.title("Confidence Score Distribution (Consolidated, Known Only)")
-    plt.xlabel("Confidence Score")
-    plt.ylabel("Frequency")
-    plt.tight_layout()
 
-    conf_path = plots_dir / "confidence_distribution.png"
-    plt.savefig(conf_path)
-    plt.close()
+# ------------------ STANDALONE SUPPORT ------------------ #
 
-    print(f"Saved: {conf_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    for p in render_from_cache(Path(__file__).resolve().parents[1]):
+        print(f"Saved: {p}")
@@ -0,0 +1,173 @@
+"""
+Token-budgeted trimming of article text before it goes into the extraction prompt.
+
+Disruption facts are almost always in the lead paragraphs; live blogs and long
+features mostly add tokens and latency. trim_to_budget keeps:
+  1) the lead, up to LEAD_FRACTION of the budget
+  2) then any later sentence that mentions a disruption keyword, in article order
+until the budget is used. Dropped spans are marked with "[...]".
+
+Token counts use tiktoken when it is installed and its encoding can be loaded
+(it downloads the BPE file on first use); otherwise len(text) / 4. The
+returned text never exceeds the budget under the same counter.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from typing import List, Optional, Tuple
+
+# Optional tiktoken
+try:
+    import tiktoken as _tiktoken
+    _HAS_TIKTOKEN = True
+except Exception:
+    _HAS_TIKTOKEN = False
+
+
+# ------------------ CONFIG ------------------ #
+
+DEFAULT_TEXT_BUDGET = 3000          # tokens of article text per prompt
+LEAD_FRACTION = 0.6
+CHARS_PER_TOKEN = 4
+FALLBACK_ENCODING = "o200k_base"
+ELLIPSIS = "[...]"
+
+# Disruption-specific terms only: generic trade / infrastructure words ("export",
+# "port", "road", "production", "union", ...) appear in most news sentences and
+# would make the keyword pass keep nearly everything
+DISRUPTION_KEYWORDS = [
+    "flood", "drought", "cyclone", "hurricane", "typhoon", "storm", "tsunami", "wildfire", "heatwave", "heat wave",
+    "landslide", "mudslide", "earthquake", "quake",
+    "collapse", "explosion", "blast", "fatalit", "killed", "derail",
+    "strike", "walkout", "stoppage", "protest", "blockade", "riot",
+    "embargo", "sanction", "export ban", "import ban", "tariff",
+    "shutdown", "shut down", "halted", "suspend", "closure", "disrupt", "outage", "blackout",
+    "power cut", "force majeure", "curtail", "evacuat",
+]
+# word-start match so "port" does not hit "report"/"support"
+_KEYWORD_RE = re.compile(r"\b(?:" + "|".join(re.escape(k) for k in DISRUPTION_KEYWORDS) + ")", re.IGNORECASE)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'“(])")
+
+
+# ------------------ TOKEN COUNTING ------------------ #
+
+_ENCODERS = {}
+_ENC_LOCK = threading.Lock()
+
+
+def _encoder(model: Optional[str]):
+    if not _HAS_TIKTOKEN:
+        return None
+    key = model or FALLBACK_ENCODING
+    with _ENC_LOCK:
+        if key not in _ENCODERS:
+            enc = None
+            try:
+                enc = _tiktoken.encoding_for_model(model) if model else None
+            except Exception:
+                enc = None
+            if enc is None:
+                try:
+                    enc = _tiktoken.get_encoding(FALLBACK_ENCODING)
+                except Exception:
+                    enc = None  # no network / no cached BPE file
+            _ENCODERS[key] = enc
+        return _ENCODERS[key]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    enc = _encoder(model)
+    if enc is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, budget: int, model: Optional[str] = None) -> str:
+    """First `budget` tokens of text (characters when no encoder is available)."""
+    enc = _encoder(model)
+    if enc is None:
+        return text[: max(budget, 0) * CHARS_PER_TOKEN]
+    return enc.decode(enc.encode(text, disallowed_special=())[: max(budget, 0)])
+
+
+# ------------------ TRIMMING ------------------ #
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_RE.split(text or "") if s.strip()]
+
+
+def trim_to_budget(
+    text: str,
+    budget: int = DEFAULT_TEXT_BUDGET,
+    model: Optional[str] = None,
+    lead_fraction: float = LEAD_FRACTION,
+) -> Tuple[str, int, int]:
+    """
+    Returns (trimmed_text, tokens_before, tokens_after).
+    Text already within budget is returned unchanged.
+    """
+    n_before = count_tokens(text, model)
+    if n_before <= budget:
+        return text, n_before, n_before
+
+    sentences = split_sentences(text)
+    costs = [count_tokens(s, model) + 1 for s in sentences]
+
+    keep = [False] * len(sentences)
+    used = 0
+
+    # 1) lead
+    lead_budget = int(budget * lead_fraction)
+    for i, c in enumerate(costs):
+        if used + c > lead_budget:
+            break
+        keep[i] = True
+        used += c
+
+    # 2) keyword sentences after the lead
+    for i, s in enumerate(sentences):
+        if keep[i] or not _KEYWORD_RE.search(s):
+            continue
+        if used + costs[i] > budget:
+            continue
+        keep[i] = True
+        used += costs[i]
+
+    # Nothing fit (e.g. one giant "sentence"): hard cut, leaving room for the marker
+    if not any(keep):
+        marker = " " + ELLIPSIS
+        cut = truncate_tokens(text, budget - count_tokens(marker, model), model)
+        trimmed = cut + marker
+        return trimmed, n_before, count_tokens(trimmed, model)
+
+    trimmed = _assemble(sentences, keep)
+    n_after = count_tokens(trimmed, model)
+
+    # "[...]" markers are not in the per-sentence costs; drop the last kept
+    # sentences until the assembled text fits
+    while n_after > budget and sum(keep) > 1:
+        keep[max(i for i, k in enumerate(keep) if k)] = False
+        trimmed = _assemble(sentences, keep)
+        n_after = count_tokens(trimmed, model)
+
+    return trimmed, n_before, n_after
+
+
+def _assemble(sentences: List[str], keep: List[bool]) -> str:
+    parts: List[str] = []
+    gap = False
+    for s, k in zip(sentences, keep):
+        if k:
+            if gap and parts:
+                parts.append(ELLIPSIS)
+            parts.append(s)
+            gap = False
+        else:
+            gap = True
+    if gap:
+        parts.append(ELLIPSIS)
+    return " ".join(parts)
@@ -5,9 +5,11 @@ import time
 import random
 import requests
 import trafilatura
-from bs4 import BeautifulSoup
+import lxml.html
 from dateutil import parser as dateparser
-from typing import Optional, Dict
+from typing import Optional, Dict, Any
+
+from helper_scripts.article_store import ArticleStore
 
 # Optional Newspaper3k
 try:
@@ -17,146 +19,163 @@ except Exception:
     _HAS_NEWSPAPER = False
 
 
-def extract_article_text(url: str, timeout: int = 20) -> Dict[str, Optional[str]]:
-    """
-    Extract article text, title, and publication date from a URL.
+# ------------------ CONFIG ------------------ #
 
-    Returns:
-        {
-            "url": str,
-            "title": str,
-            "text": str,
-            "publish_date": str | None,   # ISO 8601 if available
-            # "html": str                # optional (see below)
-        }
-    """
+HEADERS_PRIMARY = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0 Safari/537.36"
+    )
+}
+
+HEADERS_RETRY = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/605.1.15 (KHTML, like Gecko) "
+        "Version/17.0 Safari/605.1.15"
+    )
+}
 
-    # ------------------ HELPERS ------------------ #
+# Bump when parse_article_html changes so cached HTML is re-parsed
+PARSER_VERSION = "2"
 
-    def _prep(s: str) -> str:
-        if not s:
-            return ""
-        s = s.replace("\u00a0", " ").replace("\r", " ")
-        return " ".join(s.split()).strip()
+# Raw HTML + parsed fields; re-runs and prompt experiments read from here
+article_store = ArticleStore()
+
+META_DATE_TAGS = [
+    ("property", "article:published_time"),
+    ("property", "article:modified_time"),
+    ("name", "pubdate"),
+    ("name", "publish-date"),
+    ("name", "publication_date"),
+    ("itemprop", "datePublished"),
+    ("itemprop", "dateModified"),
+]
+
+
+# ------------------ HELPERS ------------------ #
+
+def _prep(s: str) -> str:
+    if not s:
+        return ""
+    s = s.replace("\u00a0", " ").replace("\r", " ")
+    return " ".join(s.split()).strip()
+
+
+def _parse_date(val: str) -> Optional[str]:
+    try:
+        return dateparser.parse(val).isoformat()
+    except Exception:
+        return None
+
+
+def _date_from_tree(tree) -> Optional[str]:
+    # 1) meta tags
+    for attr, key in META_DATE_TAGS:
+        for content in tree.xpath(f'//meta[@{attr}="{key}"]/@content'):
+            parsed = _parse_date(content)
+            if parsed:
+                return parsed
 
-    def _parse_date(val: str) -> Optional[str]:
+    # 2) <time datetime="...">
+    for val in tree.xpath("//time[@datetime]/@datetime")[:1]:
+        parsed = _parse_date(val)
+        if parsed:
+            return parsed
+
+    # 3) JSON-LD structured data
+    for raw in tree.xpath('//script[@type="application/ld+json"]/text()'):
         try:
-            return dateparser.parse(val).isoformat()
+            data = json.loads(raw)
         except Exception:
-            return None
-
-    # ------------------ CONFIG ------------------ #
+            continue
+        if isinstance(data, dict):
+            for key in ("datePublished", "dateModified"):
+                if key in data:
+                    parsed = _parse_date(data[key])
+                    if parsed:
+                        return parsed
+    return None
 
-    HEADERS_PRIMARY = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0 Safari/537.36"
-        )
-    }
 
-    HEADERS_RETRY = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/605.1.15 (KHTML, like Gecko) "
-            "Version/17.0 Safari/605.1.15"
-        )
-    }
+def _title_from_tree(tree) -> str:
+    for xp in ('//meta[@property="og:title"]/@content', "//title/text()"):
+        found = tree.xpath(xp)
+        if found and str(found[0]).strip():
+            return str(found[0])
+    return ""
 
-    META_DATE_TAGS = [
-        ("property", "article:published_time"),
-        ("property", "article:modified_time"),
-        ("name", "pubdate"),
-        ("name", "publish-date"),
-        ("name", "publication_date"),
-        ("itemprop", "datePublished"),
-        ("itemprop", "dateModified"),
-    ]
 
-    title = ""
-    text = ""
-    publish_date = None
-    html = None
+def _as_dict(doc: Any) -> Dict[str, Any]:
+    """trafilatura >= 2 returns a Document; older versions return a dict."""
+    if doc is None:
+        return {}
+    if isinstance(doc, dict):
+        return doc
+    return doc.as_dict() if hasattr(doc, "as_dict") else dict(vars(doc))
 
-    # Optional: gentle jitter to avoid soft blocking under concurrency
-    time.sleep(random.uniform(0.15, 0.45))
 
-    # ------------------ FETCH HTML ------------------ #
+# ------------------ PARSE (ONE TREE) ------------------ #
 
+def _build_tree(html: str):
     try:
-        resp = requests.get(url, headers=HEADERS_PRIMARY, timeout=timeout)
-        resp.raise_for_status()
-        html = resp.text
+        return lxml.html.fromstring(html)
+    except ValueError:
+        # str input carrying an XML encoding declaration
+        try:
+            return lxml.html.fromstring(html.encode("utf-8"))
+        except Exception:
+            return None
     except Exception:
-        html = None
+        return None
 
-    if not html:
-        return {
-            "url": url,
-            "title": "",
-            "text": "",
-            "publish_date": None,
-        }
 
-    soup = BeautifulSoup(html, "html.parser")
+def parse_article_html(html: str, url: str = "") -> Dict[str, Optional[str]]:
+    """
+    Title, text and publication date from already-fetched HTML.
 
-    # ------------------ 1) META TAGS ------------------ #
+    The HTML is parsed into one lxml tree. The date and title lookups read it
+    with XPath first; trafilatura then gets the same tree (it prunes it while
+    extracting, so it goes last). newspaper3k only runs if something is still
+    missing.
+    """
+    title = ""
+    text = ""
+    publish_date = None
 
-    for attr, key in META_DATE_TAGS:
-        tag = soup.find("meta", attrs={attr: key})
-        if tag and tag.get("content"):
-            parsed = _parse_date(tag["content"])
-            if parsed:
-                publish_date = parsed
-                break
-
-    # ------------------ 2) <time datetime="..."> ------------------ #
-
-    if publish_date is None:
-        time_tag = soup.find("time", datetime=True)
-        if time_tag:
-            publish_date = _parse_date(time_tag["datetime"])
-
-    # ------------------ 3) JSON-LD STRUCTURED DATA ------------------ #
-
-    if publish_date is None:
-        for script in soup.find_all("script", type="application/ld+json"):
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, dict):
-                    for key in ("datePublished", "dateModified"):
-                        if key in data:
-                            publish_date = _parse_date(data[key])
-                            if publish_date:
-                                break
-                if publish_date:
-                    break
-            except Exception:
-                pass
-
-    # ------------------ 4) TRAFILATURA ------------------ #
-
-    text = trafilatura.extract(
-        html,
-        include_comments=False,
-        include_tables=False
-    ) or ""
-
-    meta = trafilatura.bare_extraction(html)
-    if isinstance(meta, dict):
-        title = meta.get("title") or title
+    tree = _build_tree(html)
+    if tree is not None:
+        publish_date = _date_from_tree(tree)
+        page_title = _title_from_tree(tree)
+
+        # ------------------ TRAFILATURA (single call: text + metadata) ------------------ #
+
+        try:
+            meta = _as_dict(trafilatura.bare_extraction(
+                tree,
+                url=url or None,
+                include_comments=False,
+                include_tables=False,
+                with_metadata=True,
+            ))
+        except Exception:
+            meta = {}
+
+        text = meta.get("text") or ""
+        title = meta.get("title") or page_title
 
         if publish_date is None:
             raw = meta.get("date") or meta.get("published")
             if raw:
                 publish_date = _parse_date(raw)
 
-    # ------------------ 5) NEWSPAPER3K (ALWAYS TRY FOR DATE) ------------------ #
+    # ------------------ NEWSPAPER3K (ONLY IF FIELDS MISSING) ------------------ #
 
-    if _HAS_NEWSPAPER:
+    if _HAS_NEWSPAPER and not (title and text and publish_date):
         try:
             art = _NPArticle(url)
-            art.download()
+            art.download(input_html=html)  # reuse the fetched HTML, no second request
             art.parse()
 
             if not title:
@@ -171,35 +190,104 @@ def extract_article_text(url: str, timeout: int = 20) -> Dict[str, Optional[str]
         except Exception:
             pass
 
-    # ------------------ 6) RETRY FETCH IF DATE STILL MISSING ------------------ #
+    return {
+        "url": url,
+        "title": _prep(title),
+        "text": _prep(text),
+        "publish_date": publish_date,
+    }
 
-    if publish_date is None:
+
+# ------------------ FETCH + PARSE ------------------ #
+
+def fetch_html(url: str, timeout: int = 20) -> Optional[str]:
+    """
+    One download per URL. The retry user-agent is only tried when the first
+    request actually fails.
+    """
+    def _fetch(headers: Dict[str, str]) -> Optional[str]:
         try:
-            resp2 = requests.get(url, headers=HEADERS_RETRY, timeout=timeout)
-            if resp2.ok:
-                soup2 = BeautifulSoup(resp2.text, "html.parser")
-                for attr, key in META_DATE_TAGS:
-                    tag = soup2.find("meta", attrs={attr: key})
-                    if tag and tag.get("content"):
-                        parsed = _parse_date(tag["content"])
-                        if parsed:
-                            publish_date = parsed
-                            break
+            resp = requests.get(url, headers=headers, timeout=timeout)
+            resp.raise_for_status()
+            return resp.text
         except Exception:
-            pass
+            return None
 
-    # ------------------ FINAL CLEANUP ------------------ #
+    return _fetch(HEADERS_PRIMARY) or _fetch(HEADERS_RETRY)
 
+
+def _empty(url: str) -> Dict[str, Optional[str]]:
     return {
         "url": url,
-        "title": _prep(title),
-        "text": _prep(text),
-        "publish_date": publish_date,
-        # Optional: enable if you want HTML caching
-        # "html": html,
+        "title": "",
+        "text": "",
+        "publish_date": None,
     }
 
 
+def _from_store(url: str, cached: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    if cached["parser_version"] == PARSER_VERSION:
+        return {
+            "url": url,
+            "title": cached["title"] or "",
+            "text": cached["text"] or "",
+            "publish_date": cached["publish_date"],
+        }
+    parsed = parse_article_html(cached["html"], url)
+    article_store.update_parsed(url, parsed, PARSER_VERSION)
+    return parsed
+
+
+def extract_article_text(
+    url: str,
+    timeout: int = 20,
+    use_store: bool = True,
+    include_html: bool = False,
+) -> Dict[str, Optional[str]]:
+    """
+    Extract article text, title, and publication date from a URL.
+
+    Fresh entries in the article store are served without touching the
+    network; if a fetch fails, a stale stored copy is used instead.
+
+    Returns:
+        {
+            "url": str,
+            "title": str,
+            "text": str,
+            "publish_date": str | None,   # ISO 8601 if available
+            "html": str | None,           # only with include_html=True
+        }
+    """
+    if use_store:
+        cached = article_store.get(url)
+        if cached is not None and cached["html"]:
+            out = _from_store(url, cached)
+            if include_html:
+                out["html"] = cached["html"]
+            return out
+
+    # Optional: gentle jitter to avoid soft blocking under concurrency
+    time.sleep(random.uniform(0.15, 0.45))
+
+    html = fetch_html(url, timeout=timeout)
+    if not html:
+        stale = article_store.get(url, allow_stale=True) if use_store else None
+        if stale is not None and stale["html"]:
+            out = _from_store(url, stale)
+            if include_html:
+                out["html"] = stale["html"]
+            return out
+        return _empty(url)
+
+    out = parse_article_html(html, url)
+    if use_store:
+        article_store.put(url, html, out, PARSER_VERSION)
+    if include_html:
+        out["html"] = html
+    return out
+
+
 if __name__ == "__main__":
     # Quick manual test
     # art = extract_article_text("https://www.bbc.co.uk/news/articles/c07m2v1z4evo")
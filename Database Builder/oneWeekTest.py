@@ -2,15 +2,13 @@ from __future__ import annotations
 
 import os
 import glob
-import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any
+import argparse
+from typing import List
 
 import pandas as pd
-from tqdm import tqdm
 
 # Import your existing extraction logic
-from DisruptionExtractor import extract_from_url_llm_single_pass, DEFAULT_MODEL, MAX_WORKERS
+from DisruptionExtractor import extract_urls_resumable, DEFAULT_MODEL, MAX_WORKERS
 
 
 # ================================
@@ -94,7 +92,7 @@ def load_all_urls(csv_files: List[str]) -> List[str]:
 # MAIN RUNNER
 # ================================
 
-def main():
+def main(retry_errors: bool = False):
 
     csv_files = collect_week_csvs()
     print(f"Found {len(csv_files)} daily CSV files.")
@@ -105,45 +103,21 @@ def main():
     print(f"Total unique URLs to process: {total}")
     print(f"Using model={DEFAULT_MODEL} with up to {MAX_WORKERS} workers\n")
 
-    if os.path.exists(OUTPUT_JSONL):
-        os.remove(OUTPUT_JSONL)
-
-    results: List[Dict[str, Any]] = []
-    errors: List[Dict[str, Any]] = []
-
-    def worker(u: str) -> Dict[str, Any]:
-        rec = extract_from_url_llm_single_pass(u, model=DEFAULT_MODEL)
-        return rec.__dict__
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_url = {executor.submit(worker, u): u for u in urls}
-
-        for fut in tqdm(as_completed(future_to_url), total=total, desc="Extracting"):
-            url = future_to_url[fut]
-
-            try:
-                data = fut.result()
-                results.append(data)
-
-                with open(OUTPUT_JSONL, "a", encoding="utf-8") as f:
-                    f.write(json.dumps(data, ensure_ascii=False) + "\n")
-
-            except Exception as e:
-                errors.append({"url": url, "error": str(e)})
-
-    if results:
-        pd.DataFrame(results).to_csv(OUTPUT_CSV, index=False, encoding="utf-8")
-        print(f"\nSaved combined database to:")
-        print(f"  {OUTPUT_JSONL}")
-        print(f"  {OUTPUT_CSV}")
-
-    if errors:
-        pd.DataFrame(errors).to_csv(ERROR_CSV, index=False, encoding="utf-8")
-        print(f"\nSome URLs failed. See:")
-        print(f"  {ERROR_CSV}")
-    else:
-        print("\nNo errors recorded.")
+    # Resumes from OUTPUT_JSONL / ERROR_CSV; the CSV is rebuilt at the end
+    extract_urls_resumable(
+        urls,
+        OUTPUT_JSONL,
+        OUTPUT_CSV,
+        ERROR_CSV,
+        model=DEFAULT_MODEL,
+        max_workers=MAX_WORKERS,
+        retry_errors=retry_errors,
+    )
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract disruptions for one week of interesting URLs")
+    parser.add_argument("--retry-errors", action="store_true", help="re-run URLs listed in the errors file")
+    args = parser.parse_args()
+
+    main(retry_errors=args.retry_errors)
@@ -3,31 +3,63 @@ Master post-processing pipeline.
 
 Flow:
 1) Load raw extractions from results/
-2) Run consolidation
-3) Save consolidated files
+2) Run consolidation (full rebuild, or INCREMENTAL: merge into results/event_store.jsonl)
+3) Save consolidated files (+ event DB)
 4) Run debugger + metrics
 5) Display consolidated extractions
+
+The input is parsed once; the typed frames are passed to every stage.
+Per-stage wall times are printed at the end.
 """
 
+from contextlib import contextmanager
 from pathlib import Path
 import sys
+import time
 
 # ---- Project paths ---- #
 
 BASE_DIR = Path(__file__).resolve().parent
 RESULTS_DIR = BASE_DIR / "results"
 
+# Append new extractions to the persistent event store instead of re-clustering
+INCREMENTAL = False
+
+# Mirror the consolidated events into the indexed SQLite event DB (helper_scripts/event_db.py).
+# Each input file (or the incremental store) replaces only its own events there.
+UPDATE_EVENT_DB = True
+
 # ---- Import helper modules ---- #
 
-from helper_scripts.consolidateExtractions import (load_extractions,run_consolidation)
+from helper_scripts.consolidateExtractions import (load_extractions,run_consolidation,run_incremental_consolidation)
 from helper_scripts.debuggerAndMetrics import run_debugger_and_metrics
 from helper_scripts.DisplayExtractionsPandas import run_display_extractions
 from helper_scripts.plotDisruptions import run_plots
+from helper_scripts.event_db import EventDB
+
+
+# ------------------ STAGE TIMINGS ------------------ #
+
+@contextmanager
+def _timed(timings: dict, stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = time.perf_counter() - t0
+
+
+def print_timings(timings: dict):
+    total = sum(timings.values())
+    print("\n=== Stage timings ===\n")
+    for stage, secs in timings.items():
+        print(f"{stage:<14}: {secs:7.2f}s ({100 * secs / total if total else 0:5.1f}%)")
+    print(f"{'total':<14}: {total:7.2f}s")
 
 
 # ------------------ MAIN PIPELINE ------------------ #
 
-def run_pipeline(input_filename: str):
+def run_pipeline(input_filename: str) -> dict:
 
     input_path = RESULTS_DIR / input_filename
 
@@ -36,23 +68,45 @@ def run_pipeline(input_filename: str):
 
     print(f"\nRunning pipeline for: {input_filename}\n")
 
-    # ---- 1) Load raw extractions ---- #
-    df_before = load_extractions(input_path)
+    timings = {}
+
+    # ---- 1) Load raw extractions (once) ---- #
+    with _timed(timings, "load"):
+        df_before = load_extractions(input_path)
 
     # ---- 2) Consolidate ---- #
-    df_after = run_consolidation(input_path)
+    with _timed(timings, "consolidate"):
+        if INCREMENTAL:
+            df_after = run_incremental_consolidation(input_path, df_new=df_before)
+        else:
+            df_after = run_consolidation(input_path, df_before=df_before)
+
+    if UPDATE_EVENT_DB:
+        with _timed(timings, "event_db"):
+            db = EventDB()
+            if INCREMENTAL:
+                db.sync_from_store()
+            else:
+                # Reuse the clusters consolidation just produced; replaces only this file's events
+                db.load_consolidated(df_after, df_before, source=input_path.name)
+            print(db.summary())
+            db.close()
 
     # ---- 3) Debug + Metrics ---- #
-    run_debugger_and_metrics(df_before, df_after)
+    with _timed(timings, "metrics"):
+        run_debugger_and_metrics(df_before, df_after)
 
     # ---- 4) Display ---- #
-    run_display_extractions(df_after, df_before=df_before)
+    with _timed(timings, "display"):
+        run_display_extractions(df_after, df_before=df_before)
 
     #-----5) plots ----#
-    run_plots(df_after, project_root = BASE_DIR)
-
+    with _timed(timings, "plots"):
+        run_plots(df_after, project_root = BASE_DIR)
 
+    print_timings(timings)
     print("\nPipeline complete.\n")
+    return timings
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+"""
+Active-learning sampler: picks the next rows to label from scored days.
+
+Reads the daily *_experts_scored.csv files for a date range, drops URLs that
+are already in the labelled workbook, and selects a fixed-size batch made of:
+  - uncertain rows: some expert's p is close to that expert's threshold
+  - disagreement rows: two experts both claim the row with similar confidence
+  - diverse rows: one representative per KMeans cluster in embedding space
+
+The batch is written in the labelled workbook's schema (sheet "data") with
+row_origin = "active_learning", so label_disruptions_multiexpert.py can label
+it directly and the rows can be appended to the master sheet afterwards.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import load
+from sklearn.cluster import MiniBatchKMeans
+
+from experts_general_model import (
+    GOLD_GENERAL_COL,
+    GOLD_TYPES,
+    ROW_ORIGIN_COL,
+    SHEET_NAME,
+    THRESHOLD_EXPERT,
+    TRAINING_XLSX,
+    URL_COL,
+    WEAK_PREFIX,
+    build_text,
+)
+from prepare_training_data import encode_cached, load_labelled_frame
+
+
+# ---- SET DATE RANGE ----
+START_DATE = "20260101"
+END_DATE   = "20260107"
+# ------------------------
+
+BATCH_SIZE = 200
+UNCERTAIN_FRAC = 0.4
+DISAGREE_FRAC = 0.3      # remainder goes to diversity sampling
+ROW_ORIGIN_VALUE = "active_learning"
+
+PATTERN = "*_experts_scored.csv"
+
+BASE_DIR = Path(__file__).resolve().parent
+project_root = BASE_DIR.parent
+SCORED_BASE = project_root / "data" / "processed" / "model_scored_daily"
+EXPERT_MODELS_DIR = project_root / "models" / "disruption_v2_experts"
+OUT_DIR = BASE_DIR / "data" / "interim"
+
+
+# ============================
+# Inputs
+# ============================
+def collect_scored_files(start_date: str, end_date: str):
+    start = datetime.strptime(start_date, "%Y%m%d")
+    end = datetime.strptime(end_date, "%Y%m%d")
+    if start > end:
+        raise ValueError("START_DATE must be <= END_DATE")
+
+    files = []
+    cur = start
+    while cur <= end:
+        folder = SCORED_BASE / cur.strftime("%Y") / cur.strftime("%m") / cur.strftime("%d")
+        if folder.exists():
+            files.extend(folder.glob(PATTERN))
+        cur += timedelta(days=1)
+    return files
+
+
+def expert_thresholds() -> dict:
+    """Per-expert threshold from the current bundles (falls back to THRESHOLD_EXPERT)."""
+    thr = {}
+    for t in GOLD_TYPES:
+        path = EXPERT_MODELS_DIR / f"expert_{t}" / f"disruption_{t}.joblib"
+        try:
+            thr[t] = float(load(path).get("threshold", THRESHOLD_EXPERT))
+        except Exception:
+            thr[t] = THRESHOLD_EXPERT
+    return thr
+
+
+def workbook_schema(labelled: pd.DataFrame) -> list:
+    if labelled is not None and len(labelled.columns):
+        return list(labelled.columns)
+    cols = [ROW_ORIGIN_COL, URL_COL, "title", "meta_description"] + GOLD_TYPES + [GOLD_GENERAL_COL]
+    cols += [f"{WEAK_PREFIX}{t}" for t in GOLD_TYPES] + [f"gemini_{t}" for t in GOLD_TYPES]
+    cols += ["agree_all", "n_disagree", "disagree_labels"]
+    return cols
+
+
+# ============================
+# Scores
+# ============================
+def uncertainty_score(P: np.ndarray, thr: np.ndarray) -> np.ndarray:
+    """1 at the threshold, 0 at the far end of [0, 1]; max over experts."""
+    span = np.maximum(thr, 1.0 - thr)
+    return (1.0 - np.abs(P - thr) / span).max(axis=1)
+
+
+def disagreement_score(P: np.ndarray) -> np.ndarray:
+    """High when the top-2 experts are both confident and close to each other."""
+    if P.shape[1] < 2:
+        return np.zeros(len(P))
+    top2 = np.sort(P, axis=1)[:, -2:]
+    p2, p1 = top2[:, 0], top2[:, 1]
+    return p2 * (1.0 - (p1 - p2))
+
+
+def diverse_pick(embeddings: np.ndarray, n: int, random_state: int = 42) -> tuple:
+    """Index of the row nearest each of n KMeans centroids, plus its distance."""
+    if n <= 0 or len(embeddings) == 0:
+        return np.array([], dtype=int), np.array([])
+    n = min(n, len(embeddings))
+    km = MiniBatchKMeans(n_clusters=n, random_state=random_state, n_init=3, batch_size=1024)
+    labels = km.fit_predict(embeddings)
+    dist = np.linalg.norm(embeddings - km.cluster_centers_[labels], axis=1)
+
+    picks, scores = [], []
+    for c in range(n):
+        members = np.flatnonzero(labels == c)
+        if len(members):
+            best = members[np.argmin(dist[members])]
+            picks.append(best)
+            scores.append(dist[best])
+    return np.array(picks, dtype=int), np.array(scores)
+
+
+# ============================
+# Main
+# ============================
+def main(start_date: str = START_DATE, end_date: str = END_DATE, batch_size: int = BATCH_SIZE):
+    files = collect_scored_files(start_date, end_date)
+    if not files:
+        raise FileNotFoundError("No experts_scored files found in given range.")
+
+    pool = pd.concat((pd.read_csv(f) for f in files), ignore_index=True)
+    pool = pool.drop_duplicates(URL_COL).reset_index(drop=True)
+    print(f"Scored files: {len(files)} | Unique URLs: {len(pool):,}")
+
+    try:
+        labelled = load_labelled_frame(TRAINING_XLSX, sheet_name=SHEET_NAME)
+    except FileNotFoundError:
+        labelled = None
+
+    if labelled is not None and URL_COL in labelled.columns:
+        seen = set(labelled[URL_COL].dropna().astype(str))
+        pool = pool[~pool[URL_COL].astype(str).isin(seen)].reset_index(drop=True)
+        print(f"After removing already-labelled URLs: {len(pool):,}")
+
+    if pool.empty:
+        print("Nothing left to sample.")
+        return
+
+    thr_map = expert_thresholds()
+    p_cols = [f"p_{t}" for t in GOLD_TYPES if f"p_{t}" in pool.columns]
+    P = pool[p_cols].apply(pd.to_numeric, errors="coerce").fillna(0.0).values
+    thr = np.array([thr_map[c[2:]] for c in p_cols])
+
+    pool["al_uncertainty"] = uncertainty_score(P, thr)
+    pool["al_disagreement"] = disagreement_score(P)
+
+    n_unc = int(round(batch_size * UNCERTAIN_FRAC))
+    n_dis = int(round(batch_size * DISAGREE_FRAC))
+
+    chosen = {}  # row index -> (reason, score)
+
+    for idx in pool["al_uncertainty"].sort_values(ascending=False).index[:n_unc]:
+        chosen[idx] = ("uncertain", float(pool.at[idx, "al_uncertainty"]))
+
+    for idx in pool["al_disagreement"].drop(index=list(chosen)).sort_values(ascending=False).index[:n_dis]:
+        chosen[idx] = ("disagreement", float(pool.at[idx, "al_disagreement"]))
+
+    rest = pool.drop(index=list(chosen))
+    n_div = batch_size - len(chosen)
+    if n_div > 0 and len(rest):
+        texts = rest.apply(build_text, axis=1).astype(str).tolist()
+        emb = encode_cached(texts, cache_stem="active_learning_pool")
+        picks, dists = diverse_pick(emb, n_div)
+        for i, d in zip(picks, dists):
+            chosen[rest.index[i]] = ("diverse", float(d))
+
+    batch = pool.loc[list(chosen)].copy()
+    batch["al_reason"] = [chosen[i][0] for i in batch.index]
+    batch["al_score"] = [chosen[i][1] for i in batch.index]
+
+    # Map to the workbook schema; label columns stay blank for the labeller
+    cols = workbook_schema(labelled)
+    out = batch.reindex(columns=cols)
+    out[[c for c in cols if c in GOLD_TYPES]] = None
+    out[ROW_ORIGIN_COL] = ROW_ORIGIN_VALUE
+    out["al_reason"] = batch["al_reason"].values
+    out["al_score"] = batch["al_score"].values
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = OUT_DIR / f"active_learning_batch_{start_date}_{end_date}.xlsx"
+    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
+        out.to_excel(writer, index=False, sheet_name="data")
+
+    print(f"Batch size: {len(out)} | " + " | ".join(f"{k}: {v}" for k, v in out["al_reason"].value_counts().items()))
+    print(f"Saved to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import csv
+import sys
 import time
 import random
 from pathlib import Path
@@ -10,6 +11,10 @@ import requests
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 
+# Shared on-disk HTML store (also used by the extraction webscraper)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Database Builder"))
+from helper_scripts.article_store import ArticleStore  # noqa: E402
+
 BASE_DIR = Path("data/interim/gdelt_event_context_daily")
 OUTPUT_SUFFIX = "_enriched.csv"
 USER_AGENT = "Mozilla/5.0 (compatible; LithiumQRA/1.0)"
@@ -23,6 +28,9 @@ MAX_WORKERS = 30  # Optimized for low 429 error rate
 MAX_TITLE_CHARS = 300
 MAX_DESC_CHARS = 800
 
+USE_ARTICLE_STORE = True
+article_store = ArticleStore(enabled=USE_ARTICLE_STORE)
+
 
 def normalize_url(url: str) -> str:
     url = (url or "").strip()
@@ -39,7 +47,19 @@ def truncate(s: Optional[str], n: int) -> str:
     s = (s or "").strip()
     return s[:n] if len(s) > n else s
 
+def parse_title_meta(html: str) -> Tuple[str, str]:
+    soup = BeautifulSoup(html, "lxml")
+    title = truncate(soup.title.string if soup.title else "", MAX_TITLE_CHARS)
+    desc_tag = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
+    desc = truncate(desc_tag["content"] if desc_tag else "", MAX_DESC_CHARS)
+    return title, desc
+
 def fetch_title_meta(url: str, session: requests.Session) -> Tuple[str, str, int, str]:
+    cached = article_store.get(url)
+    if cached is not None and cached["html"]:
+        title, desc = parse_title_meta(cached["html"])
+        return title, desc, 200, ""
+
     last_err = ""
     for attempt in range(MAX_RETRIES + 1):
         try:
@@ -51,10 +71,8 @@ def fetch_title_meta(url: str, session: requests.Session) -> Tuple[str, str, int
                     continue
                 return "", "", status, f"bad_status:{status}"
             
-            soup = BeautifulSoup(resp.text, "lxml")
-            title = truncate(soup.title.string if soup.title else "", MAX_TITLE_CHARS)
-            desc_tag = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
-            desc = truncate(desc_tag["content"] if desc_tag else "", MAX_DESC_CHARS)
+            article_store.put(url, resp.text, http_status=status)
+            title, desc = parse_title_meta(resp.text)
             return title, desc, status, ""
         except Exception as e:
             if attempt < MAX_RETRIES:
@@ -154,6 +172,9 @@ def main(target_date: str):
         for f in files:
             enrich_daily_file(f, cache, session)
 
+    if USE_ARTICLE_STORE:
+        print(article_store.summary())
+
 if __name__ == "__main__":
     day = input("Enter date (YYYYMMDD): ").strip()
     main(day)
\ No newline at end of file
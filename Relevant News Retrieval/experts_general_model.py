@@ -7,7 +7,6 @@ import pandas as pd
 import numpy as np
 from joblib import dump
 
-from sentence_transformers import SentenceTransformer
 from sklearn.model_selection import train_test_split
 from sklearn.svm import LinearSVC
 from sklearn.calibration import CalibratedClassifierCV
@@ -15,6 +14,8 @@ from sklearn.metrics import classification_report, confusion_matrix, average_pre
 
 from tqdm import tqdm
 
+from prepare_training_data import load_labelled_frame, encode_cached
+
 
 # ============================
 # Config
@@ -25,6 +26,7 @@ BASE_DIR = Path(__file__).resolve().parent
 TRAINING_XLSX = BASE_DIR / "data" / "interim" / "disruption_master_10k_multiexpert_labelled.xlsx"
 SHEET_NAME = "data"  # master sheet name
 OUTPUT_DIR = "models/disruption_v2_experts"
+EMBED_MODEL = "all-MiniLM-L6-v2"
 
 USE_URL_FALLBACK = True
 REQUIRE_TEXT = True
@@ -32,6 +34,11 @@ REQUIRE_TEXT = True
 THRESHOLD_GENERAL = 0.40
 THRESHOLD_EXPERT = 0.40
 
+# "train" = fixed LinearSVC + fixed thresholds (above)
+# "sweep" = grid over C / calibration + per-expert threshold selection (threshold_sweep.py)
+# "incremental" = retrain only models touched by new/changed labels (incremental_training.py)
+RUN_MODE = "train"
+
 ROW_ORIGIN_COL = "row_origin"
 GOLD_ORIGIN_VALUE = "gold_manual"
 
@@ -265,7 +272,7 @@ def train_one_binary(
 
     dump(
         {
-            "embed_model": "all-MiniLM-L6-v2",
+            "embed_model": EMBED_MODEL,
             "classifier": clf,
             "threshold": threshold,
             "label": model_name,
@@ -280,68 +287,98 @@ def train_one_binary(
 
 
 # ============================
-# Main
+# Data preparation
 # ============================
-print("Loading Excel:", TRAINING_XLSX)
-df = pd.read_excel(TRAINING_XLSX, sheet_name=SHEET_NAME, engine="openpyxl")
-df.columns = df.columns.astype(str).str.strip()
-print("Rows loaded:", len(df))
+def load_training_data():
+    """
+    Load the labelled workbook (via the prepared Parquet copy), build model
+    text and targets, and return (df, y_df, embeddings).
+    """
+    df = load_labelled_frame(TRAINING_XLSX, sheet_name=SHEET_NAME)
+    df.columns = df.columns.astype(str).str.strip()
+    print("Rows loaded:", len(df))
+
+    # Core required columns
+    ensure_columns(df, [ROW_ORIGIN_COL, URL_COL, TITLE_COL, META_COL])
+    ensure_columns(df, GOLD_TYPES + [GOLD_GENERAL_COL])
+
+    # Build text
+    df["text"] = df.apply(build_text, axis=1)
+    if REQUIRE_TEXT:
+        before = len(df)
+        df = df[df["text"].astype(str).str.len() > 0].copy().reset_index(drop=True)
+        print(f"Dropped empty-text rows: {before} -> {len(df)}")
+    else:
+        df = df.reset_index(drop=True)
+
+    # Build targets (gold + chatgpt)
+    y_df = build_targets(df)
+    print("Gold rows:", int((df[ROW_ORIGIN_COL].fillna("") == GOLD_ORIGIN_VALUE).sum()))
+    print("General label counts:", y_df[GOLD_GENERAL_COL].value_counts().to_dict())
+
+    # Embed once (shared across all models); only changed texts hit the encoder
+    X_text = df["text"].astype(str).tolist()
+    embeddings = encode_cached(X_text, cache_stem=Path(TRAINING_XLSX).stem, embed_model=EMBED_MODEL)
 
-# Core required columns
-ensure_columns(df, [ROW_ORIGIN_COL, URL_COL, TITLE_COL, META_COL])
-ensure_columns(df, GOLD_TYPES + [GOLD_GENERAL_COL])
+    return df, y_df, embeddings
 
-# Build text
-df["text"] = df.apply(build_text, axis=1)
-if REQUIRE_TEXT:
-    before = len(df)
-    df = df[df["text"].astype(str).str.len() > 0].copy().reset_index(drop=True)
-    print(f"Dropped empty-text rows: {before} -> {len(df)}")
-else:
-    df = df.reset_index(drop=True)
 
-# Build targets (gold + chatgpt)
-y_df = build_targets(df)
-print("Gold rows:", int((df[ROW_ORIGIN_COL].fillna("") == GOLD_ORIGIN_VALUE).sum()))
-print("General label counts:", y_df[GOLD_GENERAL_COL].value_counts().to_dict())
+def model_tasks():
+    """(subdir, label_col, default_threshold, model_name) for the general model + 12 experts."""
+    tasks = [("general", GOLD_GENERAL_COL, THRESHOLD_GENERAL)] + [(f"expert_{t}", t, THRESHOLD_EXPERT) for t in GOLD_TYPES]
+    return [
+        (subdir, label_col, thr, "disruption_general" if label_col == GOLD_GENERAL_COL else f"disruption_{label_col}")
+        for subdir, label_col, thr in tasks
+    ]
+
+
+# ============================
+# Main
+# ============================
+def main():
+    if RUN_MODE == "sweep":
+        from threshold_sweep import run_sweep
+        run_sweep()
+        return
+    if RUN_MODE == "incremental":
+        from incremental_training import main as run_incremental
+        run_incremental()
+        return
+
+    df, y_df, embeddings = load_training_data()
 
-# Embed once (shared across all models) + visible progress bar
-print("Loading embedder...")
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+    # Train 13 models (1 general + 12 experts) with overall progress + ETA
+    root = Path(OUTPUT_DIR)
+    root.mkdir(parents=True, exist_ok=True)
 
-print("Embedding all texts (once)...")
-X_text = df["text"].astype(str).tolist()
-embeddings = embedder.encode(X_text, normalize_embeddings=True, show_progress_bar=True)
+    tasks = model_tasks()
 
-# Train 13 models (1 general + 12 experts) with overall progress + ETA
-root = Path(OUTPUT_DIR)
-root.mkdir(parents=True, exist_ok=True)
+    ema_per_model = None
+    alpha = 0.25  # EMA smoothing
+    start_all = time.time()
 
-tasks = [("general", GOLD_GENERAL_COL, THRESHOLD_GENERAL)] + [(f"expert_{t}", t, THRESHOLD_EXPERT) for t in GOLD_TYPES]
+    pbar = tqdm(tasks, desc="Training models", unit="model")
+    for i, (subdir, label_col, thr, model_name) in enumerate(pbar, start=1):
+        t0 = time.time()
 
-ema_per_model = None
-alpha = 0.25  # EMA smoothing
-start_all = time.time()
+        out_dir = root / subdir
 
-pbar = tqdm(tasks, desc="Training models", unit="model")
-for i, (subdir, label_col, thr) in enumerate(pbar, start=1):
-    t0 = time.time()
+        y = y_df[label_col].values.astype(int)
+        train_one_binary(df=df, embeddings=embeddings, y=y, out_dir=out_dir, model_name=model_name, threshold=thr)
 
-    model_name = "disruption_general" if label_col == GOLD_GENERAL_COL else f"disruption_{label_col}"
-    out_dir = root / subdir
+        dt = time.time() - t0
+        ema_per_model = dt if ema_per_model is None else (alpha * dt + (1 - alpha) * ema_per_model)
 
-    y = y_df[label_col].values.astype(int)
-    train_one_binary(df=df, embeddings=embeddings, y=y, out_dir=out_dir, model_name=model_name, threshold=thr)
+        remaining = (len(tasks) - i) * (ema_per_model if ema_per_model is not None else 0.0)
+        elapsed = time.time() - start_all
 
-    dt = time.time() - t0
-    ema_per_model = dt if ema_per_model is None else (alpha * dt + (1 - alpha) * ema_per_model)
+        pbar.set_postfix_str(f"last={format_seconds(dt)} | elapsed={format_seconds(elapsed)} | ETA={format_seconds(remaining)}")
 
-    remaining = (len(tasks) - i) * (ema_per_model if ema_per_model is not None else 0.0)
-    elapsed = time.time() - start_all
+    pbar.close()
 
-    pbar.set_postfix_str(f"last={format_seconds(dt)} | elapsed={format_seconds(elapsed)} | ETA={format_seconds(remaining)}")
+    print("\nAll done.")
+    print("Models saved under:", root)
 
-pbar.close()
 
-print("\nAll done.")
-print("Models saved under:", root)
+if __name__ == "__main__":
+    main()
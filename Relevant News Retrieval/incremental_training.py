@@ -0,0 +1,359 @@
+"""
+Incremental retraining for the general/expert disruption models.
+
+Each run compares the labelled workbook against each model's label snapshot
+(row key = url_normalized, hash = text + label) and retrains only the models
+whose labels were touched by new, changed or removed rows. A model's snapshot
+only advances when that model was actually updated (or had nothing to learn),
+so labels seen while a model was skipped are still picked up by a later run.
+
+Models use an SGD logistic head on the cached embeddings so they can be
+warm-started with partial_fit (delta rows + a replay sample of old rows).
+Models without a previous SGD bundle are cold-fitted once; a cold fit re-picks
+the threshold from out-of-fold predictions on the training split (same rule as
+threshold_sweep.py), since thresholds tuned for another head are on a different
+probability scale.
+
+An existing bundle that is not an SGD head (e.g. the calibrated LinearSVC from
+experts_general_model.py / threshold_sweep.py) is left untouched unless
+--replace-non-sgd is given. If every affected model is skipped for that reason
+the run raises, so a scheduled caller (pipeline.py) does not silently retrain
+nothing.
+
+Outputs (under OUTPUT_DIR = models/disruption_v2_experts):
+  <subdir>/versions/vNNNN/<model_name>.joblib   versioned bundle
+  <subdir>/<model_name>.joblib                  current bundle (read by relevant_urls.py)
+  _state/labels/<model_name>.parquet            per-model label snapshot for the next diff
+  _state/manifest.json                          run history + current version per model
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import dump, load
+
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import average_precision_score
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.utils.class_weight import compute_sample_weight
+
+from experts_general_model import (
+    EMBED_MODEL,
+    OUTPUT_DIR,
+    URL_COL,
+    USE_URL_FALLBACK,
+    format_seconds,
+    load_training_data,
+    model_tasks,
+)
+from threshold_sweep import SWEEP_OOF_FOLDS, choose_threshold, pr_table
+
+
+# ============================
+# Config
+# ============================
+STATE_DIR = Path(OUTPUT_DIR) / "_state"
+LABELS_SNAPSHOT = STATE_DIR / "labels.parquet"     # legacy shared snapshot (read-only fallback)
+MODEL_SNAPSHOT_DIR = STATE_DIR / "labels"
+MANIFEST_PATH = STATE_DIR / "manifest.json"
+
+HOLDOUT_MOD = 5          # rows with hash(key) % 5 == 0 are a stable held-out set
+REPLAY_SIZE = 2000       # old rows mixed into each warm-start update
+WARM_EPOCHS = 5
+SGD_ALPHA = 1e-4
+RANDOM_STATE = 42
+
+
+# ============================
+# Hashing / diff
+# ============================
+def _sha1(s: str) -> str:
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()
+
+
+def label_snapshot(df: pd.DataFrame, y_df: pd.DataFrame) -> pd.DataFrame:
+    """One row per labelled URL: key, text hash, holdout flag and every target label."""
+    keys = df[URL_COL].fillna("").astype(str)
+    keys = keys.where(keys.str.len() > 0, df["text"].astype(str))
+
+    snap = y_df.copy()
+    snap.insert(0, "key", keys.values)
+    snap.insert(1, "text_hash", df["text"].astype(str).map(_sha1).values)
+    snap.insert(2, "holdout", snap["key"].map(lambda k: int(_sha1(k)[:8], 16) % HOLDOUT_MOD == 0).values)
+    return snap
+
+
+def diff_snapshots(prev: pd.DataFrame, cur: pd.DataFrame, targets) -> dict:
+    """
+    Return {target: np.ndarray of row positions in `cur` that are new/changed for it}
+    plus '_removed' counts. A target is affected when a row's label for it changed,
+    or a row carrying a positive for it was added, removed or had its text changed.
+    """
+    cur_pos = pd.Series(np.arange(len(cur)), index=cur["key"].values)
+    cur_pos = cur_pos[~cur_pos.index.duplicated(keep="last")]
+
+    prev = prev.drop_duplicates("key", keep="last").set_index("key")
+    cur_u = cur.drop_duplicates("key", keep="last").set_index("key")
+
+    added = cur_u.index.difference(prev.index)
+    removed = prev.index.difference(cur_u.index)
+    common = cur_u.index.intersection(prev.index)
+    text_changed = common[(cur_u.loc[common, "text_hash"] != prev.loc[common, "text_hash"]).values]
+
+    out = {}
+    for t in targets:
+        label_changed = common[(cur_u.loc[common, t] != prev.loc[common, t]).values]
+        touched = added.union(label_changed).union(text_changed)
+
+        pos_added = (cur_u.loc[added, t] == 1).any() if len(added) else False
+        pos_removed = (prev.loc[removed, t] == 1).any() if len(removed) else False
+        pos_text = (
+            (cur_u.loc[text_changed, t] == 1).any() or (prev.loc[text_changed, t] == 1).any()
+            if len(text_changed) else False
+        )
+
+        if len(label_changed) or pos_added or pos_removed or pos_text:
+            out[t] = cur_pos.loc[touched].values
+    out["_removed"] = len(removed)
+    return out
+
+
+def load_model_snapshot(model_name: str, label_col: str):
+    """This model's last snapshot; falls back to the legacy shared one, else None."""
+    path = MODEL_SNAPSHOT_DIR / f"{model_name}.parquet"
+    if path.exists():
+        return pd.read_parquet(path)
+    if LABELS_SNAPSHOT.exists():
+        legacy = pd.read_parquet(LABELS_SNAPSHOT)
+        if label_col in legacy.columns:
+            return legacy[["key", "text_hash", "holdout", label_col]]
+    return None
+
+
+def save_model_snapshot(cur: pd.DataFrame, model_name: str, label_col: str) -> None:
+    MODEL_SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    cur[["key", "text_hash", "holdout", label_col]].to_parquet(MODEL_SNAPSHOT_DIR / f"{model_name}.parquet", index=False)
+
+
+# ============================
+# Manifest / bundles
+# ============================
+def load_manifest() -> dict:
+    if MANIFEST_PATH.exists():
+        return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    return {"version": 0, "models": {}, "runs": []}
+
+
+def save_manifest(manifest: dict) -> None:
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def load_current_bundle(out_dir: Path, model_name: str):
+    path = out_dir / f"{model_name}.joblib"
+    return load(path) if path.exists() else None
+
+
+def is_sgd_bundle(bundle) -> bool:
+    return bool(bundle) and bundle.get("head") == "sgd" and isinstance(bundle.get("classifier"), SGDClassifier)
+
+
+# ============================
+# Fitting
+# ============================
+def new_head() -> SGDClassifier:
+    return SGDClassifier(
+        loss="log_loss",
+        alpha=SGD_ALPHA,
+        class_weight="balanced",
+        max_iter=50,
+        tol=1e-4,
+        random_state=RANDOM_STATE,
+    )
+
+
+def cold_fit(X: np.ndarray, y: np.ndarray):
+    """Fit a fresh head; return (clf, threshold picked on out-of-fold predictions)."""
+    n_splits = int(min(SWEEP_OOF_FOLDS, np.bincount(y).min()))
+    if n_splits >= 2:
+        folds = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE)
+        oof = cross_val_predict(new_head(), X, y, cv=folds, method="predict_proba")[:, 1]
+        thr = float(choose_threshold(pr_table(y, oof))["threshold"])
+    else:
+        thr = None
+
+    clf = new_head()
+    clf.fit(X, y)
+    return clf, thr
+
+
+def warm_fit(clf: SGDClassifier, X: np.ndarray, y: np.ndarray, delta_idx: np.ndarray, rng) -> SGDClassifier:
+    """partial_fit on delta rows + a replay sample of the rest, balanced by full-set class weights."""
+    # partial_fit does not accept class_weight="balanced"; translate to sample weights
+    clf.set_params(class_weight=None)
+    w_all = compute_sample_weight("balanced", y)
+
+    others = np.setdiff1d(np.arange(len(y)), delta_idx, assume_unique=False)
+    for _ in range(WARM_EPOCHS):
+        replay = rng.choice(others, size=min(REPLAY_SIZE, len(others)), replace=False) if len(others) else others
+        batch = rng.permutation(np.concatenate([delta_idx, replay]))
+        clf.partial_fit(X[batch], y[batch], classes=np.array([0, 1]), sample_weight=w_all[batch])
+    return clf
+
+
+# ============================
+# Main
+# ============================
+def main(force_all: bool = False, replace_non_sgd: bool = False):
+    t_start = time.time()
+    df, y_df, embeddings = load_training_data()
+
+    tasks = model_tasks()
+    targets = [label_col for _subdir, label_col, _thr, _name in tasks]
+
+    cur = label_snapshot(df, y_df)
+
+    affected = {}
+    up_to_date = []     # (model_name, label_col) whose snapshot can advance without a fit
+    for _subdir, label_col, _thr, model_name in tasks:
+        prev = load_model_snapshot(model_name, label_col)
+        if prev is None or force_all:
+            affected[label_col] = np.arange(len(cur))
+            continue
+        diff = diff_snapshots(prev, cur, [label_col])
+        if label_col in diff:
+            affected[label_col] = diff[label_col]
+        else:
+            up_to_date.append((model_name, label_col))
+
+    if replace_non_sgd:
+        # Bundles skipped on earlier runs may have no label diff; replace them now
+        for subdir, label_col, _thr, model_name in tasks:
+            bundle = load_current_bundle(Path(OUTPUT_DIR) / subdir, model_name)
+            if bundle and not is_sgd_bundle(bundle):
+                affected[label_col] = np.arange(len(cur))
+
+    for model_name, label_col in up_to_date:
+        if label_col not in affected:
+            save_model_snapshot(cur, model_name, label_col)
+
+    if not affected:
+        print("No label changes since last run. Nothing to retrain.")
+        return
+
+    print(f"Models with label changes: {len(affected)} / {len(tasks)}")
+
+    manifest = load_manifest()
+    version = int(manifest.get("version", 0)) + 1
+    vtag = f"v{version:04d}"
+    rng = np.random.default_rng(RANDOM_STATE + version)
+
+    train_mask = ~cur["holdout"].values
+    test_mask = cur["holdout"].values
+    train_pos = np.flatnonzero(train_mask)
+    # map full-row positions -> positions within the training subset
+    pos_in_train = np.full(len(cur), -1)
+    pos_in_train[train_pos] = np.arange(len(train_pos))
+
+    X_train, X_test = embeddings[train_mask], embeddings[test_mask]
+    root = Path(OUTPUT_DIR)
+    run_log = {"version": vtag, "started": datetime.now(timezone.utc).isoformat(), "models": {}}
+    skipped_non_sgd = []
+
+    for subdir, label_col, default_thr, model_name in tasks:
+        if label_col not in affected:
+            continue
+
+        y = y_df[label_col].values.astype(int)
+        y_train, y_test = y[train_mask], y[test_mask]
+        if len(np.unique(y_train)) < 2:
+            print(f"Skipping {model_name}: only one class present.")
+            continue
+
+        out_dir = root / subdir
+        prev_bundle = load_current_bundle(out_dir, model_name)
+        prev_clf = prev_bundle.get("classifier") if prev_bundle else None
+        prev_is_sgd = is_sgd_bundle(prev_bundle)
+
+        if prev_bundle and not prev_is_sgd and not replace_non_sgd:
+            print(f"Skipping {model_name}: current bundle is not an SGD head (use --replace-non-sgd to overwrite).")
+            skipped_non_sgd.append(model_name)
+            continue
+
+        delta = pos_in_train[affected[label_col]]
+        delta = delta[delta >= 0]
+
+        if prev_is_sgd and not force_all and len(delta) == 0:
+            # Only removed / held-out rows changed: nothing for partial_fit to learn from
+            print(f"{model_name}: no new training rows, keeping current bundle.")
+            save_model_snapshot(cur, model_name, label_col)
+            continue
+
+        t0 = time.time()
+        if prev_is_sgd and not force_all:
+            # Same head, same probability scale: keep the threshold picked for it
+            clf = warm_fit(prev_clf, X_train, y_train, delta, rng)
+            thr = float(prev_bundle.get("threshold", default_thr))
+            mode = "warm"
+        else:
+            clf, thr = cold_fit(X_train, y_train)
+            if thr is None:
+                thr = default_thr
+            mode = "cold"
+
+        ap = float(average_precision_score(y_test, clf.predict_proba(X_test)[:, 1])) if len(np.unique(y_test)) > 1 else None
+
+        bundle = {
+            "embed_model": EMBED_MODEL,
+            "classifier": clf,
+            "threshold": thr,
+            "label": model_name,
+            "use_url_fallback": USE_URL_FALLBACK,
+            "head": "sgd",
+            "version": vtag,
+            "holdout_average_precision": ap,
+        }
+        version_dir = out_dir / "versions" / vtag
+        version_dir.mkdir(parents=True, exist_ok=True)
+        dump(bundle, version_dir / f"{model_name}.joblib")
+        dump(bundle, out_dir / f"{model_name}.joblib")
+
+        info = {"mode": mode, "delta_rows": int(len(delta)), "holdout_ap": ap, "threshold": thr}
+        manifest["models"][model_name] = {"version": vtag, **info}
+        run_log["models"][model_name] = info
+        ap_txt = f"{ap:.3f}" if ap is not None else "n/a"
+        print(f"{model_name}: {mode} fit on {len(delta)} delta rows in {format_seconds(time.time() - t0)} | holdout AP={ap_txt}")
+        save_model_snapshot(cur, model_name, label_col)
+
+    if not run_log["models"]:
+        if skipped_non_sgd:
+            raise RuntimeError(
+                f"No model retrained: {len(skipped_non_sgd)} affected model(s) have non-SGD bundles "
+                f"({', '.join(skipped_non_sgd)}); rerun with replace_non_sgd=True / --replace-non-sgd"
+            )
+        print("No model retrained.")
+        return
+
+    manifest["version"] = version
+    manifest["runs"].append(run_log)
+    save_manifest(manifest)
+
+    print(f"\nIncremental run {vtag} done in {format_seconds(time.time() - t_start)}")
+    print(f"Retrained: {len(run_log['models'])} / {len(tasks)} models")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental warm-start retraining")
+    parser.add_argument("--force-all", action="store_true", help="cold-refit every model")
+    parser.add_argument(
+        "--replace-non-sgd", action="store_true",
+        help="overwrite current bundles that are not SGD heads (e.g. calibrated LinearSVC)",
+    )
+    args = parser.parse_args()
+    main(force_all=args.force_all, replace_non_sgd=args.replace_non_sgd)
@@ -1,19 +1,34 @@
 import os
+import re
+import sys
+import argparse
 import json
 import time
 import random
-import threading
-from typing import Dict, Any, Tuple, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+from pathlib import Path
+from typing import Dict, Any, Tuple, List, Optional
 
 from dotenv import load_dotenv
 from openpyxl import load_workbook
 from openpyxl.worksheet.worksheet import Worksheet
 from tqdm import tqdm
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from google import genai
 
+# Shared provider batch-job helpers live with the extraction code
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Database Builder"))
+from helper_scripts.batch_api import (  # noqa: E402
+    ENDPOINT_RESPONSES,
+    build_request,
+    job_name_for,
+    make_batch_client,
+    responses_output_text,
+    run_batch_job,
+)
+from helper_scripts.llm_cache import LLMCache, cache_key  # noqa: E402
+
 
 # ============================
 # Models
@@ -24,12 +39,19 @@ GEMINI_MODEL = "gemini-2.5-flash"
 # ============================
 # Runtime controls
 # ============================
-MAX_WORKERS = 20
-SAVE_EVERY = 100
+# Labels are appended to <output>.labels.jsonl as they complete and merged
+# into the xlsx once at the end (or with --merge); resume reads the sidecar.
 MAX_RETRIES = 4
 FUTURE_TIMEOUT_S = 240  # 4 mins
 JITTER_MAX_S = 0.15
 
+# Per-provider adaptive concurrency (AIMD); limits move within [1, MAX_CONCURRENCY]
+OPENAI_INITIAL_CONCURRENCY = 10
+GEMINI_INITIAL_CONCURRENCY = 10
+MAX_CONCURRENCY = 64           # per provider; rows in flight = sum over providers
+RATE_LIMIT_PAUSE_S = 2.0       # pause after a 429 without retry-after
+TOKEN_HEADROOM = 5_000         # back off when remaining-tokens drops below this
+
 # ============================
 # Disruption types
 # ============================
@@ -78,6 +100,16 @@ OPENAI_TEXT_FORMAT = {
     "strict": True,
 }
 
+GEMINI_PREAMBLE = "Return ONLY a valid JSON object. No markdown. No commentary. No extra text.\n\n"
+GEMINI_CONFIG = {
+    "response_mime_type": "application/json",
+    "temperature": 0,
+}
+
+# Response cache shared with DisruptionExtractor.py; re-runs and prompt tweaks
+# only pay for rows whose prompt actually changed
+llm_cache = LLMCache()
+
 
 # ============================
 # Helpers
@@ -98,8 +130,18 @@ def _coerce_label(v: Any) -> int:
 def validate_payload(payload: Dict[str, Any]) -> Dict[str, int]:
     return {t: _coerce_label(payload[t]) for t in TYPES}
 
-def backoff(attempt: int) -> None:
-    time.sleep((2 ** attempt) * 0.6 + random.random() * 0.3)
+async def backoff(attempt: int) -> None:
+    await asyncio.sleep((2 ** attempt) * 0.6 + random.random() * 0.3)
+
+def cached_labels(key: str, parse) -> Optional[Dict[str, int]]:
+    """Labels from the response cache, or None on a miss / unparseable entry."""
+    raw = llm_cache.get(key)
+    if raw is None:
+        return None
+    try:
+        return validate_payload(parse(raw))
+    except Exception:
+        return None
 
 def strip_fences(text: str) -> str:
     t = (text or "").strip()
@@ -145,101 +187,461 @@ def ensure_column(ws: Worksheet, hm: Dict[str, int], col_name: str) -> Dict[str,
 
 
 # ============================
-# Thread-local clients
+# Adaptive concurrency (per provider)
 # ============================
-_thread_local = threading.local()
+def _parse_duration(v: Optional[str]) -> Optional[float]:
+    """Parse rate-limit reset values like '1s', '6m0s', '20ms' or plain seconds."""
+    if not v:
+        return None
+    v = str(v).strip()
+    try:
+        return float(v)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", v)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(n) * scale[u] for n, u in parts)
+
+
+def _header_int(headers, key: str) -> Optional[int]:
+    try:
+        v = headers.get(key) if headers is not None else None
+        return int(float(v)) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency controller for one provider.
+
+    - additive increase: +1 slot per `limit` successful calls
+    - multiplicative decrease: halve the limit on a 429 and pause for retry-after
+    - header-driven: cap the limit at remaining-requests and pause until the
+      window resets when remaining requests/tokens run out
+    """
+
+    def __init__(self, name: str, initial: int, min_limit: int = 1, max_limit: int = 64):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.n_ok = 0
+        self.n_429 = 0
+        self._pause_until = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            while True:
+                wait = self._pause_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    break
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=wait if wait > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def _pause(self, seconds: float) -> None:
+        self._pause_until = max(self._pause_until, time.monotonic() + seconds)
+
+    def on_success(self, headers=None) -> None:
+        self.n_ok += 1
+        self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+
+        rem_req = _header_int(headers, "x-ratelimit-remaining-requests")
+        rem_tok = _header_int(headers, "x-ratelimit-remaining-tokens")
+
+        if rem_req is not None:
+            self.limit = max(self.min_limit, min(self.limit, float(max(rem_req, 1))))
+            if rem_req <= 0:
+                self._pause(_parse_duration(headers.get("x-ratelimit-reset-requests")) or 1.0)
+        if rem_tok is not None and rem_tok < TOKEN_HEADROOM:
+            self.limit = max(self.min_limit, self.limit * 0.5)
+            self._pause(_parse_duration(headers.get("x-ratelimit-reset-tokens")) or 1.0)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        self.n_429 += 1
+        self.limit = max(self.min_limit, self.limit * 0.5)
+        self._pause(retry_after if retry_after else RATE_LIMIT_PAUSE_S)
+
+    def summary(self) -> str:
+        return f"{self.name}: limit={self.limit:.1f} ok={self.n_ok} 429s={self.n_429}"
+
+
+def _is_rate_limited(e: Exception) -> bool:
+    if getattr(e, "status_code", None) == 429 or getattr(e, "code", None) == 429:
+        return True
+    return "429" in str(e)[:200] or "RESOURCE_EXHAUSTED" in str(e)[:200]
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    resp = getattr(e, "response", None)
+    headers = getattr(resp, "headers", None)
+    if headers is None:
+        return None
+    return _parse_duration(headers.get("retry-after")) or _parse_duration(headers.get("x-ratelimit-reset-requests"))
 
-def get_openai_client(openai_key: str) -> OpenAI:
-    if not hasattr(_thread_local, "openai_client"):
-        _thread_local.openai_client = OpenAI(api_key=openai_key)
-    return _thread_local.openai_client
 
-def get_gemini_client(gemini_key: str) -> genai.Client:
-    if not hasattr(_thread_local, "gemini_client"):
-        _thread_local.gemini_client = genai.Client(api_key=gemini_key)
-    return _thread_local.gemini_client
+# ============================
+# Provider calls
+# ============================
+def openai_cache_key(user_text: str) -> str:
+    return cache_key(OPENAI_MODEL, SYSTEM_RUBRIC, user_text, OPENAI_TEXT_FORMAT)
+
+
+def gemini_cache_key(contents: str) -> str:
+    return cache_key(GEMINI_MODEL, "", contents, GEMINI_CONFIG)
+
+
+async def call_openai(client: AsyncOpenAI, limiter: AdaptiveLimiter, user_text: str) -> Dict[str, int]:
+    key = openai_cache_key(user_text)
+    hit = cached_labels(key, json.loads)
+    if hit is not None:
+        return hit
+
+    for a in range(MAX_RETRIES):
+        await limiter.acquire()
+        try:
+            raw = await client.responses.with_raw_response.create(
+                model=OPENAI_MODEL,
+                input=[
+                    {"role": "system", "content": SYSTEM_RUBRIC},
+                    {"role": "user", "content": user_text},
+                ],
+                text={"format": OPENAI_TEXT_FORMAT},
+                temperature=0,
+            )
+            limiter.on_success(raw.headers)
+            resp = raw.parse()
+            labels = validate_payload(json.loads(resp.output_text))
+            llm_cache.put(key, resp.output_text, model=OPENAI_MODEL)
+            return labels
+        except Exception as e:
+            if _is_rate_limited(e):
+                limiter.on_rate_limited(_retry_after(e))
+            if a == MAX_RETRIES - 1:
+                raise
+            if not _is_rate_limited(e):
+                await backoff(a)
+        finally:
+            await limiter.release()
+    return {}
+
+
+async def call_gemini(client: genai.Client, limiter: AdaptiveLimiter, user_text: str) -> Dict[str, int]:
+    contents = GEMINI_PREAMBLE + SYSTEM_RUBRIC + "\n\n" + user_text
+    key = gemini_cache_key(contents)
+    hit = cached_labels(key, lambda raw: json.loads(extract_json_object(raw)))
+    if hit is not None:
+        return hit
+
+    for a in range(MAX_RETRIES):
+        await limiter.acquire()
+        try:
+            resp = await client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=contents,
+                # Key bit: request JSON output
+                config=GEMINI_CONFIG,
+            )
+            http = getattr(resp, "sdk_http_response", None)
+            limiter.on_success(getattr(http, "headers", None))
+
+            raw = (resp.text or "").strip()
+            # With response_mime_type this should already be JSON,
+            # but we keep a fallback extractor for robustness.
+            labels = validate_payload(json.loads(extract_json_object(raw)))
+            llm_cache.put(key, raw, model=GEMINI_MODEL)
+            return labels
+        except Exception as e:
+            if _is_rate_limited(e):
+                limiter.on_rate_limited(_retry_after(e))
+            if a == MAX_RETRIES - 1:
+                raise
+            if not _is_rate_limited(e):
+                await backoff(a)
+        finally:
+            await limiter.release()
+    return {}
 
 
 # ============================
 # Worker
 # ============================
-def label_row(
+async def label_row(
     row_id: int,
     url: str,
     title: str,
     meta: str,
     need_cg: bool,
     need_gm: bool,
-    openai_key: str,
-    gemini_key: str,
+    openai_client: AsyncOpenAI,
+    gemini_client: genai.Client,
+    limiters: Dict[str, AdaptiveLimiter],
 ) -> Tuple[int, Dict[str, int], Dict[str, int]]:
+    """
+    Label one row with both providers concurrently. If only one provider
+    fails, the other's labels are still returned (the row is retried on the
+    next run because its missing columns stay empty).
+    """
+    await asyncio.sleep(random.random() * JITTER_MAX_S)
 
-    time.sleep(random.random() * JITTER_MAX_S)
+    user_text = make_user_text(url, title, meta)
 
-    openai_client = get_openai_client(openai_key)
-    gemini_client = get_gemini_client(gemini_key)
+    async def _none() -> Dict[str, int]:
+        return {}
 
-    user_text = make_user_text(url, title, meta)
-    cg_out: Dict[str, int] = {}
-    gm_out: Dict[str, int] = {}
+    cg_res, gm_res = await asyncio.gather(
+        call_openai(openai_client, limiters["openai"], user_text) if need_cg else _none(),
+        call_gemini(gemini_client, limiters["gemini"], user_text) if need_gm else _none(),
+        return_exceptions=True,
+    )
+
+    if isinstance(cg_res, BaseException) and isinstance(gm_res, BaseException):
+        raise cg_res
+    if isinstance(cg_res, BaseException) and not gm_res:
+        raise cg_res
+    if isinstance(gm_res, BaseException) and not cg_res:
+        raise gm_res
 
-    # OpenAI (structured outputs)
-    if need_cg:
-        for a in range(MAX_RETRIES):
+    cg_out = {} if isinstance(cg_res, BaseException) else cg_res
+    gm_out = {} if isinstance(gm_res, BaseException) else gm_res
+    return row_id, cg_out, gm_out
+
+
+async def run_jobs(jobs, openai_key: str, gemini_key: str, on_result) -> Tuple[int, int]:
+    """
+    Run all rows on one event loop. Each provider's AdaptiveLimiter bounds its
+    own concurrent requests; rows in flight are capped at the sum of the
+    limiters' max_limit, so the row cap never stops a limiter from growing.
+    """
+    openai_client = AsyncOpenAI(api_key=openai_key)
+    gemini_client = genai.Client(api_key=gemini_key)
+    limiters = {
+        "openai": AdaptiveLimiter("openai", initial=OPENAI_INITIAL_CONCURRENCY, max_limit=MAX_CONCURRENCY),
+        "gemini": AdaptiveLimiter("gemini", initial=GEMINI_INITIAL_CONCURRENCY, max_limit=MAX_CONCURRENCY),
+    }
+    row_slots = asyncio.Semaphore(sum(l.max_limit for l in limiters.values()))
+
+    async def _one(job):
+        r, url, title, meta, need_cg, need_gm = job
+        async with row_slots:
+            return await asyncio.wait_for(
+                label_row(r, url, title, meta, need_cg, need_gm, openai_client, gemini_client, limiters),
+                timeout=FUTURE_TIMEOUT_S,
+            )
+
+    completed = 0
+    failed = 0
+    tasks = [asyncio.create_task(_one(job)) for job in jobs]
+
+    pbar = tqdm(total=len(tasks), desc="Labelling")
+    for fut in asyncio.as_completed(tasks):
+        try:
+            r, cg_out, gm_out = await fut
+        except Exception:
+            failed += 1
+            # still advance progress so it doesn't "hang"
+            pbar.update(1)
+            continue
+
+        on_result(r, cg_out, gm_out)
+        completed += 1
+        pbar.update(1)
+        if completed % 100 == 0:
+            pbar.set_postfix_str(" | ".join(l.summary() for l in limiters.values()))
+
+    pbar.close()
+    print(" | ".join(l.summary() for l in limiters.values()))
+    await openai_client.close()
+    return completed, failed
+
+
+# ============================
+# Label sidecar (append-only JSONL)
+# ============================
+def sidecar_path(output_xlsx: str) -> str:
+    return os.path.splitext(output_xlsx)[0] + ".labels.jsonl"
+
+
+def append_sidecar(f, r: int, url: str, cg_out: Dict[str, int], gm_out: Dict[str, int]) -> None:
+    rec = {"row": r, "url": url}
+    if cg_out:
+        rec["chatgpt"] = cg_out
+    if gm_out:
+        rec["gemini"] = gm_out
+    f.write(json.dumps(rec) + "\n")
+    f.flush()
+
+
+def load_sidecar(path: str) -> Dict[int, Dict[str, Any]]:
+    """row -> {"url", "chatgpt", "gemini"}; later lines override earlier ones per provider."""
+    labels: Dict[int, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return labels
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
             try:
-                resp = openai_client.responses.create(
-                    model=OPENAI_MODEL,
-                    input=[
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line after a crash
+            cur = labels.setdefault(int(rec["row"]), {"url": rec.get("url", "")})
+            for k in ("chatgpt", "gemini"):
+                if rec.get(k):
+                    cur[k] = rec[k]
+    return labels
+
+
+def prepare_sheet(input_xlsx: str):
+    wb = load_workbook(input_xlsx)
+    ws = wb["data"]
+    hm = header_map(ws)
+
+    # Ensure comparison columns exist
+    hm = ensure_column(ws, hm, "agree_all")
+    hm = ensure_column(ws, hm, "n_disagree")
+    hm = ensure_column(ws, hm, "disagree_labels")
+
+    # Validate required columns
+    required_cols = ["row_origin", "url_normalized", "title", "meta_description"]
+    for t in TYPES:
+        required_cols += [f"chatgpt_{t}", f"gemini_{t}"]
+    missing = [c for c in required_cols if c not in hm]
+    if missing:
+        raise RuntimeError(f"Workbook missing required columns: {missing}")
+
+    return wb, ws, hm
+
+
+def _sidecar_matches(ws: Worksheet, hm: Dict[str, int], r: int, entry: Dict[str, Any]) -> bool:
+    """Guard against row numbers shifting between runs."""
+    return str(ws.cell(r, hm["url_normalized"]).value or "") == entry.get("url", "")
+
+
+def merge_sidecar(ws: Worksheet, hm: Dict[str, int], labels: Dict[int, Dict[str, Any]]) -> int:
+    """Write sidecar labels into the sheet and recompute the comparison columns."""
+    merged = 0
+    for r, entry in labels.items():
+        if r > ws.max_row or not _sidecar_matches(ws, hm, r, entry):
+            continue
+
+        for t, v in entry.get("chatgpt", {}).items():
+            ws.cell(r, hm[f"chatgpt_{t}"], v)
+        for t, v in entry.get("gemini", {}).items():
+            ws.cell(r, hm[f"gemini_{t}"], v)
+
+        cg = [ws.cell(r, hm[f"chatgpt_{t}"]).value for t in TYPES]
+        gm = [ws.cell(r, hm[f"gemini_{t}"]).value for t in TYPES]
+
+        # Compare (only if both complete)
+        if all(v not in (None, "") for v in cg + gm):
+            disagree = [t for t, a, b in zip(TYPES, cg, gm) if int(a) != int(b)]
+            ws.cell(r, hm["agree_all"], 1 if len(disagree) == 0 else 0)
+            ws.cell(r, hm["n_disagree"], len(disagree))
+            ws.cell(r, hm["disagree_labels"], ",".join(disagree))
+        else:
+            # if one model missing, mark as NA
+            ws.cell(r, hm["agree_all"], None)
+            ws.cell(r, hm["n_disagree"], None)
+            ws.cell(r, hm["disagree_labels"], None)
+        merged += 1
+    return merged
+
+
+def _paths():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    input_xlsx = os.path.join(base_dir, "data", "interim", "disruption_master_10k_multiexpert.xlsx")
+    output_xlsx = os.path.join(base_dir, "data", "interim", "disruption_master_10k_multiexpert_labelled.xlsx")
+    return base_dir, input_xlsx, output_xlsx
+
+
+def label_openai_via_batch(jobs, openai_key: str, side_path: str, url_by_row: Dict[int, str]) -> Tuple[int, int]:
+    """
+    Send every row that still needs OpenAI labels as one provider batch job
+    and append the results to the sidecar. Gemini stays on the async engine.
+    """
+    cg_jobs = [j for j in jobs if j[4]]
+    if not cg_jobs:
+        return 0, 0
+
+    ok = failed = 0
+    keys: Dict[str, str] = {}
+    requests = []
+    with open(side_path, "a", encoding="utf-8") as side_f:
+        for (r, url, title, meta, _need_cg, _need_gm) in cg_jobs:
+            user_text = make_user_text(url, title, meta)
+            key = openai_cache_key(user_text)
+            hit = cached_labels(key, json.loads)
+            if hit is not None:
+                append_sidecar(side_f, r, url_by_row[r], hit, {})
+                ok += 1
+                continue
+            keys[f"row-{r}"] = key
+            requests.append(build_request(
+                f"row-{r}",
+                ENDPOINT_RESPONSES,
+                {
+                    "model": OPENAI_MODEL,
+                    "input": [
                         {"role": "system", "content": SYSTEM_RUBRIC},
                         {"role": "user", "content": user_text},
                     ],
-                    text={"format": OPENAI_TEXT_FORMAT},
-                    temperature=0,
-                )
-                cg_out = validate_payload(json.loads(resp.output_text))
-                break
-            except Exception:
-                if a == MAX_RETRIES - 1:
-                    raise
-                backoff(a)
+                    "text": {"format": OPENAI_TEXT_FORMAT},
+                    "temperature": 0,
+                },
+            ))
+
+        if not requests:
+            return ok, failed
+
+        work_dir = Path(side_path).parent / "batch_jobs"
+        job_name = job_name_for("label", requests)
+        replies = run_batch_job(make_batch_client(api_key=openai_key), requests, ENDPOINT_RESPONSES, work_dir, job_name)
 
-    # Gemini (force JSON)
-    if need_gm:
-        for a in range(MAX_RETRIES):
+        for cid, key in keys.items():
+            reply = replies.get(cid)
             try:
-                resp = gemini_client.models.generate_content(
-                    model=GEMINI_MODEL,
-                    contents=(
-                        "Return ONLY a valid JSON object. No markdown. No commentary. No extra text.\n\n"
-                        + SYSTEM_RUBRIC + "\n\n" + user_text
-                    ),
-                    # Key bit: request JSON output
-                    config={
-                        "response_mime_type": "application/json",
-                        "temperature": 0,
-                    },
-                )
-
-                raw = (resp.text or "").strip()
-                # With response_mime_type this should already be JSON,
-                # but we keep a fallback extractor for robustness.
-                gm_out = validate_payload(json.loads(extract_json_object(raw)))
-                break
+                text = responses_output_text(reply["body"])
+                cg_out = validate_payload(json.loads(text))
             except Exception:
-                if a == MAX_RETRIES - 1:
-                    raise
-                backoff(a)
+                failed += 1
+                continue
+            llm_cache.put(key, text, model=OPENAI_MODEL)
+            r = int(cid.split("-", 1)[1])
+            append_sidecar(side_f, r, url_by_row[r], cg_out, {})
+            ok += 1
+    return ok, failed
 
-    return row_id, cg_out, gm_out
+
+def merge_only():
+    """Merge the sidecar into the xlsx without calling any provider."""
+    _base_dir, input_xlsx, output_xlsx = _paths()
+    if not os.path.exists(input_xlsx):
+        raise FileNotFoundError(f"Input file not found: {input_xlsx}")
+
+    wb, ws, hm = prepare_sheet(input_xlsx)
+    n = merge_sidecar(ws, hm, load_sidecar(sidecar_path(output_xlsx)))
+    wb.save(output_xlsx)
+    print(f"Merged {n} labelled rows into: {output_xlsx}")
 
 
-def main():
+def main(use_batch_api: bool = False):
     # Load .env from script directory (so it works no matter where you run from)
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    base_dir, input_xlsx, output_xlsx = _paths()
     load_dotenv(os.path.join(base_dir, ".env"))
-
-    input_xlsx = os.path.join(base_dir, "data", "interim", "disruption_master_10k_multiexpert.xlsx")
-    output_xlsx = os.path.join(base_dir, "data", "interim", "disruption_master_10k_multiexpert_labelled.xlsx")
     os.makedirs(os.path.dirname(output_xlsx), exist_ok=True)
 
     openai_key = os.getenv("OPENAI_PROJECT_KEY") or os.getenv("OPENAI_ADMIN_KEY")
@@ -252,22 +654,12 @@ def main():
     if not os.path.exists(input_xlsx):
         raise FileNotFoundError(f"Input file not found: {input_xlsx}")
 
-    wb = load_workbook(input_xlsx)
-    ws = wb["data"]
-    hm = header_map(ws)
+    wb, ws, hm = prepare_sheet(input_xlsx)
 
-    # Ensure comparison columns exist
-    hm = ensure_column(ws, hm, "agree_all")
-    hm = ensure_column(ws, hm, "n_disagree")
-    hm = ensure_column(ws, hm, "disagree_labels")
-
-    # Validate required columns
-    required_cols = ["row_origin", "url_normalized", "title", "meta_description"]
-    for t in TYPES:
-        required_cols += [f"chatgpt_{t}", f"gemini_{t}"]
-    missing = [c for c in required_cols if c not in hm]
-    if missing:
-        raise RuntimeError(f"Workbook missing required columns: {missing}")
+    # Resume: labels already in the sidecar count as done
+    side_path = sidecar_path(output_xlsx)
+    done = load_sidecar(side_path)
+    print(f"Sidecar rows already labelled: {len(done)}")
 
     # Build jobs
     jobs: List[Tuple[int, str, str, str, bool, bool]] = []
@@ -276,8 +668,9 @@ def main():
         if origin == "gold_manual":
             continue
 
-        need_cg = any(ws.cell(r, hm[f"chatgpt_{t}"]).value in (None, "") for t in TYPES)
-        need_gm = any(ws.cell(r, hm[f"gemini_{t}"]).value in (None, "") for t in TYPES)
+        prev = done.get(r) if r in done and _sidecar_matches(ws, hm, r, done[r]) else {}
+        need_cg = not prev.get("chatgpt") and any(ws.cell(r, hm[f"chatgpt_{t}"]).value in (None, "") for t in TYPES)
+        need_gm = not prev.get("gemini") and any(ws.cell(r, hm[f"gemini_{t}"]).value in (None, "") for t in TYPES)
         if not (need_cg or need_gm):
             continue
 
@@ -290,59 +683,39 @@ def main():
         jobs.append((r, url, title, meta, need_cg, need_gm))
 
     print(f"Rows to label: {len(jobs)}")
-    if not jobs:
-        print("Nothing to do.")
-        return
-
-    completed = 0
-    failed = 0
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
-        futures = [
-            ex.submit(label_row, r, url, title, meta, need_cg, need_gm, openai_key, gemini_key)
-            for (r, url, title, meta, need_cg, need_gm) in jobs
-        ]
-
-        pbar = tqdm(total=len(futures), desc="Labelling")
-        for fut in as_completed(futures):
-            try:
-                r, cg_out, gm_out = fut.result(timeout=FUTURE_TIMEOUT_S)
-            except Exception as e:
-                failed += 1
-                # still advance progress so it doesn't "hang"
-                pbar.update(1)
-                continue
-
-            # Write model outputs
-            for t, v in cg_out.items():
-                ws.cell(r, hm[f"chatgpt_{t}"], v)
-            for t, v in gm_out.items():
-                ws.cell(r, hm[f"gemini_{t}"], v)
-
-            # Compare (only if both present)
-            if cg_out and gm_out:
-                disagree = [t for t in TYPES if int(cg_out[t]) != int(gm_out[t])]
-                ws.cell(r, hm["agree_all"], 1 if len(disagree) == 0 else 0)
-                ws.cell(r, hm["n_disagree"], len(disagree))
-                ws.cell(r, hm["disagree_labels"], ",".join(disagree))
-            else:
-                # if one model missing, mark as NA
-                ws.cell(r, hm["agree_all"], None)
-                ws.cell(r, hm["n_disagree"], None)
-                ws.cell(r, hm["disagree_labels"], None)
-
-            completed += 1
-            if completed % SAVE_EVERY == 0:
-                wb.save(output_xlsx)
-
-            pbar.update(1)
-
-        pbar.close()
 
+    if jobs and use_batch_api:
+        url_by_row = {j[0]: str(ws.cell(j[0], hm["url_normalized"]).value or "") for j in jobs}
+        ok, bad = label_openai_via_batch(jobs, openai_key, side_path, url_by_row)
+        print(f"OpenAI batch: {ok} labelled | {bad} failed")
+        # Gemini (and any OpenAI rows the batch failed on are retried next run)
+        jobs = [(r, u, t, m, False, need_gm) for (r, u, t, m, _cg, need_gm) in jobs if need_gm]
+
+    if jobs:
+        url_by_row = {j[0]: str(ws.cell(j[0], hm["url_normalized"]).value or "") for j in jobs}
+        with open(side_path, "a", encoding="utf-8") as side_f:
+            def _write_result(r: int, cg_out: Dict[str, int], gm_out: Dict[str, int]) -> None:
+                append_sidecar(side_f, r, url_by_row[r], cg_out, gm_out)
+
+            completed, failed = asyncio.run(run_jobs(jobs, openai_key, gemini_key, _write_result))
+        print(f"Completed: {completed} | Failed: {failed}")
+        print(llm_cache.summary())
+    else:
+        print("Nothing to label.")
+
+    # Single xlsx write at the end
+    n = merge_sidecar(ws, hm, load_sidecar(side_path))
     wb.save(output_xlsx)
-    print(f"Done. Saved to: {output_xlsx}")
-    print(f"Completed: {completed} | Failed: {failed}")
+    print(f"Done. Merged {n} labelled rows. Saved to: {output_xlsx}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Dual-LLM multi-expert labeller")
+    parser.add_argument("--merge", action="store_true", help="only merge the label sidecar into the xlsx")
+    parser.add_argument("--batch", action="store_true", help="send OpenAI requests as a provider batch job")
+    args = parser.parse_args()
+
+    if args.merge:
+        merge_only()
+    else:
+        main(use_batch_api=args.batch)
@@ -10,6 +10,12 @@ import relevant_urls
 
 DATE_FMT = "%Y%m%d"
 
+# Retrain models touched by new gold labels after the daily run (incremental_training.py)
+RETRAIN_INCREMENTAL = False
+# Let incremental retraining replace the calibrated LinearSVC bundles with SGD heads
+# (otherwise a run with only LinearSVC bundles raises instead of retraining nothing)
+RETRAIN_REPLACE_NON_SGD = False
+
 
 def _parse_dates(user_input: str) -> list[str]:
     """
@@ -108,6 +114,14 @@ def start_pipeline():
             print(f"\n!!! Failed for {d}: {repr(e)}")
             continue
 
+    if RETRAIN_INCREMENTAL:
+        print("\n>> Incremental model retraining...")
+        try:
+            import incremental_training
+            incremental_training.main(replace_non_sgd=RETRAIN_REPLACE_NON_SGD)
+        except Exception as e:
+            print(f"\n!!! Incremental retraining failed: {repr(e)}")
+
     print("\nALL STEPS COMPLETE")
 
 
@@ -0,0 +1,203 @@
+"""
+Prepared-dataset stage for the disruption classifiers.
+
+Converts the labelled workbook to Parquet once and keeps a content-hashed
+embedding matrix alongside it, so training runs only pay for Excel parsing
+when the workbook changes and only re-embed rows whose text changed.
+
+Layout (next to the workbook):
+  data/interim/prepared/<workbook_stem>.parquet
+  data/interim/prepared/<workbook_stem>.source.json       (xlsx size + mtime)
+  data/interim/prepared/<workbook_stem>.<embed_model>.npy  (embedding matrix)
+  data/interim/prepared/<workbook_stem>.<embed_model>.keys.npy (sha1 per row)
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+# ============================
+# Config
+# ============================
+BASE_DIR = Path(__file__).resolve().parent
+PREPARED_DIR = BASE_DIR / "data" / "interim" / "prepared"
+
+DEFAULT_EMBED_MODEL = "all-MiniLM-L6-v2"
+EMBED_BATCH_SIZE = 64
+
+
+# ============================
+# Paths
+# ============================
+def _source_stamp(xlsx_path: Path) -> dict:
+    st = xlsx_path.stat()
+    return {"path": str(xlsx_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def prepared_paths(xlsx_path: Path, prepared_dir: Path = PREPARED_DIR) -> dict:
+    stem = Path(xlsx_path).stem
+    return {
+        "parquet": prepared_dir / f"{stem}.parquet",
+        "source": prepared_dir / f"{stem}.source.json",
+    }
+
+
+def embedding_paths(cache_stem: str, embed_model: str, prepared_dir: Path = PREPARED_DIR) -> dict:
+    model_tag = embed_model.replace("/", "_")
+    return {
+        "matrix": prepared_dir / f"{cache_stem}.{model_tag}.npy",
+        "keys": prepared_dir / f"{cache_stem}.{model_tag}.keys.npy",
+    }
+
+
+# ============================
+# Workbook -> Parquet
+# ============================
+def _stringify_mixed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Excel columns often mix ints, bools and strings (e.g. 1 / 'TRUE'), which
+    Arrow refuses to write. Stringify only those columns, keeping NaN and
+    writing integral floats as '1' rather than '1.0' so label parsing is unchanged.
+    """
+    def _cell(v):
+        if v is None or (isinstance(v, float) and np.isnan(v)):
+            return None
+        if isinstance(v, float) and v.is_integer():
+            return str(int(v))
+        return str(v)
+
+    for c in df.columns:
+        if df[c].dtype == object and pd.api.types.infer_dtype(df[c], skipna=True).startswith("mixed"):
+            df[c] = df[c].map(_cell)
+    return df
+
+
+def load_labelled_frame(
+    xlsx_path: Union[str, Path],
+    sheet_name: Union[str, int] = 0,
+    prepared_dir: Path = PREPARED_DIR,
+    force: bool = False,
+) -> pd.DataFrame:
+    """
+    Return the labelled workbook as a DataFrame, reading the Parquet copy when
+    it is up to date with the xlsx (same size + mtime), else rebuilding it.
+    """
+    xlsx_path = Path(xlsx_path)
+    paths = prepared_paths(xlsx_path, prepared_dir)
+
+    if not xlsx_path.exists():
+        if paths["parquet"].exists():
+            print(f"Workbook missing, using prepared copy: {paths['parquet']}")
+            return pd.read_parquet(paths["parquet"])
+        raise FileNotFoundError(f"Training workbook not found: {xlsx_path}")
+
+    stamp = _source_stamp(xlsx_path)
+    stamp["sheet"] = sheet_name
+
+    if not force and paths["parquet"].exists() and paths["source"].exists():
+        try:
+            cached = json.loads(paths["source"].read_text(encoding="utf-8"))
+        except Exception:
+            cached = {}
+        if cached == stamp:
+            print("Loading prepared Parquet:", paths["parquet"])
+            return pd.read_parquet(paths["parquet"])
+
+    print("Loading Excel (one-off conversion):", xlsx_path)
+    df = pd.read_excel(xlsx_path, sheet_name=sheet_name, engine="openpyxl")
+    df.columns = df.columns.astype(str).str.strip()
+    df = _stringify_mixed(df)
+
+    prepared_dir.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(paths["parquet"], index=False)
+    paths["source"].write_text(json.dumps(stamp, indent=2), encoding="utf-8")
+    print("Wrote prepared Parquet:", paths["parquet"])
+
+    return df
+
+
+# ============================
+# Content-hashed embedding cache
+# ============================
+def text_key(text: str) -> str:
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+def encode_cached(
+    texts: List[str],
+    cache_stem: str,
+    embed_model: str = DEFAULT_EMBED_MODEL,
+    prepared_dir: Path = PREPARED_DIR,
+    embedder=None,
+) -> np.ndarray:
+    """
+    Return normalised embeddings for `texts` (row-aligned), re-embedding only
+    texts whose sha1 is not already in the cache. The cache is rewritten to
+    hold exactly the current texts so it never grows with stale rows.
+
+    The SentenceTransformer is only loaded when there is something to embed.
+    """
+    paths = embedding_paths(cache_stem, embed_model, prepared_dir)
+    keys = [text_key(t) for t in texts]
+
+    cached: dict = {}
+    old_matrix: Optional[np.ndarray] = None
+    if paths["matrix"].exists() and paths["keys"].exists():
+        old_matrix = np.load(paths["matrix"], mmap_mode="r")
+        old_keys = np.load(paths["keys"], allow_pickle=False)
+        if len(old_keys) == len(old_matrix):
+            cached = {k: i for i, k in enumerate(old_keys.tolist())}
+        else:
+            old_matrix = None
+
+    missing = sorted({k for k in keys if k not in cached})
+    n_hits = sum(k in cached for k in keys)
+    print(f"Embedding cache: {n_hits} hits | {len(missing)} texts to embed")
+
+    new_vecs: dict = {}
+    if missing:
+        if embedder is None:
+            from sentence_transformers import SentenceTransformer
+            embedder = SentenceTransformer(embed_model)
+
+        text_by_key = {}
+        for k, t in zip(keys, texts):
+            text_by_key.setdefault(k, str(t))
+
+        vecs = embedder.encode(
+            [text_by_key[k] for k in missing],
+            normalize_embeddings=True,
+            batch_size=EMBED_BATCH_SIZE,
+            show_progress_bar=True,
+        )
+        new_vecs = dict(zip(missing, np.asarray(vecs, dtype=np.float32)))
+
+    if not keys:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    dim = old_matrix.shape[1] if old_matrix is not None else len(next(iter(new_vecs.values())))
+    out = np.empty((len(keys), dim), dtype=np.float32)
+    for i, k in enumerate(keys):
+        out[i] = new_vecs[k] if k in new_vecs else old_matrix[cached[k]]
+
+    # Persist (unique keys only, so duplicate texts are stored once)
+    uniq_keys = list(dict.fromkeys(keys))
+    first_row = {k: i for i, k in reversed(list(enumerate(keys)))}
+    prepared_dir.mkdir(parents=True, exist_ok=True)
+    del old_matrix  # release the memmap before overwriting the file
+    np.save(paths["matrix"], out[[first_row[k] for k in uniq_keys]])
+    np.save(paths["keys"], np.array(uniq_keys))
+
+    return out
+
+
+if __name__ == "__main__":
+    # Convert the multi-expert workbook once so later training runs start from Parquet
+    wb = BASE_DIR / "data" / "interim" / "disruption_master_10k_multiexpert_labelled.xlsx"
+    frame = load_labelled_frame(wb, sheet_name="data", force=True)
+    print("Rows:", len(frame), "| Columns:", len(frame.columns))
@@ -0,0 +1,234 @@
+"""
+Threshold + hyperparameter sweep for the general/expert disruption models.
+
+Runs on the cached embedding matrix (see prepare_training_data.py), so each
+grid point only costs a few classifier fits. For every model it:
+  - evaluates LinearSVC C values x calibration methods in parallel, scoring each
+    by average precision of out-of-fold predictions on the training split
+  - keeps the grid point with the best out-of-fold average precision
+  - writes a PR-curve table (threshold, precision, recall, f1, keep_rate) from
+    the out-of-fold predictions and picks the threshold from it
+  - refits the chosen grid point on the whole training split, reports
+    AP / precision / recall / keep_rate once on the held-out test split, and
+    saves the model + threshold in the joblib bundle read by relevant_urls.py
+
+The test split is never used for selection, so the reported numbers are not
+optimistically biased by the choice of C, calibration or threshold.
+
+Threshold rule: among thresholds whose recall >= SWEEP_MIN_RECALL, take the one
+with the highest precision (fewest URLs kept -> fewer LLM extractions). If no
+threshold reaches the recall floor, fall back to the best F1.
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, dump
+
+from sklearn.model_selection import StratifiedKFold, cross_val_predict, train_test_split
+from sklearn.svm import LinearSVC
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.metrics import average_precision_score, precision_recall_curve
+
+from experts_general_model import (
+    EMBED_MODEL,
+    OUTPUT_DIR,
+    USE_URL_FALLBACK,
+    format_seconds,
+    load_training_data,
+    model_tasks,
+)
+
+
+# ============================
+# Config
+# ============================
+SWEEP_C_VALUES = [0.03, 0.1, 0.3, 1.0, 3.0]
+SWEEP_CALIBRATION = ["sigmoid", "isotonic"]
+SWEEP_MIN_RECALL = 0.80
+SWEEP_N_JOBS = -1  # joblib: -1 = all cores
+SWEEP_CV = 5        # calibration folds inside each fit
+SWEEP_OOF_FOLDS = 5  # out-of-fold folds on the training split (model + threshold selection)
+RANDOM_STATE = 42
+
+SWEEP_DIR = Path(OUTPUT_DIR) / "_sweep"
+
+
+# ============================
+# Grid point
+# ============================
+def make_classifier(C: float, method: str) -> CalibratedClassifierCV:
+    return CalibratedClassifierCV(LinearSVC(C=C, class_weight="balanced"), method=method, cv=SWEEP_CV)
+
+
+def oof_eval(X_train, y_train, C: float, method: str):
+    """Out-of-fold probabilities on the training split and their average precision."""
+    folds = StratifiedKFold(n_splits=SWEEP_OOF_FOLDS, shuffle=True, random_state=RANDOM_STATE)
+    probs = cross_val_predict(make_classifier(C, method), X_train, y_train, cv=folds, method="predict_proba")[:, 1]
+    return probs, float(average_precision_score(y_train, probs))
+
+
+def fit_final(X_train, y_train, X_test, C: float, method: str):
+    clf = make_classifier(C, method)
+    clf.fit(X_train, y_train)
+    return clf, clf.predict_proba(X_test)[:, 1]
+
+
+def metrics_at(y_true: np.ndarray, probs: np.ndarray, thr: float) -> dict:
+    keep = probs >= thr
+    tp = int((keep & (y_true == 1)).sum())
+    return {
+        "precision": tp / int(keep.sum()) if keep.any() else 0.0,
+        "recall": tp / int((y_true == 1).sum()) if (y_true == 1).any() else 0.0,
+        "keep_rate": float(keep.mean()),
+    }
+
+
+# ============================
+# PR curve + threshold choice
+# ============================
+def pr_table(y_true: np.ndarray, probs: np.ndarray) -> pd.DataFrame:
+    """One row per candidate threshold; keep_rate = share of rows with p >= threshold."""
+    precision, recall, thresholds = precision_recall_curve(y_true, probs)
+    precision, recall = precision[:-1], recall[:-1]  # last point has no threshold
+
+    f1 = np.divide(
+        2 * precision * recall,
+        precision + recall,
+        out=np.zeros_like(precision),
+        where=(precision + recall) > 0,
+    )
+    sorted_probs = np.sort(probs)
+    keep_rate = 1.0 - np.searchsorted(sorted_probs, thresholds, side="left") / len(probs)
+
+    return pd.DataFrame({
+        "threshold": thresholds,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "keep_rate": keep_rate,
+    })
+
+
+def choose_threshold(table: pd.DataFrame, min_recall: float = SWEEP_MIN_RECALL) -> pd.Series:
+    ok = table[table["recall"] >= min_recall]
+    if ok.empty:
+        return table.sort_values(["f1", "threshold"], ascending=[False, False]).iloc[0]
+    return ok.sort_values(["precision", "threshold"], ascending=[False, False]).iloc[0]
+
+
+# ============================
+# Main
+# ============================
+def run_sweep():
+    df, y_df, embeddings = load_training_data()
+
+    root = Path(OUTPUT_DIR)
+    SWEEP_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Same split as train_one_binary so sweep numbers are comparable
+    splits = {}
+    for subdir, label_col, _thr, model_name in model_tasks():
+        y = y_df[label_col].values.astype(int)
+        if len(np.unique(y)) < 2:
+            print(f"Skipping {model_name}: only one class present.")
+            continue
+        idx_train, idx_test = train_test_split(
+            np.arange(len(df)), test_size=0.2, stratify=y, random_state=RANDOM_STATE,
+        )
+        splits[model_name] = (subdir, y, idx_train, idx_test)
+
+    grid = [
+        (model_name, C, method)
+        for model_name in splits
+        for C in SWEEP_C_VALUES
+        for method in SWEEP_CALIBRATION
+    ]
+    print(f"Sweeping {len(grid)} grid points over {len(splits)} models (n_jobs={SWEEP_N_JOBS}) ...")
+
+    t0 = time.time()
+    results = Parallel(n_jobs=SWEEP_N_JOBS, verbose=5)(
+        delayed(oof_eval)(embeddings[splits[m][2]], splits[m][1][splits[m][2]], C, method)
+        for m, C, method in grid
+    )
+    print(f"Grid done in {format_seconds(time.time() - t0)}")
+
+    grid_rows = []
+    best = {}
+    for (model_name, C, method), (oof_probs, ap) in zip(grid, results):
+        grid_rows.append({"model": model_name, "C": C, "calibration": method, "oof_average_precision": ap})
+        if model_name not in best or ap > best[model_name][2]:
+            best[model_name] = (C, method, ap, oof_probs)
+
+    pd.DataFrame(grid_rows).to_csv(SWEEP_DIR / "sweep_grid.csv", index=False)
+
+    # Refit each chosen grid point on the whole training split
+    finals = Parallel(n_jobs=SWEEP_N_JOBS)(
+        delayed(fit_final)(
+            embeddings[splits[m][2]], splits[m][1][splits[m][2]], embeddings[splits[m][3]], C, method,
+        )
+        for m, (C, method, _ap, _probs) in best.items()
+    )
+
+    summary = []
+    for (model_name, (C, method, oof_ap, oof_probs)), (clf, test_probs) in zip(best.items(), finals):
+        subdir, y, idx_train, idx_test = splits[model_name]
+        y_test = y[idx_test]
+
+        # Threshold chosen on out-of-fold predictions, never on the test split
+        table = pr_table(y[idx_train], oof_probs)
+        chosen = choose_threshold(table)
+        thr = float(chosen["threshold"])
+
+        test_ap = float(average_precision_score(y_test, test_probs))
+        test = metrics_at(y_test, test_probs, thr)
+
+        out_dir = root / subdir
+        out_dir.mkdir(parents=True, exist_ok=True)
+        table.to_csv(out_dir / f"{model_name}_pr_curve.csv", index=False)
+
+        dump(
+            {
+                "embed_model": EMBED_MODEL,
+                "classifier": clf,
+                "threshold": thr,
+                "label": model_name,
+                "use_url_fallback": USE_URL_FALLBACK,
+                "sweep": {
+                    "C": C,
+                    "calibration": method,
+                    "oof_average_precision": oof_ap,
+                    "min_recall": SWEEP_MIN_RECALL,
+                    "average_precision": test_ap,
+                    **test,
+                },
+            },
+            out_dir / f"{model_name}.joblib",
+        )
+
+        summary.append({
+            "model": model_name,
+            "C": C,
+            "calibration": method,
+            "oof_average_precision": oof_ap,
+            "threshold": thr,
+            "oof_precision": float(chosen["precision"]),
+            "oof_recall": float(chosen["recall"]),
+            "test_average_precision": test_ap,
+            "test_precision": test["precision"],
+            "test_recall": test["recall"],
+            "test_keep_rate": test["keep_rate"],
+        })
+        print(
+            f"{model_name}: C={C} {method} oofAP={oof_ap:.3f} -> thr={thr:.3f} | test "
+            f"AP={test_ap:.3f} P={test['precision']:.3f} R={test['recall']:.3f} keep={test['keep_rate']:.3f}"
+        )
+
+    pd.DataFrame(summary).to_csv(SWEEP_DIR / "sweep_summary.csv", index=False)
+    print("\nSweep done. Summary:", SWEEP_DIR / "sweep_summary.csv")
+
+
+if __name__ == "__main__":
+    run_sweep()
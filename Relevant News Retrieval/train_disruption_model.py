@@ -7,17 +7,19 @@ import pandas as pd
 import numpy as np
 from joblib import dump
 
-from sentence_transformers import SentenceTransformer
 from sklearn.model_selection import train_test_split
 from sklearn.svm import LinearSVC
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import classification_report, confusion_matrix, average_precision_score
 
+from prepare_training_data import load_labelled_frame, encode_cached
+
 
 
 TRAINING_XLSX = r"data/interim/labelled_disruption.xlsx"
 SHEET_NAME = 0  # 0 = first sheet; or put the sheet name string
 OUTPUT_DIR = "models/disruption_v1"
+EMBED_MODEL = "all-MiniLM-L6-v2"
 USE_URL_FALLBACK = True
 REQUIRE_TEXT = True
 
@@ -79,8 +81,7 @@ def build_text(row: pd.Series) -> str:
     return main
 
 
-print("Loading Excel:", TRAINING_XLSX)
-df = pd.read_excel(TRAINING_XLSX, sheet_name=SHEET_NAME, engine="openpyxl")
+df = load_labelled_frame(TRAINING_XLSX, sheet_name=SHEET_NAME)
 print("Rows loaded:", len(df))
 print("Columns:", list(df.columns))
 
@@ -133,11 +134,11 @@ X_test = df.loc[idx_test, "text"].astype(str).tolist()
 y_train = df.loc[idx_train, "label"].values
 y_test = df.loc[idx_test, "label"].values
 
-# Embeddings
+# Embeddings (content-hashed cache; only changed texts are re-embedded)
 print("Embedding...")
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-X_train_emb = embedder.encode(X_train, normalize_embeddings=True, show_progress_bar=True)
-X_test_emb = embedder.encode(X_test, normalize_embeddings=True, show_progress_bar=True)
+embeddings = encode_cached(df["text"].astype(str).tolist(), cache_stem=Path(TRAINING_XLSX).stem, embed_model=EMBED_MODEL)
+X_train_emb = embeddings[idx_train]
+X_test_emb = embeddings[idx_test]
 
 # Classifier (linear SVM + probability calibration)
 clf = CalibratedClassifierCV(LinearSVC(class_weight="balanced"), cv=5)
@@ -184,7 +185,7 @@ print("False positives:", len(false_pos), "| False negatives:", len(false_neg))
 # -------------------------
 dump(
     {
-        "embed_model": "all-MiniLM-L6-v2",
+        "embed_model": EMBED_MODEL,
         "classifier": clf,
         "threshold": THRESHOLD,
         "use_url_fallback": USE_URL_FALLBACK,
@@ -11,8 +11,9 @@ Only coarse filters are applied here (type and time overlap).
 No scoring or decisions are made in this module.
 """
 
-from datetime import timedelta, date
-from typing import Dict, List
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
 
 from validation.models import CanonicalEvent
 
@@ -22,29 +23,61 @@ from validation.models import CanonicalEvent
 DEFAULT_MAX_DAYS_APART = 7
 MAX_CANDIDATES_PER_EVENT = 200
 
+# References longer than this are kept out of the sorted index and checked
+# directly (a few multi-month floods/droughts would otherwise widen every lookup)
+LONG_EVENT_DAYS = 60
 
-# ------------------ HELPERS ------------------ #
 
-def _date_overlap(
-    d1_start: date | None,
-    d1_end: date | None,
-    d2_start: date | None,
-    d2_end: date | None,
-    max_days: int,
-) -> bool:
+# ------------------ REFERENCE INDEX ------------------ #
+
+class _KindIndex:
     """
-    Check whether two date ranges overlap within a tolerance window.
+    References of one kind, sorted by start date (as ordinals).
+
+    A reference overlaps an extracted event within tolerance `tol` when
+        r_start <= e_end + tol  and  r_end >= e_start - tol
+    For short references (r_end - r_start <= LONG_EVENT_DAYS) the second
+    condition implies r_start >= e_start - tol - LONG_EVENT_DAYS, so both
+    bounds are a bisect on the sorted starts; only that slice is visited.
     """
-    if not d1_start or not d2_start:
-        return False
 
-    d1_end = d1_end or d1_start
-    d2_end = d2_end or d2_start
+    def __init__(self, refs: List[Tuple[int, CanonicalEvent]]):
+        short: List[Tuple[int, int, int, str]] = []
+        self.long: List[Tuple[int, int, int, str]] = []
+
+        for pos, r in refs:
+            if not r.date_start:
+                continue
+            start = r.date_start.toordinal()
+            end = (r.date_end or r.date_start).toordinal()
+            row = (start, end, pos, r.id)
+            (self.long if end - start > LONG_EVENT_DAYS else short).append(row)
+
+        short.sort()
+        self.short = short
+        self.starts = [row[0] for row in short]
+
+    def overlapping(self, e_start: int, e_end: int, tol: int) -> List[Tuple[int, int, int, str]]:
+        lo = bisect_left(self.starts, e_start - tol - LONG_EVENT_DAYS)
+        hi = bisect_right(self.starts, e_end + tol)
+        floor = e_start - tol
+
+        hits = [row for row in self.short[lo:hi] if row[1] >= floor]
+        hits.extend(row for row in self.long if row[0] <= e_end + tol and row[1] >= floor)
+        return hits
+
 
-    return (
-        d1_start <= d2_end + timedelta(days=max_days)
-        and d1_end >= d2_start - timedelta(days=max_days)
-    )
+def build_reference_index(references: List[CanonicalEvent]) -> Dict[str, _KindIndex]:
+    """Reference events grouped by kind, each group indexed by date."""
+    by_kind: Dict[str, List[Tuple[int, CanonicalEvent]]] = {}
+    for pos, r in enumerate(references):
+        by_kind.setdefault(r.kind, []).append((pos, r))
+    return {kind: _KindIndex(refs) for kind, refs in by_kind.items()}
+
+
+def _gap_days(e_start: int, e_end: int, r_start: int, r_end: int) -> int:
+    """Days between two date ranges (0 when they overlap)."""
+    return max(0, r_start - e_end, e_start - r_end)
 
 
 # ------------------ CANDIDATE GENERATION ------------------ #
@@ -53,34 +86,41 @@ def generate_candidates(
     extracted: List[CanonicalEvent],
     references: List[CanonicalEvent],
     max_days_apart: int = DEFAULT_MAX_DAYS_APART,
+    max_candidates: Optional[int] = MAX_CANDIDATES_PER_EVENT,
 ) -> Dict[str, List[str]]:
     """
-    Generate candidate reference IDs for each extracted event.
+    Generate candidate reference IDs for each extracted event: same kind and
+    date ranges overlapping within max_days_apart.
+
+    Each extracted event only visits references whose dates can overlap
+    (see _KindIndex), instead of scanning every reference of its kind.
+    When more than max_candidates overlap, the closest ones in time are kept
+    (date gap, then start-date difference). Candidates are returned in
+    reference input order.
     """
-    # Index reference events by type
-    refs_by_type: Dict[str, List[CanonicalEvent]] = {}
-    for r in references:
-        refs_by_type.setdefault(r.kind, []).append(r)
+    index = build_reference_index(references)
 
     candidates: Dict[str, List[str]] = {}
 
     for e in extracted:
-        pool = refs_by_type.get(e.kind, [])
-        matched: List[str] = []
-
-        for r in pool:
-            if _date_overlap(
-                e.date_start,
-                e.date_end,
-                r.date_start,
-                r.date_end,
-                max_days_apart,
-            ):
-                matched.append(r.id)
-
-                if len(matched) >= MAX_CANDIDATES_PER_EVENT:
-                    break
-
-        candidates[e.id] = matched
+        kind_index = index.get(e.kind)
+        if kind_index is None or not e.date_start:
+            candidates[e.id] = []
+            continue
+
+        e_start = e.date_start.toordinal()
+        e_end = (e.date_end or e.date_start).toordinal()
+
+        hits = kind_index.overlapping(e_start, e_end, max_days_apart)
+
+        if max_candidates is not None and len(hits) > max_candidates:
+            hits = heapq.nsmallest(
+                max_candidates,
+                hits,
+                key=lambda row: (_gap_days(e_start, e_end, row[0], row[1]), abs(row[0] - e_start), row[2]),
+            )
+
+        hits.sort(key=lambda row: row[2])
+        candidates[e.id] = [row[3] for row in hits]
 
     return candidates
@@ -8,13 +8,53 @@ Flowchart role:
 - 'Match Scoring' stage
 
 This module does not decide matches; it only computes scores.
+
+Per-event features (lowercased, interned token set; lowercased location) are
+computed once by prepare_events. score_candidates then scores every candidate
+pair at once: time and Jaccard features are NumPy/SciPy array operations over
+all pairs instead of a per-pair Python loop.
 """
 
-from typing import Dict
-from datetime import date
+import gc
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
 
 from validation.models import CanonicalEvent, CandidateMatch
 
+# Optional scipy (sparse token matrices for batch Jaccard)
+try:
+    import scipy.sparse as _sparse
+    _HAS_SCIPY = True
+except Exception:
+    _HAS_SCIPY = False
+
+
+# ------------------ CONFIG ------------------ #
+
+TIME_WEIGHT = 0.5
+LOCATION_WEIGHT = 0.3
+TEXT_WEIGHT = 0.2
+
+PAIR_CHUNK = 100_000     # pairs per sparse row-gather (bounds memory)
+
+
+# ------------------ PER-EVENT FEATURES ------------------ #
+
+def prepare_event(e: CanonicalEvent) -> CanonicalEvent:
+    """Fill e.tokens / e.location_key if not already set."""
+    if e.tokens is None:
+        e.tokens = frozenset(sys.intern(t) for t in (e.text or "").lower().split())
+    if e.location_key is None:
+        e.location_key = e.location_name.lower() if e.location_name else ""
+    return e
+
+
+def prepare_events(events) -> None:
+    for e in events:
+        prepare_event(e)
+
 
 # ------------------ SCORING HELPERS ------------------ #
 
@@ -40,11 +80,11 @@ def _location_text_score(e: CanonicalEvent, r: CanonicalEvent) -> float:
     """
     Weak location agreement using string overlap.
     """
-    if not e.location_name or not r.location_name:
-        return 0.0
+    e_loc = prepare_event(e).location_key
+    r_loc = prepare_event(r).location_key
 
-    e_loc = e.location_name.lower()
-    r_loc = r.location_name.lower()
+    if not e_loc or not r_loc:
+        return 0.0
 
     if e_loc in r_loc or r_loc in e_loc:
         return 1.0
@@ -56,8 +96,8 @@ def _text_score(e: CanonicalEvent, r: CanonicalEvent) -> float:
     """
     Simple token overlap score.
     """
-    e_tokens = set((e.text or "").lower().split())
-    r_tokens = set((r.text or "").lower().split())
+    e_tokens = prepare_event(e).tokens
+    r_tokens = prepare_event(r).tokens
 
     if not e_tokens or not r_tokens:
         return 0.0
@@ -65,7 +105,6 @@ def _text_score(e: CanonicalEvent, r: CanonicalEvent) -> float:
     return len(e_tokens & r_tokens) / len(e_tokens | r_tokens)
 
 
-
 def score_candidate(
     extracted: CanonicalEvent,
     reference: CanonicalEvent,
@@ -77,7 +116,7 @@ def score_candidate(
     l = _location_text_score(extracted, reference)
     x = _text_score(extracted, reference)
 
-    score = 0.5 * t + 0.3 * l + 0.2 * x
+    score = TIME_WEIGHT * t + LOCATION_WEIGHT * l + TEXT_WEIGHT * x
 
     return CandidateMatch(
         extracted_id=extracted.id,
@@ -90,3 +129,144 @@ def score_candidate(
         },
         score=score,
     )
+
+
+# ------------------ BATCH SCORING ------------------ #
+
+def _ordinals(events: List[CanonicalEvent], end: bool = False) -> np.ndarray:
+    """Start (or end, defaulting to start) dates as float ordinals; NaN when missing."""
+    out = np.full(len(events), np.nan)
+    for i, ev in enumerate(events):
+        if ev.date_start:
+            d = (ev.date_end or ev.date_start) if end else ev.date_start
+            out[i] = d.toordinal()
+    return out
+
+
+def _batch_time(e_d: np.ndarray, r_start: np.ndarray, r_end: np.ndarray) -> np.ndarray:
+    delta = np.minimum(np.abs(e_d - r_start), np.abs(e_d - r_end))
+    inside = (r_start <= e_d) & (e_d <= r_end)
+    t = np.where(inside, 1.0, 1.0 / (1.0 + delta))
+    return np.where(np.isnan(e_d) | np.isnan(r_start), 0.0, t)
+
+
+def _token_matrix(events: List[CanonicalEvent], vocab: Dict[str, int]):
+    indptr = [0]
+    indices: List[int] = []
+    for ev in events:
+        for t in ev.tokens:
+            indices.append(vocab.setdefault(t, len(vocab)))
+        indptr.append(len(indices))
+    return indptr, indices
+
+
+def _batch_jaccard(
+    e_events: List[CanonicalEvent],
+    r_events: List[CanonicalEvent],
+    ei: np.ndarray,
+    ri: np.ndarray,
+) -> np.ndarray:
+    e_len = np.array([len(ev.tokens) for ev in e_events], dtype=np.float64)[ei]
+    r_len = np.array([len(ev.tokens) for ev in r_events], dtype=np.float64)[ri]
+
+    if _HAS_SCIPY:
+        vocab: Dict[str, int] = {}
+        e_ptr, e_idx = _token_matrix(e_events, vocab)
+        r_ptr, r_idx = _token_matrix(r_events, vocab)
+        shape = len(vocab)
+        E = _sparse.csr_matrix((np.ones(len(e_idx)), e_idx, e_ptr), shape=(len(e_events), shape))
+        R = _sparse.csr_matrix((np.ones(len(r_idx)), r_idx, r_ptr), shape=(len(r_events), shape))
+
+        inter = np.empty(len(ei))
+        for lo in range(0, len(ei), PAIR_CHUNK):
+            hi = lo + PAIR_CHUNK
+            inter[lo:hi] = np.asarray(E[ei[lo:hi]].multiply(R[ri[lo:hi]]).sum(axis=1)).ravel()
+    else:
+        inter = np.array(
+            [len(e_events[a].tokens & r_events[b].tokens) for a, b in zip(ei, ri)], dtype=np.float64
+        )
+
+    union = e_len + r_len - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = inter / union
+    return np.where((e_len == 0) | (r_len == 0), 0.0, x)
+
+
+def score_candidates(
+    candidate_map: Dict[str, List[str]],
+    extracted: Dict[str, CanonicalEvent],
+    references: Dict[str, CanonicalEvent],
+) -> List[CandidateMatch]:
+    """
+    Score every (extracted_id, ref_id) pair in candidate_map at once.
+    Same features and scores as score_candidate, in candidate_map order.
+    """
+    e_pos: Dict[str, int] = {}
+    r_pos: Dict[str, int] = {}
+    e_events: List[CanonicalEvent] = []
+    r_events: List[CanonicalEvent] = []
+    pairs: List[Tuple[int, int]] = []
+
+    for extracted_id, ref_ids in candidate_map.items():
+        if not ref_ids:
+            continue
+        a = e_pos.get(extracted_id)
+        if a is None:
+            a = e_pos[extracted_id] = len(e_events)
+            e_events.append(extracted[extracted_id])
+        for ref_id in ref_ids:
+            b = r_pos.get(ref_id)
+            if b is None:
+                b = r_pos[ref_id] = len(r_events)
+                r_events.append(references[ref_id])
+            pairs.append((a, b))
+
+    if not pairs:
+        return []
+
+    prepare_events(e_events)
+    prepare_events(r_events)
+
+    idx = np.array(pairs, dtype=np.int64)
+    ei, ri = idx[:, 0], idx[:, 1]
+
+    # ---- time ----
+    t = _batch_time(_ordinals(e_events)[ei], _ordinals(r_events)[ri], _ordinals(r_events, end=True)[ri])
+
+    # ---- location (substring containment; strings, so one pass over pairs) ----
+    e_loc = [ev.location_key for ev in e_events]
+    r_loc = [ev.location_key for ev in r_events]
+    l = np.fromiter(
+        (
+            1.0 if (e_loc[a] and r_loc[b] and (e_loc[a] in r_loc[b] or r_loc[b] in e_loc[a])) else 0.0
+            for a, b in pairs
+        ),
+        dtype=np.float64,
+        count=len(pairs),
+    )
+
+    # ---- text (Jaccard over token sets) ----
+    x = _batch_jaccard(e_events, r_events, ei, ri)
+
+    score = TIME_WEIGHT * t + LOCATION_WEIGHT * l + TEXT_WEIGHT * x
+
+    datasets = [ev.meta.get("dataset", "unknown") for ev in r_events]
+
+    # Building one object + dict per pair is allocation-only; cyclic GC passes
+    # over the growing list would dominate the run time, so pause it here
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [
+            CandidateMatch(
+                extracted_id=e_events[a].id,
+                ref_id=r_events[b].id,
+                dataset=datasets[b],
+                features={"time": tt, "location": ll, "text": xx},
+                score=s,
+            )
+            for (a, b), tt, ll, xx, s in zip(pairs, t.tolist(), l.tolist(), x.tolist(), score.tolist())
+        ]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
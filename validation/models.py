@@ -16,7 +16,7 @@ All downstream validation code should depend on these models.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, FrozenSet, Optional
 from datetime import date
 
 
@@ -77,6 +77,10 @@ class CanonicalEvent:
     text: str
     meta: Dict[str, Any] = field(default_factory=dict)
 
+    # Matching features derived once per event (filled by matching.scoring.prepare_events)
+    tokens: Optional[FrozenSet[str]] = field(default=None, repr=False, compare=False)
+    location_key: Optional[str] = field(default=None, repr=False, compare=False)
+
 
 # ------------------ MATCHING OBJECTS ------------------ #
 
@@ -40,7 +40,7 @@ from reference.standardise import standardise_reference_events
 # ------------------ MATCHING ------------------ #
 
 from matching.candidate_generation import generate_candidates
-from matching.scoring import score_candidate
+from matching.scoring import score_candidates
 from matching.dual_gate import run_dual_gate_validation
 
 # ------------------ REPORTING ------------------ #
@@ -209,17 +209,12 @@ def run_validation(
 
     # --------------------------------------------------
     # 10) Score all candidate pairs
+    # (batch: features computed as arrays over all pairs)
     # --------------------------------------------------
     ext_lookup = {e.id: e for e in extracted_canonical}
     ref_lookup = {r.id: r for r in reference_canonical}
 
-    scored_candidates = []
-    for extracted_id, ref_ids in candidate_map.items():
-        e = ext_lookup[extracted_id]
-        for ref_id in ref_ids:
-            scored_candidates.append(
-                score_candidate(e, ref_lookup[ref_id])
-            )
+    scored_candidates = score_candidates(candidate_map, ext_lookup, ref_lookup)
 
     # --------------------------------------------------
     # 11) Dual-gate validation